@@ -3,6 +3,7 @@ Core module exports.
 """
 from .config import settings
 from .errors import (
+    AdmissionRejectedError,
     ExportError,
     SceneDetectionError,
     STTError,
@@ -11,11 +12,15 @@ from .errors import (
     VideoManualGeneratorError,
     VideoProcessingError,
 )
+from .executors import apply_thread_caps, apply_thread_env, executors
 from .logger import logger
 
 __all__ = [
     "settings",
     "logger",
+    "executors",
+    "apply_thread_caps",
+    "apply_thread_env",
     "VideoManualGeneratorError",
     "VideoProcessingError",
     "STTError",
@@ -23,4 +28,5 @@ __all__ = [
     "TemplateError",
     "ExportError",
     "ValidationError",
+    "AdmissionRejectedError",
 ]
@@ -28,12 +28,53 @@ class Settings(BaseSettings):
     # Video
     max_video_size_mb: int = Field(default=500)
     allowed_video_extensions: str = Field(default="mp4,mov,avi,mkv")
+    # 同一内容の動画をハードリンクで共有し、既存の中間成果物を再利用する
+    upload_dedup: bool = Field(default=True)
+    # この時間更新のない未完了の再開可能アップロードを破棄する
+    upload_expiry_sec: float = Field(default=86400.0, gt=0.0)
+
+    # Analysis Proxy (アップロード後に低解像度・低フレームレートの解析用動画を生成)
+    proxy_enabled: bool = Field(default=True)
+    proxy_height: int = Field(default=480, ge=120)
+    proxy_fps: float = Field(default=5.0, gt=0.0)
+    # キーフレーム間隔 (フレーム数、1 = 全フレームイントラ)
+    proxy_gop_frames: int = Field(default=5, ge=1)
 
     # Scene Detection
     scene_threshold: float = Field(default=30.0, ge=0.0, le=100.0)
     min_scene_duration_sec: float = Field(default=2.0, ge=0.1)
     scene_detection_method: Literal["histogram", "ssim"] = Field(default="histogram")
 
+    # Capture Renditions (キャプチャ画像の縮小版: 一覧用・画面用・印刷用)
+    rendition_format: Literal["webp", "avif", "jpg"] = Field(default="webp")
+    rendition_quality: int = Field(default=80, ge=1, le=100)
+    rendition_thumb_width: int = Field(default=320, ge=16)
+    rendition_screen_width: int = Field(default=1280, ge=16)
+    rendition_print_width: int = Field(default=1920, ge=16)
+
+    # Timeline Sprites (ホバープレビュー用のスプライトシートと WebVTT、プロキシ生成後に作成)
+    sprites_enabled: bool = Field(default=True)
+    sprite_interval_sec: float = Field(default=2.0, gt=0.0)
+    sprite_width: int = Field(default=160, ge=16)
+    sprite_columns: int = Field(default=10, ge=1)
+    sprite_rows: int = Field(default=10, ge=1)
+
+    # Static Files (/data 配信のキャッシュ期間、内容が変わると URL も変わるファイルに適用)
+    static_immutable_max_age_sec: int = Field(default=31536000, ge=0)
+
+    # Frame Server (レビュー画面用のランダムアクセスフレーム取得)
+    # 動画毎に開いたままにするデコーダー数と全体の上限
+    frame_server_decoders_per_video: int = Field(default=2, ge=1)
+    frame_server_max_decoders: int = Field(default=8, ge=1)
+    # デコード用の専用スレッド数 (vision プールとは別)
+    frame_server_threads: int = Field(default=4, ge=1)
+    # 未使用のデコーダーを閉じるまでの秒数
+    frame_server_decoder_idle_sec: float = Field(default=120.0, gt=0.0)
+    # エンコード済みフレームのキャッシュ上限 (MB)
+    frame_server_cache_mb: int = Field(default=64, ge=0)
+    frame_server_max_width: int = Field(default=1920, ge=16)
+    frame_server_quality: int = Field(default=85, ge=1, le=100)
+
     # STT
     stt_engine: Literal["whisper", "gpt4o", "dummy"] = Field(default="gpt4o")
     whisper_model: Literal["tiny", "base", "small", "medium", "large"] = Field(default="base")
@@ -48,6 +89,68 @@ class Settings(BaseSettings):
     pdf_engine: Literal["playwright", "weasyprint"] = Field(default="playwright")
     template_dir: Path = Field(default=Path("./templates"))
     default_template: str = Field(default="manual_default.md.j2")
+    # コンパイル済みテンプレートの保持数 (バイトコードは data_dir/cache/jinja に保存)
+    template_cache_size: int = Field(default=50, ge=1)
+
+    # PDF Images (本文幅 × DPI まで縮小・再エンコードしてから埋め込む)
+    pdf_image_dpi: int = Field(default=150, ge=36, le=600)
+    # A4 (210mm) から左右の余白 20mm を除いた本文幅
+    pdf_content_width_mm: float = Field(default=170.0, gt=0.0)
+    # jpg は Chromium / WeasyPrint とも再圧縮せずに PDF へ格納される
+    pdf_image_format: Literal["jpg", "png", "webp"] = Field(default="jpg")
+    pdf_image_quality: int = Field(default=85, ge=1, le=100)
+    # このステップ数を超えるマニュアルはチャンクに分けて並列に PDF 化し結合する (0 = 分割しない)
+    pdf_chunk_steps: int = Field(default=50, ge=0)
+
+    # Browser Pool (PDF_ENGINE=playwright 用の常駐 Chromium)
+    browser_pool_size: int = Field(default=1, ge=1)
+    browser_pages_per_browser: int = Field(default=4, ge=1)
+    # このページ数を処理したブラウザは再起動する (メモリリーク対策)
+    browser_max_jobs_per_browser: int = Field(default=100, ge=1)
+    browser_launch_timeout_sec: float = Field(default=30.0, gt=0.0)
+
+    # WeasyPrint (PDF_ENGINE=weasyprint 用の専用プロセスプール、0 = CPU コア数)
+    weasyprint_workers: int = Field(default=0, ge=0)
+
+    # Executors (CPU 負荷の高いステージ毎のワーカープール)
+    stt_workers: int = Field(default=1, ge=1)
+    vision_workers: int = Field(default=2, ge=1)
+    export_workers: int = Field(default=2, ge=1)
+    stt_executor_mode: Literal["thread", "process"] = Field(default="thread")
+    vision_executor_mode: Literal["thread", "process"] = Field(default="thread")
+    export_executor_mode: Literal["thread", "process"] = Field(default="thread")
+    # ライブラリ毎のスレッド数上限 (0 = CPU コア数とワーカー数から自動算出)
+    torch_num_threads: int = Field(default=0, ge=0)
+    opencv_num_threads: int = Field(default=0, ge=0)
+    omp_num_threads: int = Field(default=0, ge=0)
+
+    # FFmpeg (非同期実行の同時プロセス数上限とタイムアウト)
+    ffmpeg_max_processes: int = Field(default=4, ge=1)
+    # タイムアウト = 基本時間 + 動画の長さ × 係数 (長さ不明の場合は ffmpeg_timeout_max_sec)
+    ffmpeg_timeout_base_sec: float = Field(default=60.0, gt=0.0)
+    ffmpeg_timeout_per_media_sec: float = Field(default=2.0, gt=0.0)
+    ffmpeg_timeout_max_sec: float = Field(default=7200.0, gt=0.0)
+    ffprobe_timeout_sec: float = Field(default=30.0, gt=0.0)
+
+    # Admission Control (同時実行数と待ち行列の上限、超過時は 429)
+    stt_max_concurrent: int = Field(default=1, ge=1)
+    stt_max_queue: int = Field(default=4, ge=0)
+    vision_max_concurrent: int = Field(default=2, ge=1)
+    vision_max_queue: int = Field(default=8, ge=0)
+    export_max_concurrent: int = Field(default=2, ge=1)
+    export_max_queue: int = Field(default=8, ge=0)
+    # 実績がない場合の 1 ジョブあたりの想定処理時間 (秒)
+    admission_default_duration_sec: float = Field(default=30.0, gt=0.0)
+
+    # Job Queue (local = API プロセス内で実行、sqlite / redis = ワーカーに委譲)
+    job_backend: Literal["local", "sqlite", "redis"] = Field(default="local")
+    job_queue_path: Path = Field(default=Path("./data/jobs.sqlite3"))
+    redis_url: str = Field(default="redis://localhost:6379/0")
+    job_lease_sec: float = Field(default=60.0, gt=0.0)
+    job_heartbeat_sec: float = Field(default=15.0, gt=0.0)
+    job_max_attempts: int = Field(default=3, ge=1)
+    job_poll_interval_sec: float = Field(default=1.0, gt=0.0)
+    job_wait_timeout_sec: float = Field(default=3600.0, gt=0.0)
 
     # OpenAI API
     openai_api_key: str = Field(default="")
@@ -43,3 +43,12 @@ class ValidationError(VideoManualGeneratorError):
     """バリデーションエラー"""
 
     pass
+
+
+class AdmissionRejectedError(VideoManualGeneratorError):
+    """処理キューが満杯のため受付拒否 (429)"""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"{stage} の処理キューが満杯です。{retry_after} 秒後に再試行してください")
+        self.stage = stage
+        self.retry_after = retry_after
@@ -0,0 +1,284 @@
+"""
+Named executor pools for CPU-bound pipeline stages.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal, Optional, TypeVar
+
+from .config import settings
+from .logger import logger
+
+StageName = Literal["stt", "vision", "export"]
+STAGES: tuple[StageName, ...] = ("stt", "vision", "export")
+
+T = TypeVar("T")
+
+# OpenMP / BLAS 系ライブラリが参照する環境変数
+_OMP_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _cpu_count() -> int:
+    """利用可能な CPU コア数を取得"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _pool_core_shares(cores: int) -> dict[str, int]:
+    """コアをステージのプールに均等に割り当てる (余りは先頭のステージから 1 つずつ)"""
+    base, extra = divmod(cores, len(STAGES))
+    return {stage: max(1, base + (1 if i < extra else 0)) for i, stage in enumerate(STAGES)}
+
+
+def compute_thread_caps() -> dict[str, int]:
+    """
+    Compute per-library thread caps so that workers × threads matches the cores.
+
+    The cores are split across the stt / vision / export pools first, and each pool's
+    share is divided by that pool's worker count, so all pools busy at once use about
+    one thread per core.
+
+    Returns:
+        Mapping of library name (torch/opencv/omp) to thread count
+    """
+    cores = _cpu_count()
+    shares = _pool_core_shares(cores)
+    per_worker = {
+        stage: max(1, shares[stage] // getattr(settings, f"{stage}_workers")) for stage in STAGES
+    }
+    return {
+        # torch は STT、OpenCV はシーン検出・フレーム抽出のプールで使われる
+        "torch": settings.torch_num_threads or per_worker["stt"],
+        "opencv": settings.opencv_num_threads or per_worker["vision"],
+        # OpenMP / BLAS はどのプールからも使われるため、最も少ない割り当てに合わせる
+        "omp": settings.omp_num_threads or min(per_worker.values()),
+    }
+
+
+def apply_thread_env(caps: Optional[dict[str, int]] = None) -> dict[str, int]:
+    """
+    Set the OpenMP / BLAS thread environment variables.
+
+    These libraries read the variables only when they are loaded, so entry points call this
+    before importing numpy, cv2 or torch.
+
+    Args:
+        caps: Thread caps (default: compute_thread_caps())
+
+    Returns:
+        Applied thread caps
+    """
+    caps = caps or compute_thread_caps()
+    for var in _OMP_ENV_VARS:
+        os.environ[var] = str(caps["omp"])
+    return caps
+
+
+def apply_thread_caps(caps: Optional[dict[str, int]] = None) -> dict[str, int]:
+    """
+    Apply thread caps to OpenMP, OpenCV and Torch in the current process.
+
+    The environment variables only take effect for libraries loaded afterwards (and for
+    child processes); call apply_thread_env() before the heavy imports as well.
+
+    Args:
+        caps: Thread caps (default: compute_thread_caps())
+
+    Returns:
+        Applied thread caps
+    """
+    caps = apply_thread_env(caps)
+
+    try:
+        import cv2
+
+        cv2.setNumThreads(caps["opencv"])
+    except ImportError:
+        pass
+
+    try:
+        import torch
+
+        torch.set_num_threads(caps["torch"])
+    except ImportError:
+        pass
+
+    return caps
+
+
+def _process_initializer(
+    caps: dict[str, int],
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple[Any, ...] = (),
+) -> None:
+    """プロセスプールのワーカー初期化 (スレッド数上限を適用し、追加の初期化を実行)"""
+    apply_thread_caps(caps)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class StageExecutor:
+    """ステージ単位のワーカープール (スレッド / プロセス)"""
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        mode: Literal["thread", "process"] = "thread",
+        thread_caps: Optional[dict[str, int]] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple[Any, ...] = (),
+    ):
+        """
+        Initialize stage executor.
+
+        Args:
+            name: Stage name (stt/vision/export)
+            max_workers: Number of workers
+            mode: Pool mode ('thread' or 'process')
+            thread_caps: Thread caps applied in process workers
+            initializer: Extra setup run once in each process worker (must be picklable)
+            initargs: Arguments for ``initializer``
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.mode = mode
+        self.thread_caps = thread_caps or compute_thread_caps()
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_latency = 0.0
+
+    def _get_executor(self) -> Executor:
+        """プールを遅延生成"""
+        if self._executor is None:
+            if self.mode == "process":
+                # torch 等のスレッドを fork で複製しないよう spawn を使用
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_process_initializer,
+                    initargs=(self.thread_caps, self.initializer, self.initargs),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-worker",
+                )
+            logger.info(f"Executor '{self.name}' started ({self.mode}, workers={self.max_workers})")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking function in this stage's pool.
+
+        Args:
+            fn: Function to run (must be picklable in process mode)
+            *args: Positional arguments
+
+        Returns:
+            Function result
+        """
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        with self._lock:
+            self._completed += 1
+            self._total_latency += time.monotonic() - started
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """キュー深さ・使用率などの統計情報を取得"""
+        with self._lock:
+            running = min(self._in_flight, self.max_workers)
+            return {
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "running": running,
+                "queue_depth": self._in_flight - running,
+                "utilization": round(running / self.max_workers, 3),
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_latency_sec": (
+                    round(self._total_latency / self._completed, 3) if self._completed else None
+                ),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """プールを停止"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class ExecutorRegistry:
+    """ステージ名 → StageExecutor のレジストリ"""
+
+    def __init__(self) -> None:
+        self._executors: dict[str, StageExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, stage: StageName) -> StageExecutor:
+        """
+        Get (or lazily create) the executor for a stage.
+
+        Args:
+            stage: Stage name (stt/vision/export)
+
+        Returns:
+            StageExecutor for the stage
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown executor stage: {stage}")
+        with self._lock:
+            if stage not in self._executors:
+                self._executors[stage] = StageExecutor(
+                    name=stage,
+                    max_workers=getattr(settings, f"{stage}_workers"),
+                    mode=getattr(settings, f"{stage}_executor_mode"),
+                )
+            return self._executors[stage]
+
+    async def run(self, stage: StageName, fn: Callable[..., T], *args: Any) -> T:
+        """指定ステージのプールで関数を実行"""
+        return await self.get(stage).run(fn, *args)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """全ステージの統計情報を取得"""
+        return {stage: self.get(stage).stats() for stage in STAGES}
+
+    def shutdown(self) -> None:
+        """全プールを停止"""
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown()
+            self._executors.clear()
+
+
+executors = ExecutorRegistry()
@@ -7,9 +7,25 @@ from typing import AsyncGenerator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 
-from app.core import VideoManualGeneratorError, logger, settings
+from app.core import (
+    AdmissionRejectedError,
+    VideoManualGeneratorError,
+    apply_thread_caps,
+    apply_thread_env,
+    executors,
+    logger,
+    settings,
+)
+
+# OpenMP / BLAS は読み込み時にスレッド数を決めるため、numpy / cv2 / torch を読み込む前に設定する
+apply_thread_env()
+
+from app.services.export import browser_pool, weasyprint_engine  # noqa: E402
+from app.services.frames import frame_server  # noqa: E402
+from app.services.pipeline import admission  # noqa: E402
+from app.services.uploads import sweep_expired_uploads  # noqa: E402
+from app.utils import CachingStaticFiles, ffmpeg_runner  # noqa: E402
 
 
 @asynccontextmanager
@@ -19,11 +35,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting Video Manual Generator API...")
     settings.ensure_directories()
     logger.info(f"Data directories initialized at {settings.data_dir}")
+    await sweep_expired_uploads(force=True)
+    thread_caps = apply_thread_caps()
+    logger.info(f"Thread caps applied: {thread_caps}")
+    if settings.pdf_engine == "playwright":
+        # 最初のエクスポートでブラウザ起動を待たないよう事前に起動しておく
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            logger.warning(f"Browser pool warm-up failed (will retry on first export): {e}")
+    elif settings.pdf_engine == "weasyprint":
+        # フォント設定の読み込みを最初のエクスポートより前に済ませておく
+        try:
+            await weasyprint_engine.start()
+        except Exception as e:
+            logger.warning(f"WeasyPrint warm-up failed: {e}")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Video Manual Generator API...")
+    frame_server.close()
+    await browser_pool.close()
+    weasyprint_engine.shutdown()
+    executors.shutdown()
 
 
 app = FastAPI(
@@ -54,6 +89,16 @@ async def video_manual_error_handler(request, exc: VideoManualGeneratorError):
     )
 
 
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request, exc: AdmissionRejectedError):
+    """処理キュー満杯時のエラーハンドラー (429 + Retry-After)"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "type": exc.__class__.__name__, "stage": exc.stage},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/")
 async def root():
     """ヘルスチェック"""
@@ -73,20 +118,28 @@ async def health():
             "stt_engine": settings.stt_engine,
             "scene_detection": settings.scene_detection_method,
             "pdf_engine": settings.pdf_engine,
+            "job_backend": settings.job_backend,
         },
+        "executors": executors.stats(),
+        "ffmpeg": ffmpeg_runner.stats(),
+        "frames": frame_server.stats(),
+        "browsers": browser_pool.stats(),
+        "weasyprint": weasyprint_engine.stats(),
+        "load": admission.stats(),
     }
 
 
 # 静的ファイル配信の設定
-app.mount("/data", StaticFiles(directory=str(settings.data_dir)), name="data")
+app.mount("/data", CachingStaticFiles(directory=str(settings.data_dir)), name="data")
 
 # ルートの登録
-from app.routes import export, manual, process, videos
+from app.routes import export, jobs, manual, process, videos
 
 app.include_router(videos.router, prefix="/videos", tags=["videos"])
 app.include_router(process.router, prefix="/process", tags=["process"])
 app.include_router(manual.router, prefix="/manual", tags=["manual"])
 app.include_router(export.router, prefix="/export", tags=["export"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 
 if __name__ == "__main__":
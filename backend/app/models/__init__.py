@@ -5,11 +5,17 @@ from .schemas import (
     CaptureSelectionRequest,
     ExportRequest,
     ExportResponse,
+    ImageRendition,
+    Job,
     ManualPlan,
     ManualStep,
+    MediaInfo,
     ProcessStatusResponse,
+    ResumableUploadCreate,
+    ResumableUploadStatus,
     SceneDetectionResult,
     SceneInfo,
+    TimelineSprites,
     Transcription,
     TranscriptionSegment,
     VideoUploadResponse,
@@ -18,13 +24,19 @@ from .schemas import (
 __all__ = [
     "TranscriptionSegment",
     "Transcription",
+    "ImageRendition",
     "SceneInfo",
     "SceneDetectionResult",
+    "TimelineSprites",
+    "MediaInfo",
     "ManualStep",
     "ManualPlan",
     "VideoUploadResponse",
+    "ResumableUploadCreate",
+    "ResumableUploadStatus",
     "ProcessStatusResponse",
     "CaptureSelectionRequest",
     "ExportRequest",
     "ExportResponse",
+    "Job",
 ]
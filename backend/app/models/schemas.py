@@ -3,7 +3,7 @@ Pydantic models for API requests/responses and data schemas.
 """
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
@@ -36,11 +36,24 @@ class Transcription(BaseModel):
 # ============================================================================
 
 
+class ImageRendition(BaseModel):
+    """キャプチャ画像の縮小版 (srcset 用)"""
+
+    name: str = Field(description="用途 (thumb / screen / print)")
+    width: int = Field(description="幅 (px)")
+    height: int = Field(description="高さ (px)")
+    format: str = Field(description="画像形式 (webp / avif / jpg)")
+    path: str = Field(description="画像のパス")
+
+
 class SceneInfo(BaseModel):
     """シーン情報"""
 
     time: float = Field(description="シーン切替時刻 (秒)")
     frame_path: str = Field(description="キャプチャ画像のパス")
+    renditions: list[ImageRendition] = Field(
+        default_factory=list, description="縮小版 (幅の昇順)"
+    )
 
 
 class SceneDetectionResult(BaseModel):
@@ -50,6 +63,49 @@ class SceneDetectionResult(BaseModel):
     scenes: list[SceneInfo] = Field(description="シーンリスト")
 
 
+# ============================================================================
+# Timeline Sprite Schemas
+# ============================================================================
+
+
+class TimelineSprites(BaseModel):
+    """タイムラインのスプライトシートと WebVTT サムネイル"""
+
+    video_id: str = Field(description="動画ID")
+    interval_sec: float = Field(description="サムネイル間隔 (秒)")
+    tile_width: int = Field(description="サムネイル幅 (px)")
+    tile_height: int = Field(description="サムネイル高さ (px)")
+    columns: int = Field(description="1 シートの列数")
+    rows: int = Field(description="1 シートの行数")
+    count: int = Field(description="サムネイル数")
+    sheets: list[str] = Field(description="スプライトシートの URL")
+    vtt_url: str = Field(description="WebVTT サムネイルトラックの URL")
+
+
+# ============================================================================
+# Media Info Schemas
+# ============================================================================
+
+
+class MediaInfo(BaseModel):
+    """メディア情報 (ffprobe の結果を型付けしたもの)"""
+
+    duration_sec: Optional[float] = Field(default=None, description="長さ (秒)")
+    format_name: Optional[str] = Field(default=None, description="コンテナ形式")
+    size_bytes: Optional[int] = Field(default=None, description="ファイルサイズ")
+    bit_rate: Optional[int] = Field(default=None, description="ビットレート (bps)")
+    has_video: bool = Field(default=False, description="映像ストリームの有無")
+    width: Optional[int] = Field(default=None, description="幅 (px)")
+    height: Optional[int] = Field(default=None, description="高さ (px)")
+    fps: Optional[float] = Field(default=None, description="フレームレート")
+    frame_count: Optional[int] = Field(default=None, description="フレーム数")
+    video_codec: Optional[str] = Field(default=None, description="映像コーデック")
+    has_audio: bool = Field(default=False, description="音声ストリームの有無")
+    audio_codec: Optional[str] = Field(default=None, description="音声コーデック")
+    sample_rate: Optional[int] = Field(default=None, description="サンプリングレート (Hz)")
+    channels: Optional[int] = Field(default=None, description="チャンネル数")
+
+
 # ============================================================================
 # Manual Plan Schemas (RQ-003, RQ-004)
 # ============================================================================
@@ -62,6 +118,9 @@ class ManualStep(BaseModel):
     narration: str = Field(description="ナレーション (セリフ)")
     note: Optional[str] = Field(default=None, description="注意事項・メモ")
     image: Optional[str] = Field(default=None, description="キャプチャ画像パス")
+    image_renditions: list[ImageRendition] = Field(
+        default_factory=list, description="キャプチャ画像の縮小版 (幅の昇順)"
+    )
     start: float = Field(description="開始時刻 (秒)")
     end: float = Field(description="終了時刻 (秒)")
     selected: bool = Field(default=True, description="採用フラグ")
@@ -88,15 +147,50 @@ class VideoUploadResponse(BaseModel):
     filename: str = Field(description="ファイル名")
     size_bytes: int = Field(description="ファイルサイズ")
     duration_sec: Optional[float] = Field(default=None, description="動画の長さ")
+    sha256: Optional[str] = Field(default=None, description="ファイルの SHA-256")
+    media_info: Optional[MediaInfo] = Field(default=None, description="メディア情報")
+    duplicate_of: Optional[str] = Field(
+        default=None, description="同一内容の既存動画ID (重複アップロードの場合)"
+    )
+    available_stages: list[str] = Field(
+        default_factory=list, description="既存動画から引き継いだ処理済みステージ"
+    )
+
+
+class ResumableUploadCreate(BaseModel):
+    """再開可能アップロード作成リクエスト"""
+
+    filename: str = Field(description="ファイル名")
+    size_bytes: int = Field(gt=0, description="ファイルサイズ")
+
+
+class ResumableUploadStatus(BaseModel):
+    """再開可能アップロードの状態"""
+
+    upload_id: str = Field(description="アップロードID (完了後は動画IDとして使用)")
+    filename: str = Field(description="ファイル名")
+    size_bytes: int = Field(description="ファイルサイズ")
+    offset: int = Field(description="先頭から連続して受信済みのバイト数")
+    received_bytes: int = Field(description="受信済みバイト数 (順不同の合計)")
+    missing_ranges: list[list[int]] = Field(description="未受信の範囲 [start, end)")
+    completed: bool = Field(description="全範囲を受信済みか")
+    sha256: Optional[str] = Field(default=None, description="ファイルの SHA-256 (完了後)")
+    duplicate_of: Optional[str] = Field(
+        default=None, description="同一内容の既存動画ID (重複アップロードの場合)"
+    )
+    available_stages: list[str] = Field(
+        default_factory=list, description="既存動画から引き継いだ処理済みステージ"
+    )
 
 
 class ProcessStatusResponse(BaseModel):
     """処理ステータスレスポンス"""
 
     video_id: str = Field(description="動画ID")
-    status: str = Field(description="ステータス (processing, completed, failed)")
+    status: str = Field(description="ステータス (queued, processing, completed, failed)")
     message: str = Field(description="ステータスメッセージ")
     output_path: Optional[str] = Field(default=None, description="出力ファイルパス")
+    job_id: Optional[str] = Field(default=None, description="ジョブID (ワーカーモード時)")
 
 
 class CaptureSelectionRequest(BaseModel):
@@ -112,7 +206,7 @@ class ExportRequest(BaseModel):
     """エクスポートリクエスト"""
 
     video_id: str = Field(description="動画ID")
-    format: str = Field(default="markdown", description="出力形式 (markdown, pdf)")
+    format: str = Field(default="markdown", description="出力形式 (markdown, pdf, html)")
     template: Optional[str] = Field(default=None, description="テンプレート名")
 
 
@@ -123,3 +217,29 @@ class ExportResponse(BaseModel):
     format: str = Field(description="出力形式")
     output_path: str = Field(description="出力ファイルパス")
     download_url: str = Field(description="ダウンロードURL")
+    content_hash: str = Field(description="入力 (計画・テンプレート・画像・設定) のハッシュ")
+    cached: bool = Field(default=False, description="既存の成果物を再利用したか")
+
+
+# ============================================================================
+# Job Queue Schemas (multi-node workers)
+# ============================================================================
+
+
+class Job(BaseModel):
+    """ワーカーが処理するジョブ"""
+
+    job_id: str = Field(description="ジョブID (UUID)")
+    video_id: str = Field(description="動画ID")
+    stage: str = Field(description="ステージ (transcription, scenes, markdown, pdf, html)")
+    params: dict[str, Any] = Field(default_factory=dict, description="ステージのパラメータ")
+    status: str = Field(
+        default="queued", description="ステータス (queued, running, completed, failed)"
+    )
+    attempts: int = Field(default=0, description="試行回数")
+    worker_id: Optional[str] = Field(default=None, description="処理中のワーカーID")
+    lease_expires_at: Optional[float] = Field(default=None, description="リース期限 (UNIX 時刻)")
+    result: Optional[dict[str, Any]] = Field(default=None, description="処理結果")
+    error: Optional[str] = Field(default=None, description="エラーメッセージ")
+    created_at: datetime = Field(default_factory=datetime.now, description="作成日時")
+    updated_at: datetime = Field(default_factory=datetime.now, description="更新日時")
@@ -1,6 +1,6 @@
 """
 API routes.
 """
-from . import export, manual, process, videos
+from . import export, jobs, manual, process, videos
 
-__all__ = ["videos", "process", "manual", "export"]
+__all__ = ["videos", "process", "manual", "export", "jobs"]
@@ -1,19 +1,30 @@
 """
-Export endpoints (Markdown, PDF).
+Export endpoints (Markdown, PDF, HTML, ZIP bundle).
 """
-from pathlib import Path
+import asyncio
+from typing import Optional
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 
 from app.core import logger, settings
 from app.models import ExportRequest, ExportResponse, ManualPlan
-from app.services.export import PDFExporter
-from app.services.template import TemplateRenderer
+from app.services.export import iter_bundle
+from app.services.jobs import dispatch_stage
+from app.services.pipeline import StageResult, cached_export
+from app.services.template import get_template_renderer
 
 router = APIRouter()
 
 
+async def _export(video_id: str, stage: str, template: Optional[str]) -> StageResult:
+    """入力が変わっていなければ既存の成果物を返し、変わっていればステージを実行"""
+    cached = await asyncio.to_thread(cached_export, video_id, stage, template)
+    if cached is not None:
+        return cached
+    return await dispatch_stage(video_id, stage, {"template_name": template})
+
+
 @router.post("/markdown", response_model=ExportResponse)
 async def export_markdown(request: ExportRequest) -> ExportResponse:
     """
@@ -28,30 +39,51 @@ async def export_markdown(request: ExportRequest) -> ExportResponse:
     video_id = request.video_id
     logger.info(f"Exporting manual as Markdown for video: {video_id}")
 
-    # マニュアル計画を取得
+    # マニュアル計画を確認
     plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
     if not plan_path.exists():
         raise HTTPException(status_code=404, detail="マニュアル計画が見つかりません")
 
-    plan = ManualPlan.model_validate_json(plan_path.read_text(encoding="utf-8"))
-
-    # テンプレートレンダリング
-    renderer = TemplateRenderer()
-    # デフォルトテンプレートが存在しない場合は作成
-    renderer.create_default_template()
-
-    output_path = settings.export_dir / video_id / "manual.md"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # テンプレートレンダリング (計画・テンプレートが変わっていなければ再利用)
+    result = await _export(video_id, "markdown", request.template)
 
-    await renderer.render(plan, request.template, output_path)
-
-    logger.info(f"Markdown exported: {output_path}")
+    logger.info(f"Markdown exported: {result.output_path} (cached={result.cached})")
 
     return ExportResponse(
         video_id=video_id,
         format="markdown",
-        output_path=str(output_path),
+        output_path=str(result.output_path),
         download_url=f"/export/download/{video_id}/manual.md",
+        content_hash=result.input_hash,
+        cached=result.cached,
+    )
+
+
+@router.get("/markdown/{video_id}/stream")
+async def stream_markdown(video_id: str, template: Optional[str] = None) -> StreamingResponse:
+    """
+    Stream the manual as Markdown while it is being rendered (not saved to disk).
+
+    Args:
+        video_id: Video UUID
+        template: Template filename (default: settings.default_template)
+
+    Returns:
+        StreamingResponse with the rendered Markdown
+    """
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    if not plan_path.exists():
+        raise HTTPException(status_code=404, detail="マニュアル計画が見つかりません")
+
+    plan = ManualPlan.model_validate_json(plan_path.read_text(encoding="utf-8"))
+    renderer = get_template_renderer()
+    renderer.create_default_template()
+    # テンプレートが存在しない場合はレスポンス開始前にエラーになる
+    chunks = renderer.iter_render(plan, template)
+    return StreamingResponse(
+        chunks,
+        media_type="text/markdown; charset=utf-8",
+        headers={"Content-Disposition": 'inline; filename="manual.md"'},
     )
 
 
@@ -69,26 +101,90 @@ async def export_pdf(request: ExportRequest) -> ExportResponse:
     video_id = request.video_id
     logger.info(f"Exporting manual as PDF for video: {video_id}")
 
-    # まず Markdown を生成
-    md_path = settings.export_dir / video_id / "manual.md"
-    if not md_path.exists():
-        # Markdown が存在しない場合は先に生成
-        await export_markdown(request)
-
-    # PDF に変換
-    pdf_exporter = PDFExporter()
-    pdf_path = settings.export_dir / video_id / "manual.pdf"
-    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    if not plan_path.exists():
+        raise HTTPException(status_code=404, detail="マニュアル計画が見つかりません")
 
-    await pdf_exporter.markdown_to_pdf(md_path, pdf_path)
+    # Markdown の鮮度を確認した上で PDF に変換
+    result = await _export(video_id, "pdf", request.template)
 
-    logger.info(f"PDF exported: {pdf_path}")
+    logger.info(f"PDF exported: {result.output_path} (cached={result.cached})")
 
     return ExportResponse(
         video_id=video_id,
         format="pdf",
-        output_path=str(pdf_path),
+        output_path=str(result.output_path),
         download_url=f"/export/download/{video_id}/manual.pdf",
+        content_hash=result.input_hash,
+        cached=result.cached,
+    )
+
+
+@router.post("/html", response_model=ExportResponse)
+async def export_html(request: ExportRequest) -> ExportResponse:
+    """
+    Export manual as a self-contained HTML page (no browser is started).
+
+    Args:
+        request: ExportRequest with video_id
+
+    Returns:
+        ExportResponse with output path (download_url opens the page in the browser)
+    """
+    video_id = request.video_id
+    logger.info(f"Exporting manual as HTML for video: {video_id}")
+
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    if not plan_path.exists():
+        raise HTTPException(status_code=404, detail="マニュアル計画が見つかりません")
+
+    result = await _export(video_id, "html", request.template)
+
+    logger.info(f"HTML exported: {result.output_path} (cached={result.cached})")
+
+    # 画像は相対 URL のため、/data 配下の URL でそのまま表示する
+    return ExportResponse(
+        video_id=video_id,
+        format="html",
+        output_path=str(result.output_path),
+        download_url=f"/data/exports/{video_id}/manual.html",
+        content_hash=result.input_hash,
+        cached=result.cached,
+    )
+
+
+@router.get("/bundle/{video_id}")
+async def export_bundle(video_id: str, template: Optional[str] = None) -> StreamingResponse:
+    """
+    Download the manual as a ZIP of the Markdown and the images it references.
+
+    Image links are rewritten to paths inside the archive, so the bundle works offline.
+    The archive is streamed while it is built (no temporary file).
+
+    Args:
+        video_id: Video UUID
+        template: Template filename (default: settings.default_template)
+
+    Returns:
+        StreamingResponse with the ZIP archive
+    """
+    logger.info(f"Exporting manual bundle for video: {video_id}")
+
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    if not plan_path.exists():
+        raise HTTPException(status_code=404, detail="マニュアル計画が見つかりません")
+
+    # Markdown は通常のエクスポートと同じく、入力が変わっていなければ再利用する
+    result = await _export(video_id, "markdown", template)
+    md_content = result.output_path.read_text(encoding="utf-8")
+
+    return StreamingResponse(
+        iter_bundle(md_content),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="manual.zip"',
+            "ETag": f'"{result.input_hash}"',
+        },
     )
 
 
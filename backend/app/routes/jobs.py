@@ -0,0 +1,43 @@
+"""
+Job queue endpoints (worker mode).
+"""
+from fastapi import APIRouter, HTTPException
+
+from app.core import settings
+from app.models import Job
+from app.services.jobs import get_job_queue
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_job_stats() -> dict:
+    """
+    Get job counts by status.
+
+    Returns:
+        Job backend name and counts
+    """
+    queue = get_job_queue()
+    return {
+        "backend": settings.job_backend,
+        "jobs": await queue.stats() if queue is not None else {},
+    }
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str) -> Job:
+    """
+    Get job status and result.
+
+    Args:
+        job_id: Job UUID
+
+    Returns:
+        Job data
+    """
+    queue = get_job_queue()
+    job = await queue.get(job_id) if queue is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+    return job
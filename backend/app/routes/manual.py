@@ -1,6 +1,7 @@
 """
 Manual planning and editing endpoints.
 """
+import asyncio
 from pathlib import Path
 from typing import Optional
 
@@ -10,6 +11,7 @@ from pydantic import BaseModel
 from app.core import logger, settings
 from app.models import CaptureSelectionRequest, ManualPlan, SceneDetectionResult, Transcription
 from app.services.capture import ManualPlanner
+from app.services.pipeline import record_plan
 
 router = APIRouter()
 
@@ -57,10 +59,8 @@ async def create_manual_plan(request: CreatePlanRequest) -> ManualPlan:
     planner = ManualPlanner()
     plan = await planner.create_plan(transcription, scene_result, request.title)
 
-    # 結果を保存
-    output_path = settings.intermediate_dir / video_id / "manual_plan.json"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(plan.model_dump_json(indent=2), encoding="utf-8")
+    # 結果を保存 (下流のエクスポートは無効化される)
+    await asyncio.to_thread(record_plan, video_id, plan)
 
     logger.info(f"Manual plan created: {len(plan.steps)} steps")
 
@@ -94,7 +94,7 @@ async def apply_capture_selection(request: CaptureSelectionRequest) -> ManualPla
             plan.steps[step_index].selected = selected
 
     # 更新を保存
-    plan_path.write_text(plan.model_dump_json(indent=2), encoding="utf-8")
+    await asyncio.to_thread(record_plan, video_id, plan)
 
     logger.info(f"Capture selection applied: {len(request.selections)} changes")
 
@@ -134,9 +134,7 @@ async def update_manual_plan(video_id: str, plan: ManualPlan) -> ManualPlan:
     logger.info(f"Updating manual plan for video: {video_id}")
 
     # 保存
-    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
-    plan_path.parent.mkdir(parents=True, exist_ok=True)
-    plan_path.write_text(plan.model_dump_json(indent=2), encoding="utf-8")
+    await asyncio.to_thread(record_plan, video_id, plan)
 
     logger.info("Manual plan updated")
 
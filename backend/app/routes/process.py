@@ -1,89 +1,85 @@
 """
-Video processing endpoints (STT, scene detection).
+Video processing endpoints (STT, scene detection, timeline sprites).
 """
-import json
-from pathlib import Path
+import asyncio
+from typing import Optional
 
 from fastapi import APIRouter, HTTPException
 
-from app.core import logger, settings
-from app.models import ProcessStatusResponse, SceneDetectionResult, Transcription
-from app.services.scenes import OpenCVSceneDetector
-from app.services.stt import get_stt_engine
-from app.services.summarizer import get_summarizer
-from app.utils import FFmpegWrapper
+from app.core import AdmissionRejectedError, logger, settings
+from app.models import (
+    ProcessStatusResponse,
+    SceneDetectionResult,
+    TimelineSprites,
+    Transcription,
+)
+from app.services.jobs import dispatch_stage, get_job_queue
+from app.services.pipeline import StageManifest, find_source_video
 
 router = APIRouter()
-ffmpeg = FFmpegWrapper()
+
+
+async def _enqueue(video_id: str, stage: str) -> Optional[ProcessStatusResponse]:
+    """ワーカーモードならジョブを登録して即時に返す (local の場合は None)"""
+    queue = get_job_queue()
+    if queue is None:
+        return None
+
+    job = await queue.enqueue(video_id, stage, {})
+    return ProcessStatusResponse(
+        video_id=video_id,
+        status=job.status,
+        message=f"ジョブを登録しました ({stage})",
+        output_path=None,
+        job_id=job.job_id,
+    )
 
 
 @router.post("/transcribe/{video_id}", response_model=ProcessStatusResponse)
-async def transcribe_video(video_id: str) -> ProcessStatusResponse:
+async def transcribe_video(video_id: str, wait: bool = True) -> ProcessStatusResponse:
     """
     Perform speech-to-text on uploaded video.
 
     Args:
         video_id: Video UUID
+        wait: Wait for completion (False returns the queued job in worker mode)
 
     Returns:
         ProcessStatusResponse with transcription status
     """
     logger.info(f"Starting transcription for video: {video_id}")
 
-    # 動画パス取得
-    video_dir = settings.upload_dir / video_id
-    video_files = list(video_dir.glob("source.*"))
-    if not video_files:
+    if find_source_video(video_id) is None:
         raise HTTPException(status_code=404, detail="動画が見つかりません")
 
-    video_path = video_files[0]
+    if not wait:
+        queued = await _enqueue(video_id, "transcription")
+        if queued is not None:
+            return queued
 
     try:
-        # 音声抽出
-        audio_path = settings.intermediate_dir / video_id / "audio.wav"
-        audio_path.parent.mkdir(parents=True, exist_ok=True)
-        ffmpeg.extract_audio(video_path, audio_path)
-
-        # STT 実行
-        stt_engine = get_stt_engine()
-        transcription = await stt_engine.transcribe(audio_path, video_path.name)
-
-        # 文字起こしテキストを結合
-        full_text = " ".join([seg.text for seg in transcription.segments])
-
-        # GPTで要約を実行
-        if settings.openai_api_key:
-            try:
-                logger.info(f"Starting summarization for video: {video_id}")
-                summarizer = get_summarizer()
-                summary = await summarizer.summarize(full_text)
-                transcription.summary = summary
-                logger.info(f"Summarization completed: {video_id}")
-            except Exception as e:
-                logger.warning(f"Summarization failed, continuing without summary: {e}")
-                transcription.summary = None
-        else:
-            logger.info("OpenAI API key not configured, skipping summarization")
-            transcription.summary = None
-
-        # 結果を保存
-        output_path = settings.intermediate_dir / video_id / "transcription.json"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(transcription.model_dump_json(indent=2), encoding="utf-8")
-
-        logger.info(f"Transcription completed: {video_id}")
+        result = await dispatch_stage(video_id, "transcription")
+        transcription = Transcription.model_validate_json(
+            result.output_path.read_text(encoding="utf-8")
+        )
+
+        logger.info(f"Transcription completed: {video_id} (cached={result.cached})")
 
         message = f"{len(transcription.segments)} セグメントを認識しました"
         if transcription.summary:
             message += " (要約完了)"
+        if result.cached:
+            message += " (キャッシュ済み)"
 
         return ProcessStatusResponse(
             video_id=video_id,
             status="completed",
             message=message,
-            output_path=str(output_path),
+            output_path=str(result.output_path),
         )
 
+    except AdmissionRejectedError:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
         return ProcessStatusResponse(
@@ -95,48 +91,48 @@ async def transcribe_video(video_id: str) -> ProcessStatusResponse:
 
 
 @router.post("/scene-detect/{video_id}", response_model=ProcessStatusResponse)
-async def detect_scenes(video_id: str) -> ProcessStatusResponse:
+async def detect_scenes(video_id: str, wait: bool = True) -> ProcessStatusResponse:
     """
     Detect scene changes and extract keyframes.
 
     Args:
         video_id: Video UUID
+        wait: Wait for completion (False returns the queued job in worker mode)
 
     Returns:
         ProcessStatusResponse with scene detection status
     """
     logger.info(f"Starting scene detection for video: {video_id}")
 
-    # 動画パス取得
-    video_dir = settings.upload_dir / video_id
-    video_files = list(video_dir.glob("source.*"))
-    if not video_files:
+    if find_source_video(video_id) is None:
         raise HTTPException(status_code=404, detail="動画が見つかりません")
 
-    video_path = video_files[0]
+    if not wait:
+        queued = await _enqueue(video_id, "scenes")
+        if queued is not None:
+            return queued
 
     try:
-        # シーン検出
-        detector = OpenCVSceneDetector()
-        capture_dir = settings.capture_dir / video_id
-        capture_dir.mkdir(parents=True, exist_ok=True)
-
-        scene_result = await detector.detect_scenes(video_path, capture_dir)
+        result = await dispatch_stage(video_id, "scenes")
+        scene_result = SceneDetectionResult.model_validate_json(
+            result.output_path.read_text(encoding="utf-8")
+        )
 
-        # 結果を保存
-        output_path = settings.intermediate_dir / video_id / "scenes.json"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(scene_result.model_dump_json(indent=2), encoding="utf-8")
+        logger.info(f"Scene detection completed: {video_id} (cached={result.cached})")
 
-        logger.info(f"Scene detection completed: {video_id}")
+        message = f"{len(scene_result.scenes)} シーンを検出しました"
+        if result.cached:
+            message += " (キャッシュ済み)"
 
         return ProcessStatusResponse(
             video_id=video_id,
             status="completed",
-            message=f"{len(scene_result.scenes)} シーンを検出しました",
-            output_path=str(output_path),
+            message=message,
+            output_path=str(result.output_path),
         )
 
+    except AdmissionRejectedError:
+        raise
     except Exception as e:
         logger.error(f"Scene detection failed: {e}")
         return ProcessStatusResponse(
@@ -147,6 +143,57 @@ async def detect_scenes(video_id: str) -> ProcessStatusResponse:
         )
 
 
+@router.post("/sprites/{video_id}", response_model=ProcessStatusResponse)
+async def generate_sprites(video_id: str, wait: bool = True) -> ProcessStatusResponse:
+    """
+    Generate timeline sprite sheets and the WebVTT thumbnail track.
+
+    Args:
+        video_id: Video UUID
+        wait: Wait for completion (False returns the queued job in worker mode)
+
+    Returns:
+        ProcessStatusResponse with sprite generation status
+    """
+    logger.info(f"Starting sprite generation for video: {video_id}")
+
+    if find_source_video(video_id) is None:
+        raise HTTPException(status_code=404, detail="動画が見つかりません")
+
+    if not wait:
+        queued = await _enqueue(video_id, "sprites")
+        if queued is not None:
+            return queued
+
+    try:
+        result = await dispatch_stage(video_id, "sprites")
+        sprites = TimelineSprites.model_validate_json(
+            result.output_path.read_text(encoding="utf-8")
+        )
+
+        message = f"{len(sprites.sheets)} シートに {sprites.count} 枚のサムネイルを生成しました"
+        if result.cached:
+            message += " (キャッシュ済み)"
+
+        return ProcessStatusResponse(
+            video_id=video_id,
+            status="completed",
+            message=message,
+            output_path=str(result.output_path),
+        )
+
+    except AdmissionRejectedError:
+        raise
+    except Exception as e:
+        logger.error(f"Sprite generation failed: {e}")
+        return ProcessStatusResponse(
+            video_id=video_id,
+            status="failed",
+            message=str(e),
+            output_path=None,
+        )
+
+
 @router.get("/transcribe/{video_id}", response_model=Transcription)
 async def get_transcription(video_id: str) -> Transcription:
     """
@@ -181,3 +228,39 @@ async def get_scenes(video_id: str) -> SceneDetectionResult:
         raise HTTPException(status_code=404, detail="シーン検出結果が見つかりません")
 
     return SceneDetectionResult.model_validate_json(scenes_path.read_text(encoding="utf-8"))
+
+
+@router.get("/sprites/{video_id}", response_model=TimelineSprites)
+async def get_sprites(video_id: str) -> TimelineSprites:
+    """
+    Get timeline sprite sheets and the WebVTT track URL.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        TimelineSprites data
+    """
+    sprites_path = settings.intermediate_dir / video_id / "sprites.json"
+    if not sprites_path.exists():
+        raise HTTPException(status_code=404, detail="スプライトが見つかりません")
+
+    return TimelineSprites.model_validate_json(sprites_path.read_text(encoding="utf-8"))
+
+
+@router.get("/manifest/{video_id}")
+async def get_stage_manifest(video_id: str) -> dict:
+    """
+    Get recorded stage input hashes for a video.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        Mapping of stage name to its manifest entry
+    """
+    if find_source_video(video_id) is None:
+        raise HTTPException(status_code=404, detail="動画が見つかりません")
+
+    stages = await asyncio.to_thread(StageManifest(video_id).stages)
+    return {"video_id": video_id, "stages": stages}
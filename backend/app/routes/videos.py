@@ -1,37 +1,97 @@
 """
 Video upload and management endpoints.
 """
+import asyncio
 import shutil
 import uuid
+from collections.abc import AsyncIterator
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
 
 from app.core import ValidationError, logger, settings
-from app.models import VideoUploadResponse
-from app.utils import FFmpegWrapper
+from app.models import (
+    MediaInfo,
+    ResumableUploadCreate,
+    ResumableUploadStatus,
+    VideoUploadResponse,
+)
+from app.services.frames import frame_server
+from app.services.jobs import submit_stage
+from app.services.pipeline import StageManifest
+from app.services.uploads import (
+    ResumableUpload,
+    deduplicate_async,
+    missing_ranges,
+    sweep_expired_uploads,
+)
+from app.utils import MultipartFileStream, media_probe, save_upload_stream
 
 router = APIRouter()
-ffmpeg = FFmpegWrapper()
 
 
-@router.post("/upload", response_model=VideoUploadResponse)
-async def upload_video(file: UploadFile = File(...)) -> VideoUploadResponse:
+# multipart のヘッダー・境界分の余裕 (Content-Length による事前チェック用)
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/upload", response_model=VideoUploadResponse, openapi_extra=_UPLOAD_OPENAPI)
+async def upload_video(request: Request) -> VideoUploadResponse:
     """
     Upload a video file for processing.
 
+    リクエスト本文をストリームで受け取り、チャンク単位で非同期に書き込む。
+    サイズ上限超過・コンテナ不一致はアップロード完了を待たずに中断する。
+
     Args:
-        file: Video file upload
+        request: multipart/form-data request with a ``file`` field
 
     Returns:
         VideoUploadResponse with video_id and metadata
     """
+    max_bytes = settings.max_video_size_mb * 1024 * 1024
+
+    # Content-Length が明らかに上限を超えていれば本文を読まずに拒否
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes + _MULTIPART_OVERHEAD_BYTES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"ファイルサイズが大きすぎます。最大: {settings.max_video_size_mb}MB",
+            )
+
+    try:
+        stream = MultipartFileStream(request.headers.get("content-type", ""))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    chunks = stream.iter_file(request.stream())
+    try:
+        first_chunk = await anext(chunks, b"")
+    except Exception as e:
+        logger.error(f"Failed to parse upload: {e}")
+        raise HTTPException(status_code=400, detail="アップロードの解析に失敗しました")
+
     # バリデーション: 拡張子
-    if not file.filename:
+    if not stream.filename:
         raise HTTPException(status_code=400, detail="ファイル名が不正です")
 
-    ext = Path(file.filename).suffix.lower().lstrip(".")
+    ext = Path(stream.filename).suffix.lower().lstrip(".")
     if ext not in settings.get_video_extensions():
         raise HTTPException(
             status_code=400,
@@ -41,44 +101,223 @@ async def upload_video(file: UploadFile = File(...)) -> VideoUploadResponse:
     # UUID ベースの保存
     video_id = str(uuid.uuid4())
     video_dir = settings.upload_dir / video_id
-    video_dir.mkdir(parents=True, exist_ok=True)
-
     video_path = video_dir / f"source.{ext}"
 
-    # ファイル保存
+    async def body() -> AsyncIterator[bytes]:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+
+    # ファイル保存 (サイズ・ハッシュ・ヘッダー判定を同一パスで実施)
     try:
-        with video_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        result = await save_upload_stream(body(), video_path, ext, max_bytes)
+    except ValidationError as e:
+        shutil.rmtree(video_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        shutil.rmtree(video_dir, ignore_errors=True)
         logger.error(f"Failed to save video: {e}")
         raise HTTPException(status_code=500, detail="動画の保存に失敗しました")
 
-    # サイズチェック
-    size_mb = video_path.stat().st_size / (1024 * 1024)
-    if size_mb > settings.max_video_size_mb:
-        video_path.unlink()
-        raise HTTPException(
-            status_code=400,
-            detail=f"ファイルサイズが大きすぎます。最大: {settings.max_video_size_mb}MB",
-        )
+    # ハッシュを記録 (パイプラインでの再計算を省略)
+    await asyncio.to_thread(StageManifest(video_id).remember_digest, video_path, result.sha256)
 
-    # 動画情報取得
-    try:
-        duration = ffmpeg.get_video_duration(video_path)
-    except Exception as e:
-        logger.warning(f"Failed to get duration: {e}")
-        duration = None
+    # 同一内容の動画があればファイルと処理済み成果物を共有
+    dedup = await deduplicate_async(video_id, video_path, result.sha256)
+
+    # 動画情報を取得し、解析用プロキシと音声をバックグラウンドで生成
+    media_info = await _after_upload(video_id, video_path)
 
-    logger.info(f"Video uploaded: {video_id} ({file.filename}, {size_mb:.2f}MB)")
+    size_mb = result.size_bytes / (1024 * 1024)
+    logger.info(f"Video uploaded: {video_id} ({stream.filename}, {size_mb:.2f}MB)")
 
     return VideoUploadResponse(
         video_id=video_id,
-        filename=file.filename or "unknown",
-        size_bytes=video_path.stat().st_size,
-        duration_sec=duration,
+        filename=stream.filename,
+        size_bytes=result.size_bytes,
+        duration_sec=media_info.duration_sec if media_info else None,
+        sha256=result.sha256,
+        media_info=media_info,
+        duplicate_of=dedup.duplicate_of,
+        available_stages=dedup.available_stages,
+    )
+
+
+async def _after_upload(video_id: str, video_path: Path) -> Optional[MediaInfo]:
+    """
+    Probe the uploaded video once and start post-upload processing.
+
+    メディア情報はキャッシュされ、以降のステージは ffprobe を再実行しない。
+    前処理 (解析用プロキシ・16 kHz 音声) はバックグラウンドで実行する。
+
+    Args:
+        video_id: Video UUID
+        video_path: Uploaded source file
+
+    Returns:
+        MediaInfo, or None if probing failed
+    """
+    try:
+        media_info = await media_probe.probe(video_path)
+    except Exception as e:
+        logger.warning(f"Failed to probe video: {e}")
+        media_info = None
+
+    if settings.proxy_enabled:
+        try:
+            await submit_stage(video_id, "proxy")
+        except Exception as e:
+            logger.warning(f"Failed to start post-upload processing for {video_id}: {e}")
+    return media_info
+
+
+# ============================================================================
+# Resumable Upload (tus 風: 作成 → PATCH でオフセット指定書き込み → HEAD で再開位置取得)
+# ============================================================================
+
+
+def _upload_status(upload: ResumableUpload, state: dict) -> ResumableUploadStatus:
+    """アップロード状態をレスポンスに変換"""
+    received = sum(end - start for start, end in state["ranges"])
+    return ResumableUploadStatus(
+        upload_id=upload.upload_id,
+        filename=state["filename"],
+        size_bytes=state["size_bytes"],
+        offset=ResumableUpload.contiguous_offset(state),
+        received_bytes=received,
+        missing_ranges=missing_ranges(state["ranges"], state["size_bytes"]),
+        completed=state["completed"],
+        sha256=state["sha256"],
+        duplicate_of=state.get("duplicate_of"),
+        available_stages=state.get("available_stages", []),
     )
 
 
+def _upload_headers(response: Response, status: ResumableUploadStatus) -> None:
+    """再開用ヘッダーを付与"""
+    response.headers["Upload-Offset"] = str(status.offset)
+    response.headers["Upload-Length"] = str(status.size_bytes)
+    response.headers["Cache-Control"] = "no-store"
+
+
+def _get_upload(upload_id: str) -> ResumableUpload:
+    """アップロードを取得 (存在しない場合は 404)"""
+    upload = ResumableUpload(upload_id)
+    if not upload.exists():
+        raise HTTPException(status_code=404, detail="アップロードが見つかりません")
+    return upload
+
+
+@router.post("/uploads", response_model=ResumableUploadStatus, status_code=201)
+async def create_resumable_upload(
+    request: ResumableUploadCreate, response: Response
+) -> ResumableUploadStatus:
+    """
+    Create a resumable upload and preallocate its file.
+
+    Args:
+        request: Filename and total size
+
+    Returns:
+        ResumableUploadStatus (upload_id is used as the video_id once completed)
+    """
+    await sweep_expired_uploads()
+    try:
+        upload = ResumableUpload.create(request.filename, request.size_bytes)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    status = _upload_status(upload, upload.load())
+    _upload_headers(response, status)
+    response.headers["Location"] = f"/videos/uploads/{upload.upload_id}"
+    return status
+
+
+@router.head("/uploads/{upload_id}")
+async def head_resumable_upload(upload_id: str) -> Response:
+    """
+    Get the resume offset of an upload via headers.
+
+    Args:
+        upload_id: Upload ID
+
+    Returns:
+        Empty response with Upload-Offset / Upload-Length headers
+    """
+    upload = _get_upload(upload_id)
+    response = Response(status_code=200)
+    _upload_headers(response, _upload_status(upload, upload.load()))
+    return response
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(upload_id: str, response: Response) -> ResumableUploadStatus:
+    """
+    Get the state of an upload including missing ranges.
+
+    Args:
+        upload_id: Upload ID
+
+    Returns:
+        ResumableUploadStatus
+    """
+    upload = _get_upload(upload_id)
+    status = _upload_status(upload, upload.load())
+    _upload_headers(response, status)
+    return status
+
+
+@router.patch("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def patch_resumable_upload(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+) -> ResumableUploadStatus:
+    """
+    Write a chunk at ``Upload-Offset`` (chunks may arrive in any order).
+
+    Args:
+        upload_id: Upload ID
+        request: Raw chunk body (application/offset+octet-stream)
+        upload_offset: Byte offset of the chunk
+
+    Returns:
+        ResumableUploadStatus after writing the chunk
+    """
+    upload = _get_upload(upload_id)
+    try:
+        state, finalized = await upload.write_chunk(upload_offset, request.stream())
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 確定させたリクエストだけが後処理を開始する (同時に最後の範囲を送った場合も 1 回)
+    if finalized:
+        await _after_upload(upload_id, upload.video_path(state))
+
+    status = _upload_status(upload, state)
+    _upload_headers(response, status)
+    return status
+
+
+@router.delete("/uploads/{upload_id}")
+async def delete_resumable_upload(upload_id: str):
+    """
+    Discard an unfinished upload.
+
+    Args:
+        upload_id: Upload ID
+
+    Returns:
+        Success message
+    """
+    upload = _get_upload(upload_id)
+    if upload.load()["completed"]:
+        raise HTTPException(status_code=409, detail="完了済みのアップロードは削除できません")
+    upload.delete()
+    return {"message": "アップロードを破棄しました", "upload_id": upload_id}
+
+
 @router.get("/{video_id}")
 async def get_video_info(video_id: str):
     """
@@ -101,9 +340,54 @@ async def get_video_info(video_id: str):
 
     video_path = video_files[0]
 
+    # メディア情報 (キャッシュ済みなら ffprobe は実行しない)
+    try:
+        media_info = (await media_probe.probe(video_path)).model_dump()
+    except Exception as e:
+        logger.warning(f"Failed to probe video: {e}")
+        media_info = None
+
     return {
         "video_id": video_id,
         "filename": video_path.name,
         "size_bytes": video_path.stat().st_size,
         "path": str(video_path),
+        "media_info": media_info,
     }
+
+
+@router.get("/{video_id}/frame")
+async def get_video_frame(
+    video_id: str,
+    t: float = Query(..., ge=0.0, description="Time in seconds"),
+    w: Optional[int] = Query(None, ge=16, description="Output width"),
+    format: Literal["jpg", "png", "webp"] = Query("jpg"),
+) -> Response:
+    """
+    Get the frame at a timestamp (for swapping a step's image in the review UI).
+
+    開いたままのデコーダーから取得し、エンコード済みの画像はメモリにキャッシュする。
+
+    Args:
+        video_id: Video UUID
+        t: Time in seconds
+        w: Output width (keeps aspect ratio)
+        format: Image format
+
+    Returns:
+        Image response (X-Frame-Time: time of the returned frame)
+    """
+    try:
+        frame = await frame_server.get_frame(video_id, t, w, format)
+    except ValidationError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return Response(
+        content=frame.data,
+        media_type=frame.media_type,
+        headers={
+            "Cache-Control": "private, max-age=3600",
+            "X-Frame-Time": f"{frame.timestamp:.3f}",
+            "X-Cache": "HIT" if frame.cached else "MISS",
+        },
+    )
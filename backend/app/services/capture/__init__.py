@@ -2,5 +2,21 @@
 Capture and manual planning services.
 """
 from .planner import ManualPlanner
+from .renditions import (
+    RENDITION_DIRNAME,
+    find_rendition_file,
+    generate_renditions,
+    pick_rendition,
+    render_frame,
+    rendition_widths,
+)
 
-__all__ = ["ManualPlanner"]
+__all__ = [
+    "ManualPlanner",
+    "RENDITION_DIRNAME",
+    "find_rendition_file",
+    "generate_renditions",
+    "pick_rendition",
+    "render_frame",
+    "rendition_widths",
+]
@@ -4,7 +4,7 @@ Manual planning logic - merging transcription segments with scene changes.
 from typing import Optional
 
 from app.core import logger, settings
-from app.models import ManualPlan, ManualStep, SceneDetectionResult, Transcription
+from app.models import ManualPlan, ManualStep, SceneDetectionResult, SceneInfo, Transcription
 
 
 class ManualPlanner:
@@ -110,22 +110,23 @@ class ManualPlanner:
             title = title[:30] + "..."
 
         # 対応するキャプチャ画像を検索
-        image = self._find_matching_image(step_data["start"], step_data["end"], scene_result)
+        scene = self._find_matching_scene(step_data["start"], step_data["end"], scene_result)
 
         return ManualStep(
             title=title,
             narration=narration,
             note=None,  # 後で手動で追加可能
-            image=image,
+            image=scene.frame_path if scene else None,
+            image_renditions=scene.renditions if scene else [],
             start=step_data["start"],
             end=step_data["end"],
             selected=True,  # デフォルトで採用
         )
 
-    def _find_matching_image(
+    def _find_matching_scene(
         self, start: float, end: float, scene_result: SceneDetectionResult
-    ) -> Optional[str]:
-        """ステップの時間範囲に対応するキャプチャ画像を検索"""
+    ) -> Optional[SceneInfo]:
+        """ステップの時間範囲に対応するシーン (キャプチャ画像) を検索"""
         # ステップの中間時刻
         mid_time = (start + end) / 2
 
@@ -149,4 +150,4 @@ class ManualPlanner:
                     min_diff = diff
                     best_scene = scene
 
-        return best_scene.frame_path if best_scene else None
+        return best_scene
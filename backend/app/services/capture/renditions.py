@@ -0,0 +1,134 @@
+"""
+Multi-resolution renditions of captured keyframes.
+
+キャプチャ画像毎に一覧用 (thumb)・画面用 (screen)・印刷用 (print) の縮小版を
+WebP / AVIF で生成し、SceneInfo.renditions に記録する (srcset 用)。
+元画像より大きいサイズは生成せず、同じ幅になる場合は同じファイルを共有する。
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import cv2
+
+from app.core import executors, logger, settings
+from app.models import ImageRendition, SceneInfo
+from app.utils import atomic_write_bytes, encode_image, link_or_copy, resize_to_width
+
+RENDITION_DIRNAME = "renditions"
+
+
+def rendition_widths() -> dict[str, int]:
+    """用途毎の幅 (設定値)"""
+    return {
+        "thumb": settings.rendition_thumb_width,
+        "screen": settings.rendition_screen_width,
+        "print": settings.rendition_print_width,
+    }
+
+
+def render_frame(
+    frame_path: str, output_dir: str, widths: dict[str, int], image_format: str, quality: int
+) -> list[ImageRendition]:
+    """
+    Write the renditions of one captured frame (runs in the vision pool).
+
+    Args:
+        frame_path: Captured frame (full resolution)
+        output_dir: Directory for the renditions
+        widths: Rendition name to target width
+        image_format: "webp", "avif" or "jpg"
+        quality: Encoder quality (0-100)
+
+    Returns:
+        Renditions sorted by width
+    """
+    image = cv2.imread(frame_path)
+    if image is None:
+        logger.warning(f"Failed to read capture for renditions: {frame_path}")
+        return []
+
+    source = Path(frame_path)
+    directory = Path(output_dir)
+    written: dict[int, Path] = {}
+    renditions: list[ImageRendition] = []
+    for name, width in sorted(widths.items(), key=lambda item: item[1]):
+        resized = resize_to_width(image, min(width, image.shape[1]))
+        path = directory / f"{source.stem}.{name}.{image_format}"
+        width = resized.shape[1]
+        if width in written:
+            # 元画像が小さく同じ幅になる場合はリンクで共有
+            link_or_copy(written[width], path)
+        else:
+            atomic_write_bytes(path, encode_image(resized, image_format, quality))
+            written[width] = path
+        renditions.append(
+            ImageRendition(
+                name=name,
+                width=width,
+                height=resized.shape[0],
+                format=image_format,
+                path=str(path),
+            )
+        )
+    return renditions
+
+
+async def generate_renditions(scenes: list[SceneInfo], capture_dir: Path) -> None:
+    """
+    Generate renditions for every scene in parallel and record them on the scenes.
+
+    Args:
+        scenes: Scenes whose ``frame_path`` point at full-resolution captures
+        capture_dir: Capture directory (renditions go to its ``renditions/`` subdirectory)
+    """
+    output_dir = capture_dir / RENDITION_DIRNAME
+    output_dir.mkdir(parents=True, exist_ok=True)
+    widths = rendition_widths()
+    results = await asyncio.gather(
+        *(
+            executors.run(
+                "vision",
+                render_frame,
+                scene.frame_path,
+                str(output_dir),
+                widths,
+                settings.rendition_format,
+                settings.rendition_quality,
+            )
+            for scene in scenes
+        )
+    )
+    for scene, renditions in zip(scenes, results):
+        scene.renditions = renditions
+    logger.info(f"Renditions generated for {len(scenes)} captures in {output_dir}")
+
+
+def pick_rendition(renditions: list[ImageRendition], min_width: int) -> Optional[ImageRendition]:
+    """
+    Pick the smallest rendition at least ``min_width`` wide.
+
+    Args:
+        renditions: Available renditions
+        min_width: Required width in pixels
+
+    Returns:
+        Rendition (the largest one if none is wide enough), or None if there are none
+    """
+    ordered = sorted(renditions, key=lambda r: r.width)
+    return next((r for r in ordered if r.width >= min_width), ordered[-1] if ordered else None)
+
+
+def find_rendition_file(frame_path: Path, name: str) -> Optional[Path]:
+    """
+    Find a rendition next to a capture by naming convention.
+
+    Args:
+        frame_path: Full-resolution capture path
+        name: Rendition name (thumb / screen / print)
+
+    Returns:
+        Rendition path, or None if it has not been generated
+    """
+    directory = frame_path.parent / RENDITION_DIRNAME
+    return next(iter(sorted(directory.glob(f"{frame_path.stem}.{name}.*"))), None)
@@ -1,6 +1,24 @@
 """
 Export services.
 """
-from .pdf_exporter import PDFExporter
+from .browser_pool import BrowserPool, browser_pool
+from .bundle import iter_bundle, rewrite_image_links
+from .html import MANUAL_CSS, build_manual_html
+from .html_exporter import SCREEN_CSS, HTMLExporter
+from .pdf_exporter import PDFExporter, resolve_image_path
+from .weasyprint_engine import WeasyPrintEngine, weasyprint_engine
 
-__all__ = ["PDFExporter"]
+__all__ = [
+    "HTMLExporter",
+    "MANUAL_CSS",
+    "BrowserPool",
+    "PDFExporter",
+    "SCREEN_CSS",
+    "WeasyPrintEngine",
+    "browser_pool",
+    "build_manual_html",
+    "iter_bundle",
+    "resolve_image_path",
+    "rewrite_image_links",
+    "weasyprint_engine",
+]
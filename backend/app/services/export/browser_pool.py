@@ -0,0 +1,264 @@
+"""
+Warm Playwright Chromium pool for PDF export.
+
+エクスポート毎に Chromium を起動・終了せず、lifespan が所有する常駐ブラウザを使い回す。
+- ブラウザ毎の同時ページ (コンテキスト) 数を制限する
+- 一定数のジョブを処理したブラウザは、実行中のページがなくなった時点で再起動する
+- 切断されたブラウザは破棄し、次の要求で起動し直す
+"""
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from app.core import ExportError, logger, settings
+
+# ブラウザ起動関数 (テスト等で差し替え可能)
+BrowserLauncher = Callable[[], Awaitable[Any]]
+
+
+class _PooledBrowser:
+    """プール内のブラウザ"""
+
+    def __init__(self, browser: Any):
+        self.browser = browser
+        self.active = 0
+        self.jobs = 0
+        self.retiring = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """Playwright Chromium の常駐プール"""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        pages_per_browser: Optional[int] = None,
+        max_jobs_per_browser: Optional[int] = None,
+        launcher: Optional[BrowserLauncher] = None,
+    ):
+        """
+        Initialize browser pool.
+
+        Args:
+            size: Maximum number of browsers
+            pages_per_browser: Maximum concurrent pages (contexts) per browser
+            max_jobs_per_browser: Recycle a browser after this many pages
+            launcher: Coroutine function returning a launched browser (default: Playwright)
+        """
+        self.size = size or settings.browser_pool_size
+        self.pages_per_browser = pages_per_browser or settings.browser_pages_per_browser
+        self.max_jobs_per_browser = max_jobs_per_browser or settings.browser_max_jobs_per_browser
+        self._launcher = launcher
+        self._playwright: Any = None
+        self._browsers: list[_PooledBrowser] = []
+        self._launching = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.launched = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    def _get_condition(self) -> asyncio.Condition:
+        # イベントループが変わった場合 (テスト・ワーカー再起動等) は状態を作り直す
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            if self._browsers:
+                logger.warning("Browser pool used from a new event loop, discarding browsers")
+            self._browsers = []
+            self._playwright = None
+            self._launching = 0
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    async def start(self) -> None:
+        """
+        Launch the first browser ahead of the first export.
+
+        Raises:
+            ExportError: If Playwright is not installed or the browser cannot be launched
+        """
+        condition = self._get_condition()
+        async with condition:
+            if self._browsers or self._launching:
+                return
+            self._launching += 1
+        await self._add_browser()
+
+    async def _launch(self) -> Any:
+        """ブラウザを起動"""
+        if self._launcher is not None:
+            return await self._launcher()
+        if self._playwright is None:
+            try:
+                from playwright.async_api import async_playwright
+            except ImportError:
+                raise ExportError(
+                    "Playwright not installed. Run: pip install playwright && playwright install"
+                )
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(
+            timeout=settings.browser_launch_timeout_sec * 1000
+        )
+
+    async def _add_browser(self) -> _PooledBrowser:
+        """ブラウザを起動してプールに追加 (呼び出し前に _launching を加算しておくこと)"""
+        condition = self._get_condition()
+        try:
+            browser = _PooledBrowser(await self._launch())
+        except BaseException:
+            async with condition:
+                self._launching -= 1
+                condition.notify_all()
+            raise
+        async with condition:
+            self._launching -= 1
+            self._browsers.append(browser)
+            self.launched += 1
+            condition.notify_all()
+        logger.info(f"Browser launched ({len(self._browsers)}/{self.size})")
+        return browser
+
+    async def _acquire(self) -> _PooledBrowser:
+        """空きのあるブラウザを確保 (なければ起動、上限なら待機)"""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                self._discard_dead()
+                candidates = [
+                    b for b in self._browsers if b.healthy and b.active < self.pages_per_browser
+                ]
+                if candidates:
+                    browser = min(candidates, key=lambda b: b.active)
+                    browser.active += 1
+                    return browser
+                if len(self._browsers) + self._launching < self.size:
+                    self._launching += 1
+                    break
+                await condition.wait()
+
+        browser = await self._add_browser()
+        async with condition:
+            browser.active += 1
+        return browser
+
+    def _discard_dead(self) -> None:
+        """切断されたブラウザをプールから外す"""
+        for browser in list(self._browsers):
+            if not browser.browser.is_connected():
+                self._browsers.remove(browser)
+                self.crashed += 1
+                logger.warning("Browser disconnected, removed from pool")
+
+    async def _release(self, browser: _PooledBrowser) -> None:
+        """ページを返却し、必要ならブラウザを再起動対象にする"""
+        condition = self._get_condition()
+        to_close: Optional[_PooledBrowser] = None
+        async with condition:
+            browser.active -= 1
+            browser.jobs += 1
+            if browser.jobs >= self.max_jobs_per_browser:
+                browser.retiring = True
+            if browser.retiring and browser.active == 0 and browser in self._browsers:
+                self._browsers.remove(browser)
+                to_close = browser
+                self.recycled += 1
+            condition.notify_all()
+        if to_close is not None:
+            logger.info(f"Recycling browser after {to_close.jobs} jobs")
+            await self._close_browser(to_close)
+
+    @staticmethod
+    async def _close_browser(browser: _PooledBrowser) -> None:
+        try:
+            await browser.browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """
+        Borrow a fresh page in its own browser context.
+
+        Yields:
+            Playwright Page (its context is closed afterwards)
+
+        Raises:
+            ExportError: If no browser can be launched
+        """
+        browser = await self._acquire()
+        try:
+            context, page = await self._open_page(browser)
+        except Exception:
+            await self._release(browser)
+            if browser.browser.is_connected():
+                raise
+            # ブラウザが落ちていた場合は破棄して 1 度だけ起動し直す
+            logger.warning("Browser died before page creation, relaunching")
+            browser = await self._acquire()
+            try:
+                context, page = await self._open_page(browser)
+            except BaseException:
+                await self._release(browser)
+                raise
+        except BaseException:
+            await self._release(browser)
+            raise
+
+        try:
+            yield page
+        finally:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser context: {e}")
+            await self._release(browser)
+
+    @staticmethod
+    async def _open_page(browser: _PooledBrowser) -> tuple[Any, Any]:
+        """新しいコンテキストとページを作成"""
+        context = await browser.browser.new_context()
+        try:
+            return context, await context.new_page()
+        except BaseException:
+            await context.close()
+            raise
+
+    async def close(self) -> None:
+        """すべてのブラウザと Playwright を終了"""
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            return
+        browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            await self._close_browser(browser)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Failed to stop Playwright: {e}")
+            self._playwright = None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Browser count, active pages and launch / recycle / crash counters
+        """
+        return {
+            "browsers": len(self._browsers),
+            "max_browsers": self.size,
+            "pages_per_browser": self.pages_per_browser,
+            "active_pages": sum(b.active for b in self._browsers),
+            "launched": self.launched,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+        }
+
+
+browser_pool = BrowserPool()
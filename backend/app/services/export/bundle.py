@@ -0,0 +1,126 @@
+"""
+Streaming ZIP bundle export (Markdown + referenced images).
+
+- Markdown の画像リンクを ZIP 内の相対パス (images/...) に書き換え、参照されている画像だけを同梱する
+- ZIP は一時ファイルを作らずに生成しながら送信する
+  (各エントリはデータディスクリプタ付きで書き出すためシーク不要)。
+  送信待ちのバッファはチャンク 1 つ分だけなので、数百 MB のバンドルでもメモリは一定
+- 画像 (JPEG/PNG/WebP 等) は圧縮済みのため無圧縮 (stored)、Markdown のみ deflate で格納する
+"""
+import re
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+
+from .pdf_exporter import _IMAGE_PATTERN, resolve_image_path
+
+# ZIP 内の配置
+BUNDLE_MARKDOWN_NAME = "manual.md"
+BUNDLE_IMAGE_DIR = "images"
+
+# 画像ファイルの読み込み単位 (送信チャンクの大きさ)
+BUNDLE_CHUNK_SIZE = 256 * 1024
+
+
+class _ZipStream:
+    """書き込まれたバイト列を溜めておき、取り出すと空になるシーク不可のストリーム"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _bundle_image_name(source: Path, used: set[str]) -> str:
+    """ZIP 内の画像パス (ファイル名が重複する場合は連番を付ける)"""
+    name = source.name
+    counter = 1
+    while f"{BUNDLE_IMAGE_DIR}/{name}" in used:
+        counter += 1
+        name = f"{source.stem}_{counter}{source.suffix}"
+    return f"{BUNDLE_IMAGE_DIR}/{name}"
+
+
+def rewrite_image_links(md_content: str) -> tuple[str, dict[str, Path]]:
+    """
+    Rewrite image links of a manual to paths inside the bundle.
+
+    Images that do not exist on the server keep their original link and are not bundled.
+
+    Args:
+        md_content: Markdown manual
+
+    Returns:
+        Tuple of (rewritten Markdown, bundle path to local image file)
+    """
+    links: dict[str, str] = {}
+    images: dict[str, Path] = {}
+    for match in _IMAGE_PATTERN.finditer(md_content):
+        ref = match.group(2)
+        if ref in links:
+            continue
+        source = resolve_image_path(ref)
+        if not source.is_file():
+            continue
+        name = _bundle_image_name(source, set(images))
+        links[ref] = name
+        images[name] = source
+
+    def replace(match: re.Match) -> str:
+        ref = match.group(2)
+        if ref not in links:
+            return match.group(0)
+        return f"![{match.group(1)}]({links[ref]})"
+
+    return _IMAGE_PATTERN.sub(replace, md_content), images
+
+
+def iter_bundle(md_content: str, chunk_size: int = BUNDLE_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Generate a ZIP bundle of a manual and its images chunk by chunk.
+
+    The archive is written to the iterator as it is built; nothing is buffered beyond
+    one chunk, so the iterator can feed a StreamingResponse directly.
+
+    Args:
+        md_content: Markdown manual (image links as written by the template)
+        chunk_size: Bytes read from each image at a time
+
+    Yields:
+        ZIP archive bytes
+    """
+    markdown, images = rewrite_image_links(md_content)
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w") as archive:
+        archive.writestr(
+            BUNDLE_MARKDOWN_NAME, markdown.encode("utf-8"), compress_type=zipfile.ZIP_DEFLATED
+        )
+        yield stream.drain()
+
+        for name, source in images.items():
+            info = zipfile.ZipInfo.from_file(source, name)
+            info.compress_type = zipfile.ZIP_STORED
+            with open(source, "rb") as src, archive.open(info, "w") as dest:
+                while data := src.read(chunk_size):
+                    dest.write(data)
+                    if buffered := stream.drain():
+                        yield buffered
+            # データディスクリプタ
+            yield stream.drain()
+    # セントラルディレクトリ
+    yield stream.drain()
@@ -0,0 +1,178 @@
+"""
+Chunked PDF rendering for very large manuals.
+
+数百ステップのマニュアルをステップ単位のチャンクに分割して並列に PDF 化し、1 つの PDF に結合する。
+- チャンクはページ番号なしで生成し、結合後に全ページ数で作ったページ番号 PDF を重ねる
+  (ページ番号 PDF は本文と同じエンジン・同じフッター設定で生成するため、
+  通常モードと同じ見た目になる)
+- しおり (目次) は各チャンクのしおりを結合後のページ位置に付け替えて 1 つの階層に再構成する
+"""
+import re
+from typing import Any, Optional
+
+from app.core import ExportError
+
+# ステップの見出し (テンプレートの "## Step N: ...")
+_STEP_HEADING = re.compile(r"^## ")
+_FENCE = re.compile(r"^(```|~~~)")
+_HEADING = re.compile(r"^(#{1,6})\s")
+
+
+def split_markdown(md_content: str, steps_per_chunk: int) -> list[str]:
+    """
+    Split a Markdown manual into chunks of step sections.
+
+    The text before the first step (front matter, title, introduction) stays in the first
+    chunk and the text after the last step stays in the last chunk.
+
+    Args:
+        md_content: Markdown manual
+        steps_per_chunk: Step sections (level-2 headings) per chunk
+
+    Returns:
+        Markdown chunks in document order (a single chunk if the manual is small)
+    """
+    chunks: list[list[str]] = [[]]
+    steps_in_chunk = 0
+    in_fence = False
+    for line in md_content.splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _STEP_HEADING.match(line):
+            if steps_in_chunk == steps_per_chunk:
+                chunks.append([])
+                steps_in_chunk = 0
+            steps_in_chunk += 1
+        chunks[-1].append(line)
+    return ["".join(lines) for lines in chunks]
+
+
+def heading_levels(md_content: str) -> list[int]:
+    """
+    Get the levels of the headings of a Markdown chunk in order.
+
+    Args:
+        md_content: Markdown text
+
+    Returns:
+        Heading levels (0 for "#", 1 for "##", ...)
+    """
+    levels: list[int] = []
+    in_fence = False
+    for line in md_content.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and (match := _HEADING.match(line)):
+            levels.append(len(match.group(1)) - 1)
+    return levels
+
+
+def page_stamp_html(pages: int) -> str:
+    """
+    Build a document of blank pages whose only content is the page-number footer.
+
+    Args:
+        pages: Total number of pages
+
+    Returns:
+        HTML document with ``pages`` empty pages
+    """
+    breaks = '<div style="break-after: page"></div>\n' * (pages - 1)
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body>
+{breaks}</body>
+</html>
+"""
+
+
+def _import_pypdf() -> Any:
+    try:
+        import pypdf
+    except ImportError:
+        raise ExportError("pypdf not installed. Run: pip install pypdf")
+    return pypdf
+
+
+def count_pdf_pages(paths: list[str]) -> int:
+    """
+    Count the pages of PDF files.
+
+    Args:
+        paths: PDF files
+
+    Returns:
+        Total number of pages
+
+    Raises:
+        ExportError: If pypdf is not installed
+    """
+    pypdf = _import_pypdf()
+    return sum(len(pypdf.PdfReader(path).pages) for path in paths)
+
+
+def _flatten_outline(reader: Any, items: list[Any], level: int = 0) -> list[tuple[int, str, int]]:
+    """しおりを (階層, タイトル, ページ番号) のリストに展開"""
+    result: list[tuple[int, str, int]] = []
+    for item in items:
+        if isinstance(item, list):
+            result.extend(_flatten_outline(reader, item, level + 1))
+            continue
+        page = reader.get_destination_page_number(item)
+        if page is not None and page >= 0:
+            result.append((level, str(item.title), page))
+    return result
+
+
+def merge_pdfs(
+    chunk_paths: list[str],
+    output_path: str,
+    stamp_path: str = "",
+    chunk_heading_levels: Optional[list[list[int]]] = None,
+) -> int:
+    """
+    Merge chunk PDFs into one PDF with continuous bookmarks and page numbers (export pool).
+
+    Args:
+        chunk_paths: Chunk PDFs in document order
+        output_path: Merged PDF path
+        stamp_path: PDF whose pages are overlaid on the merged pages (page numbers)
+        chunk_heading_levels: Markdown heading levels of each chunk; used as bookmark levels
+            so that chunks without the title heading nest like the first one
+
+    Returns:
+        Number of pages of the merged PDF
+
+    Raises:
+        ExportError: If pypdf is not installed
+    """
+    pypdf = _import_pypdf()
+    writer = pypdf.PdfWriter()
+    outline: list[tuple[int, str, int]] = []
+    for index, path in enumerate(chunk_paths):
+        reader = pypdf.PdfReader(path)
+        offset = len(writer.pages)
+        items = _flatten_outline(reader, reader.outline)
+        levels = chunk_heading_levels[index] if chunk_heading_levels else None
+        if levels is not None and len(levels) == len(items):
+            items = [(level, title, page) for level, (_, title, page) in zip(levels, items)]
+        outline.extend((level, title, offset + page) for level, title, page in items)
+        writer.append(reader, import_outline=False)
+
+    # 階層を保ったまましおりを付け直す (チャンク毎ではなく文書全体で 1 つのツリーにする)
+    parents: list[tuple[int, Any]] = []
+    for level, title, page in outline:
+        while parents and parents[-1][0] >= level:
+            parents.pop()
+        parent = parents[-1][1] if parents else None
+        parents.append((level, writer.add_outline_item(title, page, parent=parent)))
+
+    if stamp_path:
+        stamp = pypdf.PdfReader(stamp_path)
+        for page, stamp_page in zip(writer.pages, stamp.pages):
+            page.merge_page(stamp_page)
+
+    with open(output_path, "wb") as f:
+        writer.write(f)
+    return len(writer.pages)
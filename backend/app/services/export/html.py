@@ -0,0 +1,86 @@
+"""
+HTML document built from the Markdown manual (shared by the PDF engines and the HTML export).
+
+Playwright と WeasyPrint で同じ HTML / CSS を使い、どちらのエンジンでも同じ見た目にする。
+画像参照は Markdown のパスのまま残し、各エンジン (HTML エクスポートでは html_exporter) が解決する。
+"""
+from app.core import ExportError
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "nl2br"]
+
+MANUAL_CSS = """
+body {
+    font-family: "Segoe UI", "Hiragino Sans", "Meiryo", sans-serif;
+    line-height: 1.6;
+    max-width: 800px;
+    margin: 40px auto;
+    padding: 20px;
+}
+img {
+    max-width: 100%;
+    height: auto;
+    border: 1px solid #ddd;
+    margin: 10px 0;
+}
+h1, h2, h3 {
+    color: #333;
+    border-bottom: 2px solid #eee;
+    padding-bottom: 5px;
+}
+code {
+    background-color: #f5f5f5;
+    padding: 2px 5px;
+    border-radius: 3px;
+}
+blockquote {
+    border-left: 4px solid #ddd;
+    margin-left: 0;
+    padding-left: 15px;
+    color: #666;
+}
+"""
+
+
+def markdown_to_html(md_content: str) -> str:
+    """
+    Convert Markdown to an HTML fragment.
+
+    Args:
+        md_content: Markdown text
+
+    Returns:
+        HTML fragment
+
+    Raises:
+        ExportError: If the markdown package is not installed
+    """
+    try:
+        import markdown
+    except ImportError:
+        raise ExportError("Markdown not installed. Run: pip install markdown")
+    return markdown.markdown(md_content, extensions=MARKDOWN_EXTENSIONS)
+
+
+def build_manual_html(md_content: str, css: str = MANUAL_CSS, head: str = "") -> str:
+    """
+    Build the complete HTML document of a manual.
+
+    Args:
+        md_content: Markdown text
+        css: Stylesheet embedded in the document
+        head: Extra elements for <head> (title, viewport, ...)
+
+    Returns:
+        HTML document
+    """
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">{head}
+    <style>{css}</style>
+</head>
+<body>
+    {markdown_to_html(md_content)}
+</body>
+</html>
+"""
@@ -0,0 +1,147 @@
+"""
+HTML export service (on-screen manual).
+
+PDF と同じ HTML ビルダーで 1 ファイルの HTML を生成する
+(ブラウザを起動しないため数ミリ秒で完了する)。
+- スタイルシートは埋め込み、外部の CSS / JavaScript は読み込まない
+- 画像には縮小版 (thumb / screen / print) の srcset と loading="lazy" を付け、
+  表示幅に合った画像を表示位置に近づいた時点で読み込む
+- 画像 URL は出力先からの相対パスのため、/data 配信でもデータディレクトリを直接開いても表示できる
+"""
+import html
+import os
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from PIL import Image
+
+from app.core import executors, logger, settings
+from app.services.capture import find_rendition_file, rendition_widths
+from app.utils import atomic_write_text
+
+from .html import MANUAL_CSS, build_manual_html
+from .pdf_exporter import resolve_image_path
+
+# 画面表示用のスタイル (PDF と同じ CSS + 狭い画面向けの余白)
+SCREEN_CSS = (
+    MANUAL_CSS
+    + """
+@media (max-width: 840px) {
+    body {
+        margin: 0 auto;
+        padding: 12px;
+    }
+}
+"""
+)
+
+# 画像の表示幅 (body の max-width に合わせる)
+IMAGE_SIZES = "(max-width: 840px) calc(100vw - 24px), 800px"
+
+_IMG_TAG = re.compile(r"<img\b[^>]*>")
+_ATTRIBUTE = re.compile(r'(\w+)="([^"]*)"')
+_TITLE = re.compile(r"^# (.+)$", re.MULTILINE)
+
+
+def _image_size(path: Path) -> Optional[tuple[int, int]]:
+    """画像の (幅, 高さ) をヘッダーから取得 (読み込めない場合は None)"""
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+def _image_candidates(source: Path) -> list[tuple[Path, int, int]]:
+    """srcset の候補 (縮小版 + 元画像) を幅の昇順で取得 (同じ幅は小さい用途のものを使う)"""
+    candidates: dict[int, tuple[Path, int, int]] = {}
+    for name, _ in sorted(rendition_widths().items(), key=lambda item: item[1]):
+        rendition = find_rendition_file(source, name)
+        size = _image_size(rendition) if rendition else None
+        if size and size[0] not in candidates:
+            candidates[size[0]] = (rendition, *size)
+    size = _image_size(source)
+    if size and size[0] not in candidates:
+        candidates[size[0]] = (source, *size)
+    return [candidates[width] for width in sorted(candidates)]
+
+
+def _relative_url(path: Path, base_dir: Path) -> str:
+    """出力先ディレクトリからの相対 URL"""
+    return quote(Path(os.path.relpath(path.resolve(), base_dir.resolve())).as_posix())
+
+
+def responsive_img_tag(tag: str, base_dir: Path) -> str:
+    """
+    Rewrite an <img> tag into a lazily loaded responsive image.
+
+    Args:
+        tag: <img> tag produced from the Markdown
+        base_dir: Directory the HTML document is written to
+
+    Returns:
+        <img> tag with srcset / sizes / width / height and lazy loading
+        (only lazy loading is added if the image does not exist on the server)
+    """
+    attributes = dict(_ATTRIBUTE.findall(tag))
+    alt = attributes.get("alt", "")
+    src = attributes.get("src", "")
+    candidates = _image_candidates(resolve_image_path(html.unescape(src))) if src else []
+    if not candidates:
+        return f'<img alt="{alt}" src="{src}" loading="lazy" decoding="async">'
+
+    # src は srcset 非対応のブラウザ用 (画面用の幅以上で最小のもの)
+    screen_width = settings.rendition_screen_width
+    fallback = next((c for c in candidates if c[1] >= screen_width), candidates[-1])
+    srcset = ", ".join(f"{_relative_url(path, base_dir)} {width}w" for path, width, _ in candidates)
+    _, width, height = candidates[-1]
+    return (
+        f'<img alt="{alt}" src="{_relative_url(fallback[0], base_dir)}" srcset="{srcset}" '
+        f'sizes="{IMAGE_SIZES}" width="{width}" height="{height}" loading="lazy" decoding="async">'
+    )
+
+
+def build_screen_html(md_content: str, base_dir: str) -> str:
+    """
+    Build the self-contained on-screen HTML document of a manual (runs in the export pool).
+
+    Args:
+        md_content: Markdown manual
+        base_dir: Directory the HTML document is written to (image URLs are relative to it)
+
+    Returns:
+        HTML document
+    """
+    title = _TITLE.search(md_content)
+    head = (
+        '\n    <meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"\n    <title>{html.escape(title.group(1).strip()) if title else 'Manual'}</title>"
+    )
+    document = build_manual_html(md_content, css=SCREEN_CSS, head=head)
+    return _IMG_TAG.sub(lambda m: responsive_img_tag(m.group(0), Path(base_dir)), document)
+
+
+class HTMLExporter:
+    """Markdown → HTML 変換 (画面表示用)"""
+
+    async def markdown_to_html(self, markdown_path: Path, output_path: Path) -> Path:
+        """
+        Convert a Markdown manual to a self-contained HTML page.
+
+        Args:
+            markdown_path: Markdown file path
+            output_path: HTML output path
+
+        Returns:
+            Path to the generated HTML file
+        """
+        md_content = markdown_path.read_text(encoding="utf-8")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        document = await executors.run(
+            "export", build_screen_html, md_content, str(output_path.parent)
+        )
+        atomic_write_text(output_path, document)
+        logger.info(f"HTML exported: {output_path}")
+        return output_path
@@ -2,10 +2,80 @@
 PDF export service.
 """
 import asyncio
+import os
+import re
+import tempfile
 from pathlib import Path
 from typing import Optional
-
-from app.core import ExportError, logger, settings
+from urllib.parse import unquote, urljoin, urlsplit
+
+from app.core import ExportError, executors, logger, settings
+
+from .browser_pool import browser_pool
+from .chunked import count_pdf_pages, heading_levels, merge_pdfs, page_stamp_html, split_markdown
+from .html import build_manual_html
+from .print_images import prepare_print_images
+from .weasyprint_engine import weasyprint_engine
+
+# HTML と画像を配信する仮のオリジン (Playwright は page.route、WeasyPrint は URL fetcher で応答する)
+_PAGE_ORIGIN = "http://manual.local"
+
+# ページ番号のフッター (WeasyPrint は weasyprint_engine.PAGE_NUMBER_CSS)
+_FOOTER_TEMPLATE = (
+    '<div style="width: 100%; font-size: 9px; color: #666; text-align: center;">'
+    '<span class="pageNumber"></span> / <span class="totalPages"></span></div>'
+)
+
+# Markdown の画像参照 ![alt](path)
+_IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+
+_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".gif": "image/gif",
+}
+
+
+def resolve_image_path(img_path_str: str) -> Path:
+    """
+    Resolve an image path written in the manual to a local file.
+
+    Args:
+        img_path_str: Path as written in the plan / Markdown
+
+    Returns:
+        Local path (may not exist)
+    """
+    img_path = Path(img_path_str)
+    # 'data/' で始まる相対パスの場合
+    if img_path_str.startswith("data/"):
+        # settings.data_dir の親ディレクトリからの相対パスとして解決
+        img_path = Path.cwd() / img_path_str
+    # 絶対パスでない場合
+    elif not img_path.is_absolute():
+        img_path = settings.data_dir / img_path_str.lstrip("./")
+    return img_path
+
+
+def _page_path(ref: str) -> str:
+    """画像参照 (または要求 URL) をページのオリジン上のパスに正規化"""
+    return unquote(urlsplit(urljoin(f"{_PAGE_ORIGIN}/", ref)).path)
+
+
+async def _prepare_images(md_content: str) -> dict[str, Path]:
+    """ページ上の画像パスと印刷用画像の対応を作成 (存在しない画像は含まない)"""
+    sources = {
+        ref: resolve_image_path(ref)
+        for ref in dict.fromkeys(m.group(2) for m in _IMAGE_PATTERN.finditer(md_content))
+    }
+    sources = {ref: path for ref, path in sources.items() if path.exists()}
+    if not sources:
+        return {}
+    prepared = await prepare_print_images(list(sources.values()))
+    return {_page_path(ref): prepared[path] for ref, path in sources.items()}
 
 
 class PDFExporter:
@@ -24,6 +94,9 @@ class PDFExporter:
         """
         Convert Markdown to PDF.
 
+        Manuals with more than ``settings.pdf_chunk_steps`` steps are rendered in chunks
+        concurrently and merged (page numbers and bookmarks stay continuous).
+
         Args:
             markdown_path: Path to Markdown file
             output_path: Path to output PDF file
@@ -31,174 +104,114 @@ class PDFExporter:
         Returns:
             Path to generated PDF file
         """
-        logger.info(f"Converting Markdown to PDF using {self.engine}")
-
-        if self.engine == "playwright":
-            return await self._convert_with_playwright(markdown_path, output_path)
-        elif self.engine == "weasyprint":
-            return await self._convert_with_weasyprint(markdown_path, output_path)
-        else:
+        if self.engine not in ("playwright", "weasyprint"):
             raise ExportError(f"Unknown PDF engine: {self.engine}")
 
-    async def _convert_with_playwright(self, markdown_path: Path, output_path: Path) -> Path:
-        """Playwright を使用して PDF に変換"""
-        try:
-            from playwright.async_api import async_playwright
-            import markdown
-            import base64
-            import re
-
-            # Markdown を HTML に変換
-            md_content = markdown_path.read_text(encoding="utf-8")
-
-            # 画像パスを Base64 データ URI に変換
-            def replace_image_with_base64(match):
-                alt_text = match.group(1)
-                img_path_str = match.group(2)
-
-                logger.info(f"Processing image path: {img_path_str}")
-
-                # パスを正規化
-                img_path = Path(img_path_str)
-
-                # 'data/' で始まる相対パスの場合
-                if img_path_str.startswith('data/'):
-                    # settings.data_dir の親ディレクトリからの相対パスとして解決
-                    img_path = Path.cwd() / img_path_str
-                # 絶対パスでない場合
-                elif not img_path.is_absolute():
-                    img_path = settings.data_dir / img_path_str.lstrip('./')
-
-                logger.info(f"Resolved image path: {img_path}, exists: {img_path.exists()}")
-
-                if img_path.exists():
-                    try:
-                        with open(img_path, 'rb') as img_file:
-                            img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                            # 画像の拡張子から MIME タイプを判定
-                            ext = img_path.suffix.lower()
-                            mime_type = {
-                                '.jpg': 'image/jpeg',
-                                '.jpeg': 'image/jpeg',
-                                '.png': 'image/png',
-                                '.gif': 'image/gif',
-                            }.get(ext, 'image/jpeg')
-                            return f'![{alt_text}](data:{mime_type};base64,{img_data})'
-                    except Exception as e:
-                        logger.warning(f"Failed to encode image {img_path}: {e}")
-
-                return match.group(0)  # 失敗した場合は元のまま
-
-            # Markdown内の画像参照を Base64 に変換
-            md_content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', replace_image_with_base64, md_content)
-
-            html_content = markdown.markdown(
-                md_content,
-                extensions=["fenced_code", "tables", "nl2br"],
-            )
-
-            # スタイル付き HTML を作成
-            full_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{
-            font-family: "Segoe UI", "Hiragino Sans", "Meiryo", sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 40px auto;
-            padding: 20px;
-        }}
-        img {{
-            max-width: 100%;
-            height: auto;
-            border: 1px solid #ddd;
-            margin: 10px 0;
-        }}
-        h1, h2, h3 {{
-            color: #333;
-            border-bottom: 2px solid #eee;
-            padding-bottom: 5px;
-        }}
-        code {{
-            background-color: #f5f5f5;
-            padding: 2px 5px;
-            border-radius: 3px;
-        }}
-        blockquote {{
-            border-left: 4px solid #ddd;
-            margin-left: 0;
-            padding-left: 15px;
-            color: #666;
-        }}
-    </style>
-</head>
-<body>
-    {html_content}
-</body>
-</html>
-"""
+        md_content = markdown_path.read_text(encoding="utf-8")
+        chunks = (
+            split_markdown(md_content, settings.pdf_chunk_steps)
+            if settings.pdf_chunk_steps
+            else [md_content]
+        )
+        logger.info(f"Converting Markdown to PDF using {self.engine} ({len(chunks)} chunks)")
 
-            # Playwright で PDF 生成
+        try:
+            # 画像は印刷用に縮小しておき、仮のオリジン上の URL からファイルを直接返す
+            routes = await _prepare_images(md_content)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-                await page.set_content(full_html)
-                await page.pdf(
-                    path=str(output_path),
-                    format="A4",
-                    margin={
-                        "top": "20mm",
-                        "right": "20mm",
-                        "bottom": "20mm",
-                        "left": "20mm",
-                    },
-                )
-                await browser.close()
-
-            logger.info(f"PDF generated with Playwright: {output_path}")
-            return output_path
-
-        except ImportError as e:
-            raise ExportError(
-                f"Playwright not installed. Run: pip install playwright && playwright install"
-            )
+            if len(chunks) == 1:
+                await self._render(self._build_html(md_content), routes, output_path, True)
+            else:
+                await self._render_chunked(chunks, routes, output_path)
+        except ExportError:
+            raise
         except Exception as e:
-            logger.error(f"Playwright PDF export failed: {e}")
+            logger.error(f"{self.engine} PDF export failed: {e}")
             raise ExportError(f"PDF 生成に失敗しました: {e}")
 
-    async def _convert_with_weasyprint(self, markdown_path: Path, output_path: Path) -> Path:
-        """WeasyPrint を使用して PDF に変換"""
-        try:
-            import markdown
-            from weasyprint import HTML
-
-            # Markdown を HTML に変換
-            md_content = markdown_path.read_text(encoding="utf-8")
-            html_content = markdown.markdown(
-                md_content,
-                extensions=["fenced_code", "tables", "nl2br"],
-            )
+        logger.info(f"PDF generated with {self.engine}: {output_path}")
+        return output_path
 
-            # PDF 生成
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+    def _build_html(self, md_content: str) -> str:
+        """エンジン用の HTML を作成 (WeasyPrint はワーカーが読み込み済みのスタイルシートを使う)"""
+        if self.engine == "weasyprint":
+            return build_manual_html(md_content, css="")
+        return build_manual_html(md_content)
 
-            # 非同期実行
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: HTML(string=html_content).write_pdf(str(output_path)),
+    async def _render(
+        self, html: str, routes: dict[str, Path], output_path: Path, page_numbers: bool
+    ) -> None:
+        """HTML を PDF に変換"""
+        if self.engine == "playwright":
+            await self._render_with_playwright(html, routes, output_path, page_numbers)
+        else:
+            await weasyprint_engine.render(html, _PAGE_ORIGIN, routes, output_path, page_numbers)
+
+    async def _render_chunked(
+        self, chunks: list[str], routes: dict[str, Path], output_path: Path
+    ) -> None:
+        """チャンク毎に並列で PDF 化し、ページ番号を重ねて 1 つの PDF に結合"""
+        with tempfile.TemporaryDirectory(dir=output_path.parent, prefix=".chunks-") as tmp:
+            directory = Path(tmp)
+            chunk_paths = [directory / f"chunk_{i:04d}.pdf" for i in range(len(chunks))]
+            # 同時実行数はブラウザプール / WeasyPrint のプロセスプールで制限される
+            await asyncio.gather(
+                *(
+                    self._render(self._build_html(chunk), routes, path, False)
+                    for chunk, path in zip(chunks, chunk_paths)
+                )
             )
 
-            logger.info(f"PDF generated with WeasyPrint: {output_path}")
-            return output_path
-
-        except ImportError:
-            raise ExportError("WeasyPrint not installed. Run: pip install weasyprint")
-        except Exception as e:
-            logger.error(f"WeasyPrint PDF export failed: {e}")
-            raise ExportError(f"PDF 生成に失敗しました: {e}")
+            # 全体のページ数でページ番号だけの PDF を作り、結合時に各ページへ重ねる
+            pages = await executors.run("export", count_pdf_pages, [str(p) for p in chunk_paths])
+            stamp_path = directory / "page_numbers.pdf"
+            await self._render(page_stamp_html(pages), {}, stamp_path, True)
+
+            merged_path = directory / "merged.pdf"
+            await executors.run(
+                "export",
+                merge_pdfs,
+                [str(p) for p in chunk_paths],
+                str(merged_path),
+                str(stamp_path),
+                [heading_levels(chunk) for chunk in chunks],
+            )
+            os.replace(merged_path, output_path)
+        logger.info(f"Merged {len(chunks)} chunks into {pages} pages: {output_path}")
+
+    async def _render_with_playwright(
+        self, html: str, routes: dict[str, Path], output_path: Path, page_numbers: bool
+    ) -> None:
+        """Playwright (常駐ブラウザ) を使用して PDF に変換"""
+
+        async def handle_route(route):
+            path = _page_path(route.request.url)
+            if path == "/":
+                await route.fulfill(body=html, content_type="text/html; charset=utf-8")
+            elif path in routes:
+                image_path = routes[path]
+                await route.fulfill(
+                    path=str(image_path),
+                    content_type=_MIME_TYPES.get(image_path.suffix.lower(), "image/jpeg"),
+                )
+            else:
+                await route.fulfill(status=404)
+
+        # 常駐ブラウザのページを借りる (ジョブ毎のコンテキストは使用後に破棄)
+        async with browser_pool.page() as page:
+            await page.route(f"{_PAGE_ORIGIN}/**", handle_route)
+            await page.goto(f"{_PAGE_ORIGIN}/", wait_until="load")
+            await page.pdf(
+                path=str(output_path),
+                format="A4",
+                margin={
+                    "top": "20mm",
+                    "right": "20mm",
+                    "bottom": "20mm",
+                    "left": "20mm",
+                },
+                display_header_footer=page_numbers,
+                header_template="<span></span>",
+                footer_template=_FOOTER_TEMPLATE,
+                outline=True,
+            )
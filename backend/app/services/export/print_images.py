@@ -0,0 +1,149 @@
+"""
+Print-optimized images for PDF export.
+
+キャプチャ画像を印刷に必要な解像度 (本文幅 × DPI) まで縮小・再エンコードしてから埋め込む。
+非可逆の縮小版 (renditions) は使わず、元のキャプチャから 1 回だけエンコードする。
+生成した画像は (元画像のハッシュ, 幅, 形式, 品質) をキーにキャッシュし、
+エクスポート開始時にまとめて並列で準備する。
+キャッシュのファイル名には元画像のパスに由来する接頭辞を付け、キャプチャが撮り直されて
+新しい版を生成した時点で同じ元画像の古い版を削除する。
+"""
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2
+
+from app.core import ExportError, executors, logger, settings
+from app.utils import atomic_write_bytes, encode_image, resize_to_width, sha256_file
+
+PRINT_IMAGE_DIRNAME = "_print_images"
+
+# (パス, サイズ, 更新時刻) -> SHA-256 (同じキャプチャを毎回読み直さないため、LRU で保持数を制限)
+DIGEST_CACHE_SIZE = 4096
+_digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def print_image_width() -> int:
+    """印刷に必要な画像の幅 (ピクセル)"""
+    return round(settings.pdf_content_width_mm / 25.4 * settings.pdf_image_dpi)
+
+
+def print_image_dir() -> Path:
+    """印刷用画像のキャッシュディレクトリ"""
+    return settings.intermediate_dir / PRINT_IMAGE_DIRNAME
+
+
+def _source_digest(path: Path) -> str:
+    """元画像のハッシュ (サイズと更新時刻が同じ間はメモリ上の値を使う)"""
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+    digest = sha256_file(path)
+    with _digests_lock:
+        _digests[key] = digest
+        _digests.move_to_end(key)
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def _source_prefix(path: Path) -> str:
+    """キャッシュファイル名の接頭辞 (元画像のパス毎に一意)"""
+    return hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+
+
+def _remove_stale(prefix: str, current: Path) -> None:
+    """同じ元画像から生成した古い版を削除"""
+    for stale in print_image_dir().glob(f"{prefix}_*"):
+        if stale != current:
+            stale.unlink(missing_ok=True)
+
+
+def render_print_image(
+    source_path: str, output_path: str, width: int, image_format: str, quality: int
+) -> None:
+    """
+    Resize and re-encode one image for print (runs in the export pool).
+
+    Args:
+        source_path: Source image
+        output_path: Prepared image path
+        width: Target width in pixels (never upscaled)
+        image_format: "jpg", "png", "webp" or "avif"
+        quality: Encoder quality (0-100)
+
+    Raises:
+        ExportError: If the source image cannot be read
+    """
+    image = cv2.imread(source_path)
+    if image is None:
+        raise ExportError(f"画像を読み込めませんでした: {source_path}")
+    resized = resize_to_width(image, min(width, image.shape[1]))
+    atomic_write_bytes(Path(output_path), encode_image(resized, image_format, quality))
+
+
+def print_image_key(digest: str, width: int, image_format: str, quality: int) -> str:
+    """キャッシュキー (元画像のハッシュ, 幅, 形式, 品質)"""
+    payload = f"{digest}:{width}:{image_format}:{quality}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _prepare_one(path: Path, width: int, image_format: str, quality: int) -> tuple[Path, bool]:
+    """キャッシュ済みの画像を返す、なければ生成する (戻り値: パス, キャッシュ命中)"""
+    # 非可逆の縮小版 (print) を元にすると二重に劣化するため、常に元のキャプチャから生成する
+    key = print_image_key(_source_digest(path), width, image_format, quality)
+    prefix = _source_prefix(path)
+    output = print_image_dir() / f"{prefix}_{key}.{image_format}"
+    if output.exists():
+        return output, True
+    render_print_image(str(path), str(output), width, image_format, quality)
+    _remove_stale(prefix, output)
+    return output, False
+
+
+async def prepare_print_images(paths: list[Path]) -> dict[Path, Path]:
+    """
+    Prepare print-sized copies of images in parallel.
+
+    Args:
+        paths: Source images (duplicates are prepared once)
+
+    Returns:
+        Mapping of source path to prepared image (images that fail keep their source path)
+    """
+    width = print_image_width()
+    image_format = settings.pdf_image_format
+    quality = settings.pdf_image_quality
+    print_image_dir().mkdir(parents=True, exist_ok=True)
+
+    unique = list(dict.fromkeys(paths))
+    results = await asyncio.gather(
+        *(
+            executors.run("export", _prepare_one, path, width, image_format, quality)
+            for path in unique
+        ),
+        return_exceptions=True,
+    )
+
+    prepared: dict[Path, Path] = {}
+    hits = 0
+    for path, result in zip(unique, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Failed to prepare print image {path}: {result}")
+            prepared[path] = path
+            continue
+        prepared[path], cached = result
+        hits += cached
+    logger.info(
+        f"Print images prepared: {len(unique)} images at {width}px "
+        f"({image_format}, q={quality}, {hits} cached)"
+    )
+    return prepared
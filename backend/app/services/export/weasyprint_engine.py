@@ -0,0 +1,191 @@
+"""
+WeasyPrint PDF engine on a dedicated process pool.
+
+- 各ワーカープロセスは起動時に一度だけ WeasyPrint を読み込み、FontConfiguration と
+  スタイルシート (Playwright と同じ CSS + A4 ページ設定) を作成して以降のジョブで使い回す
+- 画像は Playwright と同じ仮のオリジン上の URL として解決し、
+  URL fetcher が印刷用画像のファイルを返す
+- レンダリングは GIL の外 (別プロセス) で行うため、同時エクスポートはコア数に応じてスケールする
+"""
+import mimetypes
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import unquote, urlsplit
+
+from app.core import ExportError, logger, settings
+from app.core.executors import StageExecutor
+
+from .html import MANUAL_CSS
+
+# WeasyPrint は Playwright の page.pdf(format="A4", margin=20mm) 相当を @page で指定する
+PAGE_CSS = "@page { size: A4; margin: 20mm; }"
+
+# ページ番号のフッター (Playwright の footer_template と同じ表示)
+PAGE_NUMBER_CSS = """
+@page {
+    @bottom-center {
+        content: counter(page) " / " counter(pages);
+        font-size: 9px;
+        color: #666;
+    }
+}
+"""
+
+# ワーカープロセス内で使い回す WeasyPrint の状態
+_font_config: Any = None
+_stylesheets: list[Any] = []
+_page_number_stylesheet: Any = None
+
+
+def _init_worker(css: str, page_number_css: str) -> None:
+    """ワーカープロセスの初期化 (フォント設定とスタイルシートを一度だけ作成)"""
+    global _font_config, _stylesheets, _page_number_stylesheet
+    try:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:
+        # 未インストールの場合はジョブ実行時に ExportError を返す
+        return
+    _font_config = FontConfiguration()
+    _stylesheets = [CSS(string=css, font_config=_font_config)]
+    _page_number_stylesheet = CSS(string=page_number_css, font_config=_font_config)
+
+
+def _warm_up() -> bool:
+    """ワーカーを起動させるための空ジョブ (WeasyPrint を読み込めたかを返す)"""
+    return _font_config is not None
+
+
+def make_url_fetcher(origin: str, routes: dict[str, str]) -> Callable[[str], dict[str, Any]]:
+    """
+    Build a WeasyPrint URL fetcher serving images from local files.
+
+    Args:
+        origin: Stand-in origin the document is loaded from (e.g. http://manual.local)
+        routes: URL path to local file
+
+    Returns:
+        URL fetcher (data: URLs are delegated to WeasyPrint, other URLs are refused)
+    """
+
+    def fetch(url: str) -> dict[str, Any]:
+        if url.startswith(f"{origin}/"):
+            path = routes.get(unquote(urlsplit(url).path))
+            if path is None:
+                raise ValueError(f"Image not found: {url}")
+            return {
+                "string": Path(path).read_bytes(),
+                "mime_type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+                "redirected_url": url,
+            }
+        if url.startswith("data:"):
+            from weasyprint import default_url_fetcher
+
+            return default_url_fetcher(url)
+        raise ValueError(f"External resources are not allowed: {url}")
+
+    return fetch
+
+
+def render_pdf(
+    html: str, origin: str, routes: dict[str, str], output_path: str, page_numbers: bool = True
+) -> None:
+    """
+    Render HTML to PDF in a worker process.
+
+    Args:
+        html: HTML document without stylesheet (the worker's shared stylesheet is applied)
+        origin: Origin used as base_url for relative image URLs
+        routes: URL path to local image file
+        output_path: PDF output path
+        page_numbers: Print page numbers in the footer
+
+    Raises:
+        ExportError: If WeasyPrint is not installed
+    """
+    if _font_config is None:
+        # プール外 (テスト等) から呼ばれた場合はここで初期化
+        _init_worker(MANUAL_CSS + PAGE_CSS, PAGE_NUMBER_CSS)
+    if _font_config is None:
+        raise ExportError("WeasyPrint not installed. Run: pip install weasyprint")
+    from weasyprint import HTML
+
+    HTML(
+        string=html, base_url=f"{origin}/", url_fetcher=make_url_fetcher(origin, routes)
+    ).write_pdf(
+        output_path,
+        stylesheets=_stylesheets + ([_page_number_stylesheet] if page_numbers else []),
+        font_config=_font_config,
+    )
+
+
+class WeasyPrintEngine:
+    """WeasyPrint 専用のプロセスプール"""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize engine.
+
+        Args:
+            workers: Number of worker processes (default: settings.weasyprint_workers,
+                0 = CPU cores)
+        """
+        workers = workers or settings.weasyprint_workers or os.cpu_count() or 1
+        self.executor = StageExecutor(
+            name="weasyprint",
+            max_workers=workers,
+            mode="process",
+            initializer=_init_worker,
+            initargs=(MANUAL_CSS + PAGE_CSS, PAGE_NUMBER_CSS),
+        )
+
+    async def start(self) -> None:
+        """
+        Start a worker ahead of the first export.
+
+        Raises:
+            ExportError: If WeasyPrint is not installed
+        """
+        if not await self.executor.run(_warm_up):
+            raise ExportError("WeasyPrint not installed. Run: pip install weasyprint")
+
+    async def render(
+        self,
+        html: str,
+        origin: str,
+        routes: dict[str, Path],
+        output_path: Path,
+        page_numbers: bool = True,
+    ) -> None:
+        """
+        Render HTML to PDF on the process pool.
+
+        Args:
+            html: HTML document (built without stylesheet)
+            origin: Origin used as base_url for relative image URLs
+            routes: URL path to local image file
+            output_path: PDF output path
+            page_numbers: Print page numbers in the footer
+        """
+        await self.executor.run(
+            render_pdf,
+            html,
+            origin,
+            {path: str(file) for path, file in routes.items()},
+            str(output_path),
+            page_numbers,
+        )
+        logger.debug(f"WeasyPrint rendered {output_path}")
+
+    def stats(self) -> dict[str, Any]:
+        """プール統計"""
+        return self.executor.stats()
+
+    def shutdown(self) -> None:
+        """ワーカープロセスを停止"""
+        self.executor.shutdown()
+
+
+weasyprint_engine = WeasyPrintEngine()
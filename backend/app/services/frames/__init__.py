@@ -0,0 +1,12 @@
+"""
+Frame services (random-access frame server for the review UI).
+"""
+from .server import DecoderPool, FrameCache, FrameServer, RenderedFrame, frame_server
+
+__all__ = [
+    "DecoderPool",
+    "FrameCache",
+    "FrameServer",
+    "RenderedFrame",
+    "frame_server",
+]
@@ -0,0 +1,402 @@
+"""
+Random-access frame server for the review UI.
+
+- 動画毎に VideoCapture を開いたままプールし、近い時刻へのアクセスはシークせずに読み進める
+- エンコード済みの画像は合計バイト数で上限を設けた LRU キャッシュに保持する
+- 幅の指定がプロキシの解像度以下で、プロキシが生成済みの場合はプロキシからデコードする
+- デコーダーの空きはイベントループ上で待ち、デコードとエンコードは専用の小さなスレッドプールで
+  実行する (シーン検出などで埋まる vision プールの後ろで待たされないため)
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, TypeVar
+
+import cv2
+
+from app.core import ValidationError, VideoProcessingError, logger, settings
+from app.services.pipeline import StageManifest, find_source_video
+from app.utils import (
+    IMAGE_MEDIA_TYPES,
+    encode_image,
+    iter_frames,
+    media_probe,
+    resize_to_width,
+)
+from app.utils.frames import SEQUENTIAL_GAP_SEC
+
+T = TypeVar("T")
+
+# (動画パス, 更新時刻, フレーム番号, 幅, 形式)
+FrameKey = tuple[str, int, int, int, str]
+
+
+class FrameCache:
+    """エンコード済みフレームの LRU キャッシュ (合計バイト数で上限)"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Maximum total size of cached images (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[FrameKey, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: FrameKey) -> Optional[bytes]:
+        """キャッシュから取得 (最近使用したものとして記録)"""
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: FrameKey, data: bytes) -> None:
+        """キャッシュに追加 (上限を超えた分は古いものから破棄)"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュ統計"""
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class _Decoder:
+    """開いたままの VideoCapture"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.cap = cv2.VideoCapture(str(path))
+        if not self.cap.isOpened():
+            raise VideoProcessingError(f"動画を開けませんでした: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.last_used = time.monotonic()
+
+    @property
+    def position(self) -> int:
+        """次に読み出されるフレーム番号"""
+        return int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def close(self) -> None:
+        self.cap.release()
+
+
+class DecoderPool:
+    """動画毎のデコーダープール"""
+
+    def __init__(
+        self,
+        per_video: Optional[int] = None,
+        max_decoders: Optional[int] = None,
+        idle_sec: Optional[float] = None,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            per_video: Maximum decoders per video (concurrent decodes of one video)
+            max_decoders: Maximum idle decoders kept open across all videos
+            idle_sec: Close decoders unused for this many seconds
+        """
+        self.per_video = per_video or settings.frame_server_decoders_per_video
+        self.max_decoders = max_decoders or settings.frame_server_max_decoders
+        self.idle_sec = idle_sec or settings.frame_server_decoder_idle_sec
+        self._idle: dict[Path, list[_Decoder]] = {}
+        self._slots: dict[Path, asyncio.Semaphore] = {}
+        self._fps: dict[tuple[Path, int], float] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    @asynccontextmanager
+    async def slot(self, path: Path) -> AsyncIterator[None]:
+        """
+        Wait without blocking the event loop until a decoder of the video may be used.
+
+        Args:
+            path: Video file
+
+        Yields:
+            None (at most ``per_video`` holders per video at a time)
+        """
+        semaphore = self._slots.setdefault(path, asyncio.Semaphore(self.per_video))
+        async with semaphore:
+            yield
+
+    @contextmanager
+    def checkout(self, path: Path, frame_index: int) -> Iterator[_Decoder]:
+        """
+        Borrow a decoder positioned as close as possible before ``frame_index``.
+
+        The caller must hold a :meth:`slot` for the video.
+
+        Args:
+            path: Video file
+            frame_index: Frame that will be read
+
+        Yields:
+            Decoder (returned to the pool afterwards, closed on error)
+        """
+        decoder = self._take_idle(path, frame_index)
+        if decoder is None:
+            decoder = _Decoder(path)
+            with self._lock:
+                self.opened += 1
+                self._fps[(path, path.stat().st_mtime_ns)] = decoder.fps
+            logger.debug(f"Opened decoder for {path}")
+        try:
+            yield decoder
+        except BaseException:
+            decoder.close()
+            raise
+        self._release(decoder)
+
+    def _take_idle(self, path: Path, frame_index: int) -> Optional[_Decoder]:
+        """シーク不要 (少し手前にある) デコーダーを優先して取り出す"""
+        with self._lock:
+            idle = self._idle.get(path)
+            if not idle:
+                return None
+
+            def cost(decoder: _Decoder) -> int:
+                gap = frame_index - decoder.position
+                max_gap = int(SEQUENTIAL_GAP_SEC * decoder.fps)
+                return gap if 0 <= gap <= max_gap else max_gap + 1
+
+            decoder = min(idle, key=cost)
+            idle.remove(decoder)
+            self.reused += 1
+            return decoder
+
+    def _release(self, decoder: _Decoder) -> None:
+        """デコーダーをプールに戻し、古いものを閉じる"""
+        now = time.monotonic()
+        decoder.last_used = now
+        to_close: list[_Decoder] = []
+        with self._lock:
+            self._idle.setdefault(decoder.path, []).append(decoder)
+            idle = sorted(
+                (d for decoders in self._idle.values() for d in decoders),
+                key=lambda d: d.last_used,
+            )
+            excess = len(idle) - self.max_decoders
+            for i, d in enumerate(idle):
+                if i < excess or now - d.last_used > self.idle_sec:
+                    self._idle[d.path].remove(d)
+                    to_close.append(d)
+            for path in [p for p, decoders in self._idle.items() if not decoders]:
+                del self._idle[path]
+        for d in to_close:
+            d.close()
+
+    def known_fps(self, path: Path) -> Optional[float]:
+        """
+        Get the frame rate without opening the video, if known.
+
+        Args:
+            path: Video file
+
+        Returns:
+            Frame rate from the probe cache or an earlier decoder, else None
+        """
+        media_info = media_probe.get_cached(path)
+        if media_info and media_info.fps:
+            return media_info.fps
+        with self._lock:
+            return self._fps.get((path, path.stat().st_mtime_ns))
+
+    def close(self) -> None:
+        """すべてのデコーダーを閉じる"""
+        with self._lock:
+            decoders = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+        for decoder in decoders:
+            decoder.close()
+
+    def stats(self) -> dict[str, int]:
+        """プール統計"""
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "videos": len(self._idle),
+                "opened": self.opened,
+                "reused": self.reused,
+            }
+
+
+@dataclass
+class RenderedFrame:
+    """エンコード済みフレーム"""
+
+    data: bytes
+    media_type: str
+    # 実際に返したフレームの時刻 (秒)
+    timestamp: float
+    cached: bool
+
+
+class FrameServer:
+    """時刻指定のフレーム取得 (デコーダープール + LRU キャッシュ)"""
+
+    def __init__(
+        self,
+        pool: Optional[DecoderPool] = None,
+        cache: Optional[FrameCache] = None,
+        threads: Optional[int] = None,
+    ):
+        """
+        Initialize frame server.
+
+        Args:
+            pool: Decoder pool (default: from settings)
+            cache: Encoded frame cache (default: settings.frame_server_cache_mb)
+            threads: Decode threads (default: settings.frame_server_threads)
+        """
+        self.pool = pool or DecoderPool()
+        self.cache = cache or FrameCache(settings.frame_server_cache_mb * 1024 * 1024)
+        self.threads = threads or settings.frame_server_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    async def get_frame(
+        self,
+        video_id: str,
+        timestamp: float,
+        width: Optional[int] = None,
+        image_format: str = "jpg",
+    ) -> RenderedFrame:
+        """
+        Get the frame of a video at a timestamp.
+
+        Args:
+            video_id: Video UUID
+            timestamp: Time in seconds
+            width: Output width (default and maximum: settings.frame_server_max_width)
+            image_format: "jpg", "png" or "webp"
+
+        Returns:
+            RenderedFrame
+
+        Raises:
+            ValidationError: If the video does not exist or has no frame at the timestamp
+        """
+        width = min(width or settings.frame_server_max_width, settings.frame_server_max_width)
+        path = await self._select_source(video_id, width)
+
+        fps = self.pool.known_fps(path)
+        if fps is None:
+            fps = await self._decode(self._open_fps, path)
+        frame_index = max(0, round(timestamp * fps))
+        key: FrameKey = (str(path), path.stat().st_mtime_ns, frame_index, width, image_format)
+
+        data = self.cache.get(key)
+        cached = data is not None
+        if data is None:
+            data = await self._decode(self._render, path, frame_index, fps, width, image_format)
+            self.cache.put(key, data)
+
+        return RenderedFrame(
+            data=data,
+            media_type=IMAGE_MEDIA_TYPES[image_format],
+            timestamp=frame_index / fps,
+            cached=cached,
+        )
+
+    async def _select_source(self, video_id: str, width: int) -> Path:
+        """デコードする動画を選択 (幅が足りる場合は生成済みのプロキシ)"""
+        source = find_source_video(video_id)
+        if source is None:
+            raise ValidationError(f"動画が見つかりません: {video_id}")
+
+        proxy = settings.intermediate_dir / video_id / "proxy.mp4"
+        if not settings.proxy_enabled:
+            return source
+        if await asyncio.to_thread(StageManifest(video_id).get, "proxy") is None:
+            return source
+        try:
+            proxy_info = await media_probe.probe(proxy)
+        except Exception:
+            return source
+        if proxy_info.width and proxy_info.width >= width:
+            return proxy
+        return source
+
+    async def _decode(self, fn: Callable[..., T], path: Path, *args: Any) -> T:
+        """デコーダーの空きを待ってから専用スレッドで実行"""
+        async with self.pool.slot(path):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, path, *args)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix="frame-server"
+                )
+            return self._executor
+
+    def _open_fps(self, path: Path) -> float:
+        """デコーダーを開いてフレームレートを取得 (開いたデコーダーはプールに残る)"""
+        with self.pool.checkout(path, 0) as decoder:
+            return decoder.fps
+
+    def _render(
+        self, path: Path, frame_index: int, fps: float, width: int, image_format: str
+    ) -> bytes:
+        """フレームをデコードしてエンコード"""
+        with self.pool.checkout(path, frame_index) as decoder:
+            _, frame = next(iter_frames(decoder.cap, [frame_index / fps], fps))
+        if frame is None:
+            raise ValidationError(f"指定時刻のフレームがありません: {frame_index / fps:.2f}s")
+        image = resize_to_width(frame, width)
+        return encode_image(image, image_format, settings.frame_server_quality)
+
+    def close(self) -> None:
+        """スレッドプールを停止してデコーダーを閉じる"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.pool.close()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get frame server statistics.
+
+        Returns:
+            Decoder pool and cache statistics
+        """
+        return {"decoders": self.pool.stats(), "cache": self.cache.stats()}
+
+
+frame_server = FrameServer()
@@ -0,0 +1,51 @@
+"""
+Job queue services for multi-node workers.
+"""
+from typing import Optional
+
+from app.core import settings
+
+from .base import JOB_STAGES, JobQueue
+from .dispatch import (
+    STAGE_GATES,
+    dispatch_stage,
+    execute_admitted_job,
+    execute_job,
+    result_to_dict,
+    submit_stage,
+    wait_for_job,
+)
+from .redis_queue import RedisJobQueue
+from .sqlite_queue import SQLiteJobQueue
+
+__all__ = [
+    "JOB_STAGES",
+    "STAGE_GATES",
+    "JobQueue",
+    "SQLiteJobQueue",
+    "RedisJobQueue",
+    "get_job_queue",
+    "dispatch_stage",
+    "submit_stage",
+    "execute_job",
+    "execute_admitted_job",
+    "result_to_dict",
+    "wait_for_job",
+]
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """設定に基づいてジョブキューを取得 (local の場合は None)"""
+    global _queue
+    if settings.job_backend == "local":
+        return None
+    if _queue is None:
+        if settings.job_backend == "sqlite":
+            _queue = SQLiteJobQueue()
+        elif settings.job_backend == "redis":
+            _queue = RedisJobQueue()
+        else:
+            raise ValueError(f"Unknown job backend: {settings.job_backend}")
+    return _queue
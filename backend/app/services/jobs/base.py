@@ -0,0 +1,98 @@
+"""
+Base interface for job queue backends.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from app.models import Job
+
+# ワーカーが処理できるステージ
+JOB_STAGES = ("proxy", "transcription", "scenes", "sprites", "markdown", "pdf", "html")
+
+
+class JobQueue(ABC):
+    """ジョブキューの基底クラス (Strategy パターン)
+
+    ジョブはリース付きで取得 (claim) され、ワーカーはハートビートでリースを延長する。
+    ワーカーが停止してリースが切れたジョブは、別のワーカーが再取得できる。
+    """
+
+    @abstractmethod
+    async def enqueue(self, video_id: str, stage: str, params: dict[str, Any]) -> Job:
+        """
+        Enqueue a job, reusing an active job with the same (video_id, stage, params).
+
+        Args:
+            video_id: Video UUID
+            stage: Stage name
+            params: Stage parameters
+
+        Returns:
+            Queued (or already active) Job
+        """
+        pass
+
+    @abstractmethod
+    async def claim(self, worker_id: str, stages: Optional[list[str]] = None) -> Optional[Job]:
+        """
+        Claim the oldest runnable job (queued, or running with an expired lease).
+
+        Args:
+            worker_id: Claiming worker ID
+            stages: Stages this worker handles (default: all)
+
+        Returns:
+            Claimed Job, or None if nothing is runnable
+        """
+        pass
+
+    @abstractmethod
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend a job's lease.
+
+        Args:
+            job_id: Job ID
+            worker_id: Worker holding the lease
+
+        Returns:
+            False if the lease was lost (e.g. reclaimed by another worker)
+        """
+        pass
+
+    @abstractmethod
+    async def complete(self, job_id: str, worker_id: str, result: dict[str, Any]) -> None:
+        """ジョブを完了として記録"""
+        pass
+
+    @abstractmethod
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """ジョブの失敗を記録 (試行回数が上限未満なら再キュー)"""
+        pass
+
+    @abstractmethod
+    async def requeue(self, job_id: str, worker_id: str) -> None:
+        """
+        Return a claimed job to the queue without counting the attempt.
+
+        Used when the job could not start (e.g. the admission gate was full).
+
+        Args:
+            job_id: Job ID
+            worker_id: Worker holding the lease
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得"""
+        pass
+
+    @abstractmethod
+    async def stats(self) -> dict[str, int]:
+        """ステータス毎のジョブ数を取得"""
+        pass
+
+    async def close(self) -> None:
+        """接続を閉じる"""
+        pass
@@ -0,0 +1,197 @@
+"""
+Stage dispatch: run in-process (local) or via the shared job queue (workers).
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core import VideoProcessingError, logger, settings
+from app.models import Job
+from app.services.pipeline import (
+    StageResult,
+    admission,
+    prepare_analysis_inputs,
+    run_html_export,
+    run_markdown_export,
+    run_pdf_export,
+    run_scene_detection,
+    run_sprites,
+    run_transcription,
+)
+
+from .base import JobQueue
+
+# ステージ名 → 実行関数
+STAGE_RUNNERS: dict[str, Callable[..., Awaitable[StageResult]]] = {
+    "proxy": prepare_analysis_inputs,
+    "transcription": run_transcription,
+    "scenes": run_scene_detection,
+    "sprites": run_sprites,
+    "markdown": run_markdown_export,
+    "pdf": run_pdf_export,
+    "html": run_html_export,
+}
+
+# ステージ名 → 依存ステージを含めて使う負荷ゲート (受け付けはこれらをまとめて予約する)
+STAGE_GATES: dict[str, tuple[str, ...]] = {
+    "proxy": ("stt", "vision"),
+    "transcription": ("stt",),
+    "scenes": ("vision",),
+    "sprites": ("vision",),
+    "markdown": (),
+    "pdf": ("export",),
+    "html": (),
+}
+
+
+def result_to_dict(result: StageResult) -> dict[str, Any]:
+    """StageResult をジョブ結果 (JSON) に変換"""
+    return {
+        "stage": result.stage,
+        "output_path": str(result.output_path),
+        "input_hash": result.input_hash,
+        "cached": result.cached,
+    }
+
+
+def result_from_dict(data: dict[str, Any]) -> StageResult:
+    """ジョブ結果 (JSON) を StageResult に変換"""
+    return StageResult(
+        stage=data["stage"],
+        output_path=Path(data["output_path"]),
+        input_hash=data["input_hash"],
+        cached=data["cached"],
+    )
+
+
+async def execute_job(job: Job) -> StageResult:
+    """
+    Execute a job's stage in the current process.
+
+    Args:
+        job: Claimed job
+
+    Returns:
+        StageResult of the stage
+    """
+    runner = STAGE_RUNNERS.get(job.stage)
+    if runner is None:
+        raise VideoProcessingError(f"Unknown job stage: {job.stage}")
+    return await runner(job.video_id, **job.params)
+
+
+async def execute_admitted_job(job: Job) -> StageResult:
+    """
+    Admit a job for its whole pipeline, then execute it in the current process.
+
+    Args:
+        job: Job to run
+
+    Returns:
+        StageResult of the stage
+
+    Raises:
+        AdmissionRejectedError: If a gate the pipeline uses is full (nothing has run yet)
+    """
+    async with admission.admit(STAGE_GATES.get(job.stage, ())):
+        return await execute_job(job)
+
+
+async def wait_for_job(queue: JobQueue, job_id: str, timeout: Optional[float] = None) -> Job:
+    """
+    Poll a job until it completes or fails.
+
+    Args:
+        queue: Job queue
+        job_id: Job ID
+        timeout: Maximum wait in seconds (default: settings.job_wait_timeout_sec)
+
+    Returns:
+        Finished Job
+
+    Raises:
+        TimeoutError: If the job did not finish in time
+    """
+    deadline = time.monotonic() + (timeout or settings.job_wait_timeout_sec)
+    while True:
+        job = await queue.get(job_id)
+        if job is None:
+            raise VideoProcessingError(f"ジョブが見つかりません: {job_id}")
+        if job.status in ("completed", "failed"):
+            return job
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"ジョブの完了待ちがタイムアウトしました: {job_id}")
+        await asyncio.sleep(settings.job_poll_interval_sec)
+
+
+async def dispatch_stage(
+    video_id: str, stage: str, params: Optional[dict[str, Any]] = None
+) -> StageResult:
+    """
+    Run a stage locally or hand it to the worker pool and wait for the result.
+
+    Args:
+        video_id: Video UUID
+        stage: Stage name (transcription/scenes/markdown/pdf/html)
+        params: Stage parameters
+
+    Returns:
+        StageResult of the stage
+    """
+    from . import get_job_queue
+
+    params = params or {}
+    queue = get_job_queue()
+    if queue is None:
+        return await execute_admitted_job(_local_job(video_id, stage, params))
+
+    job = await queue.enqueue(video_id, stage, params)
+    finished = await wait_for_job(queue, job.job_id)
+    if finished.status == "failed" or finished.result is None:
+        raise VideoProcessingError(finished.error or f"ジョブが失敗しました: {job.job_id}")
+    return result_from_dict(finished.result)
+
+
+# バックグラウンド実行中のタスク (GC による中断を防ぐため参照を保持)
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _local_job(video_id: str, stage: str, params: dict[str, Any]) -> Job:
+    """プロセス内実行用のジョブ"""
+    return Job(job_id="local", video_id=video_id, stage=stage, params=params)
+
+
+async def submit_stage(
+    video_id: str, stage: str, params: Optional[dict[str, Any]] = None
+) -> Optional[Job]:
+    """
+    Start a stage in the background without waiting for it.
+
+    Args:
+        video_id: Video UUID
+        stage: Stage name
+        params: Stage parameters
+
+    Returns:
+        Enqueued Job in worker mode, None when run as a local background task
+    """
+    from . import get_job_queue
+
+    params = params or {}
+    queue = get_job_queue()
+    if queue is not None:
+        return await queue.enqueue(video_id, stage, params)
+
+    # バックグラウンド処理は受け付け (429) を通さず、ステージ内の同時実行数制限で空きを待つ
+    async def run() -> None:
+        try:
+            await execute_job(_local_job(video_id, stage, params))
+        except Exception as e:
+            logger.warning(f"Background stage '{stage}' failed for {video_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return None
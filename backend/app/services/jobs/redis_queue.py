@@ -0,0 +1,354 @@
+"""
+Redis-protocol job queue with leases and heartbeats.
+
+Lua スクリプトや Streams は使わず、基本的なコマンド (GET/SET, LPUSH/LINDEX/LREM,
+ZADD/ZREM/ZRANGEBYSCORE) と WATCH/MULTI のみで実装しているため、Redis 互換サーバーや
+ローカルの代替実装 (fakeredis 等) でも動作する。
+ジョブの状態遷移 (取得・ハートビート・リース回収・完了・失敗) はジョブのキーを WATCH した
+トランザクションで行い、競合した場合は読み直してやり直す。登録も重複抑止キーと既存ジョブのキーを
+WATCH し、重複抑止キー・ジョブ・キューへの追加を 1 つのトランザクションで書き込む。
+"""
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any, Optional
+
+from app.core import logger, settings
+from app.models import Job
+from app.services.pipeline import hash_values
+
+from .base import JOB_STAGES, JobQueue
+
+_PREFIX = "v2m:jobs"
+# 完了・失敗したジョブの保持期間 (秒)
+_FINISHED_TTL_SEC = 7 * 24 * 3600
+
+# トランザクション内で実行するコマンドを積む関数 (None なら遷移しない)
+QueueWrites = Optional[Callable[[Any], None]]
+
+
+class RedisJobQueue(JobQueue):
+    """Redis プロトコルによるジョブキュー"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        lease_sec: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        client: Any = None,
+    ):
+        """
+        Initialize Redis job queue.
+
+        Args:
+            url: Redis URL (default: settings.redis_url)
+            lease_sec: Lease duration in seconds
+            max_attempts: Maximum attempts before a job is marked failed
+            client: Pre-built async client (e.g. a local stand-in)
+        """
+        self.lease_sec = lease_sec or settings.job_lease_sec
+        self.max_attempts = max_attempts or settings.job_max_attempts
+
+        try:
+            from redis.exceptions import WatchError
+        except ImportError:
+            raise ImportError("redis not installed. Run: pip install redis")
+        self._watch_error = WatchError
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(url or settings.redis_url, decode_responses=True)
+        self.redis = client
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"{_PREFIX}:job:{job_id}"
+
+    @staticmethod
+    def _queue_key(stage: str) -> str:
+        return f"{_PREFIX}:queued:{stage}"
+
+    @staticmethod
+    def _active_key(dedupe_key: str) -> str:
+        return f"{_PREFIX}:active:{dedupe_key}"
+
+    _leases_key = f"{_PREFIX}:leases"
+
+    async def _load(self, job_id: str) -> Optional[Job]:
+        data = await self.redis.get(self._job_key(job_id))
+        return Job.model_validate_json(data) if data else None
+
+    def _queue_store(self, pipe: Any, job: Job, ttl: Optional[int] = None) -> None:
+        """トランザクションにジョブの保存を積む"""
+        job.updated_at = datetime.now()
+        pipe.set(self._job_key(job.job_id), job.model_dump_json(), ex=ttl)
+
+    async def _transition(
+        self, job_id: str, update: Callable[[Optional[Job]], QueueWrites]
+    ) -> Optional[Job]:
+        """
+        Read a job under WATCH, let ``update`` change it and apply the writes atomically.
+
+        Args:
+            job_id: Job ID
+            update: Receives the current job (None if missing), mutates it and returns a
+                function queueing the writes, or None to leave everything unchanged
+
+        Returns:
+            Updated job, or None if ``update`` declined the transition
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(self._job_key(job_id))
+                    data = await pipe.get(self._job_key(job_id))
+                    job = Job.model_validate_json(data) if data else None
+                    writes = update(job)
+                    if writes is None:
+                        await pipe.reset()
+                        return None
+                    pipe.multi()
+                    writes(pipe)
+                    await pipe.execute()
+                    return job
+                except self._watch_error:
+                    # 他のワーカーがジョブを更新した: 読み直して判定し直す
+                    continue
+
+    async def enqueue(self, video_id: str, stage: str, params: dict[str, Any]) -> Job:
+        active_key = self._active_key(hash_values(video_id, stage, params))
+        job = Job(job_id=str(uuid.uuid4()), video_id=video_id, stage=stage, params=params)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(active_key)
+                    active_id = await pipe.get(active_key)
+                    if active_id:
+                        # 同一ジョブが実行待ち / 実行中なら再利用
+                        await pipe.watch(self._job_key(active_id))
+                        data = await pipe.get(self._job_key(active_id))
+                        existing = Job.model_validate_json(data) if data else None
+                        if existing is not None and existing.status in ("queued", "running"):
+                            await pipe.reset()
+                            return existing
+                    pipe.multi()
+                    pipe.set(active_key, job.job_id)
+                    self._queue_store(pipe, job)
+                    pipe.lpush(self._queue_key(stage), job.job_id)
+                    await pipe.execute()
+                    break
+                except self._watch_error:
+                    # 同じ入力のジョブが同時に登録・更新された: 読み直して判定し直す
+                    continue
+
+        logger.info(f"Job enqueued: {job.job_id} ({stage} for {video_id})")
+        return job
+
+    async def _release_active(self, job: Job) -> None:
+        """重複抑止キーを解放 (別のジョブが登録済みなら何もしない)"""
+        active_key = self._active_key(hash_values(job.video_id, job.stage, job.params))
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(active_key)
+                if await pipe.get(active_key) != job.job_id:
+                    await pipe.reset()
+                    return
+                pipe.multi()
+                pipe.delete(active_key)
+                await pipe.execute()
+            except self._watch_error:
+                # 同じ入力のジョブが新たに登録された
+                pass
+
+    async def _reclaim_expired(self) -> None:
+        """リース切れ (ワーカー停止) のジョブを再キュー"""
+        expired = await self.redis.zrangebyscore(self._leases_key, "-inf", time.time())
+
+        for job_id in expired:
+
+            def update(job: Optional[Job], job_id: str = job_id) -> QueueWrites:
+                if job is None or job.status != "running":
+                    # 完了済みのジョブの索引だけが残っている
+                    return lambda pipe: pipe.zrem(self._leases_key, job_id)
+                if (job.lease_expires_at or 0) > time.time():
+                    # 読み込みまでの間にハートビートで延長された
+                    return None
+
+                if job.attempts >= self.max_attempts:
+                    job.status = "failed"
+                    job.error = "リースが期限切れになりました (試行回数上限)"
+                else:
+                    logger.warning(f"Reclaiming job {job_id} from expired worker {job.worker_id}")
+                    job.status = "queued"
+                job.worker_id = None
+                job.lease_expires_at = None
+
+                def writes(pipe: Any) -> None:
+                    pipe.zrem(self._leases_key, job_id)
+                    if job.status == "failed":
+                        self._queue_store(pipe, job, ttl=_FINISHED_TTL_SEC)
+                    else:
+                        self._queue_store(pipe, job)
+                        # 先頭 (次に取り出される側) に戻す
+                        pipe.rpush(self._queue_key(job.stage), job_id)
+
+                return writes
+
+            job = await self._transition(job_id, update)
+            if job is not None and job.status == "failed":
+                await self._release_active(job)
+
+    async def _oldest_queued(self, stages: list[str]) -> Optional[Job]:
+        """各ステージのキューの先頭のうち、最も古く登録されたジョブ"""
+        oldest: Optional[Job] = None
+        for stage in stages:
+            job_id = await self.redis.lindex(self._queue_key(stage), -1)
+            if job_id is None:
+                continue
+            job = await self._load(job_id)
+            if job is None or job.status != "queued":
+                await self._drop_stale(stage, job_id)
+                # 取り残された ID を除いたので、このステージを選び直す
+                return await self._oldest_queued(stages)
+            if oldest is None or job.created_at < oldest.created_at:
+                oldest = job
+        return oldest
+
+    async def _drop_stale(self, stage: str, job_id: str) -> None:
+        """実行待ちでなくなったジョブの ID をキューから除去"""
+
+        def update(job: Optional[Job]) -> QueueWrites:
+            if job is not None and job.status == "queued":
+                return None
+            return lambda pipe: pipe.lrem(self._queue_key(stage), 0, job_id)
+
+        await self._transition(job_id, update)
+
+    async def claim(self, worker_id: str, stages: Optional[list[str]] = None) -> Optional[Job]:
+        await self._reclaim_expired()
+
+        # ステージ順ではなく登録順に取得する (前段のステージが後段を待たせ続けないように)
+        while (candidate := await self._oldest_queued(stages or list(JOB_STAGES))) is not None:
+
+            def update(job: Optional[Job], stage: str = candidate.stage) -> QueueWrites:
+                if job is None or job.status != "queued":
+                    # 他のワーカーが先に取得した
+                    return None
+                job.status = "running"
+                job.worker_id = worker_id
+                job.attempts += 1
+                job.lease_expires_at = time.time() + self.lease_sec
+
+                def writes(pipe: Any) -> None:
+                    pipe.lrem(self._queue_key(stage), 0, job.job_id)
+                    pipe.zadd(self._leases_key, {job.job_id: job.lease_expires_at})
+                    self._queue_store(pipe, job)
+
+                return writes
+
+            job = await self._transition(candidate.job_id, update)
+            if job is not None:
+                return job
+        return None
+
+    def _owned_by(self, job: Optional[Job], worker_id: str) -> bool:
+        """ワーカーがジョブのリースを保持しているか"""
+        return job is not None and job.status == "running" and job.worker_id == worker_id
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        def update(job: Optional[Job]) -> QueueWrites:
+            if not self._owned_by(job, worker_id):
+                return None
+            job.lease_expires_at = time.time() + self.lease_sec
+
+            def writes(pipe: Any) -> None:
+                pipe.zadd(self._leases_key, {job_id: job.lease_expires_at})
+                self._queue_store(pipe, job)
+
+            return writes
+
+        return await self._transition(job_id, update) is not None
+
+    async def complete(self, job_id: str, worker_id: str, result: dict[str, Any]) -> None:
+        def update(job: Optional[Job]) -> QueueWrites:
+            if not self._owned_by(job, worker_id):
+                return None
+            job.status = "completed"
+            job.result = result
+            job.error = None
+            job.lease_expires_at = None
+
+            def writes(pipe: Any) -> None:
+                pipe.zrem(self._leases_key, job_id)
+                self._queue_store(pipe, job, ttl=_FINISHED_TTL_SEC)
+                pipe.incr(f"{_PREFIX}:count:completed")
+
+            return writes
+
+        job = await self._transition(job_id, update)
+        if job is not None:
+            await self._release_active(job)
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        def update(job: Optional[Job]) -> QueueWrites:
+            if not self._owned_by(job, worker_id):
+                return None
+            job.error = error
+            job.worker_id = None
+            job.lease_expires_at = None
+            job.status = "queued" if job.attempts < self.max_attempts else "failed"
+
+            def writes(pipe: Any) -> None:
+                pipe.zrem(self._leases_key, job_id)
+                if job.status == "queued":
+                    self._queue_store(pipe, job)
+                    pipe.lpush(self._queue_key(job.stage), job_id)
+                    return
+                self._queue_store(pipe, job, ttl=_FINISHED_TTL_SEC)
+                pipe.incr(f"{_PREFIX}:count:failed")
+
+            return writes
+
+        job = await self._transition(job_id, update)
+        if job is not None and job.status == "failed":
+            await self._release_active(job)
+
+    async def requeue(self, job_id: str, worker_id: str) -> None:
+        def update(job: Optional[Job]) -> QueueWrites:
+            if not self._owned_by(job, worker_id):
+                return None
+            job.status = "queued"
+            job.attempts = max(0, job.attempts - 1)
+            job.worker_id = None
+            job.lease_expires_at = None
+
+            def writes(pipe: Any) -> None:
+                pipe.zrem(self._leases_key, job_id)
+                self._queue_store(pipe, job)
+                # 登録順は変わらないため、次に取得される側に戻す
+                pipe.rpush(self._queue_key(job.stage), job_id)
+
+            return writes
+
+        await self._transition(job_id, update)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self._load(job_id)
+
+    async def stats(self) -> dict[str, int]:
+        queued = 0
+        for stage in JOB_STAGES:
+            queued += await self.redis.llen(self._queue_key(stage))
+        return {
+            "queued": queued,
+            "running": await self.redis.zcard(self._leases_key),
+            "completed": int(await self.redis.get(f"{_PREFIX}:count:completed") or 0),
+            "failed": int(await self.redis.get(f"{_PREFIX}:count:failed") or 0),
+        }
+
+    async def close(self) -> None:
+        close = getattr(self.redis, "aclose", None) or getattr(self.redis, "close", None)
+        if close is not None:
+            await close()
@@ -0,0 +1,242 @@
+"""
+SQLite-backed job queue with leases and heartbeats.
+
+data_dir を共有する複数ワーカー (同一ホスト or 共有ストレージ) 向け。
+ネットワークファイルシステム上ではロックが信頼できない場合があるため、
+複数マシン構成では RedisJobQueue を推奨する。
+"""
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core import logger, settings
+from app.models import Job
+from app.services.pipeline import hash_values
+
+from .base import JobQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, status);
+"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite によるジョブキュー"""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        lease_sec: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        """
+        Initialize SQLite job queue.
+
+        Args:
+            path: Database file path
+            lease_sec: Lease duration in seconds
+            max_attempts: Maximum attempts before a job is marked failed
+        """
+        self.path = path or settings.job_queue_path
+        self.lease_sec = lease_sec or settings.job_lease_sec
+        self.max_attempts = max_attempts or settings.job_max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を作成 (スレッド毎に使い捨て)"""
+        conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        """行を Job に変換"""
+        return Job(
+            job_id=row["job_id"],
+            video_id=row["video_id"],
+            stage=row["stage"],
+            params=json.loads(row["params"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            worker_id=row["worker_id"],
+            lease_expires_at=row["lease_expires_at"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+        )
+
+    def _enqueue_sync(self, video_id: str, stage: str, params: dict[str, Any]) -> Job:
+        dedupe_key = hash_values(video_id, stage, params)
+        now = datetime.now().isoformat()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                    (dedupe_key,),
+                ).fetchone()
+                if row is None:
+                    job_id = str(uuid.uuid4())
+                    conn.execute(
+                        "INSERT INTO jobs (job_id, video_id, stage, params, dedupe_key, status,"
+                        " created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                        (job_id, video_id, stage, json.dumps(params), dedupe_key, now, now),
+                    )
+                    row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                    logger.info(f"Job enqueued: {job_id} ({stage} for {video_id})")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self._to_job(row)
+
+    def _claim_sync(self, worker_id: str, stages: Optional[list[str]]) -> Optional[Job]:
+        stage_filter = ""
+        args: list[Any] = []
+        if stages:
+            stage_filter = f" AND stage IN ({', '.join('?' for _ in stages)})"
+            args.extend(stages)
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = conn.execute(
+                        "SELECT * FROM jobs WHERE (status = 'queued' OR"
+                        " (status = 'running' AND lease_expires_at < ?))"
+                        f"{stage_filter} ORDER BY created_at LIMIT 1",
+                        [now, *args],
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+
+                    timestamp = datetime.now().isoformat()
+                    if row["status"] == "running" and row["attempts"] >= self.max_attempts:
+                        # リース切れが上限回数に達したジョブは失敗扱い
+                        conn.execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?"
+                            " WHERE job_id = ?",
+                            (
+                                "リースが期限切れになりました (試行回数上限)",
+                                timestamp,
+                                row["job_id"],
+                            ),
+                        )
+                        continue
+
+                    if row["status"] == "running":
+                        logger.warning(
+                            f"Reclaiming job {row['job_id']} from expired worker {row['worker_id']}"
+                        )
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker_id = ?,"
+                        " attempts = attempts + 1, lease_expires_at = ?, updated_at = ?"
+                        " WHERE job_id = ?",
+                        (worker_id, now + self.lease_sec, timestamp, row["job_id"]),
+                    )
+                    claimed = conn.execute(
+                        "SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)
+                    ).fetchone()
+                    conn.execute("COMMIT")
+                    return self._to_job(claimed)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _heartbeat_sync(self, job_id: str, worker_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + self.lease_sec, datetime.now().isoformat(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def _complete_sync(self, job_id: str, worker_id: str, result: dict[str, Any]) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'completed', result = ?, error = NULL,"
+                " lease_expires_at = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (json.dumps(result), datetime.now().isoformat(), job_id, worker_id),
+            )
+
+    def _fail_sync(self, job_id: str, worker_id: str, error: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END,"
+                " worker_id = NULL, lease_expires_at = NULL, error = ?, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (self.max_attempts, error, datetime.now().isoformat(), job_id, worker_id),
+            )
+
+    def _requeue_sync(self, job_id: str, worker_id: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0),"
+                " worker_id = NULL, lease_expires_at = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (datetime.now().isoformat(), job_id, worker_id),
+            )
+
+    def _get_sync(self, job_id: str) -> Optional[Job]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def _stats_sync(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    async def enqueue(self, video_id: str, stage: str, params: dict[str, Any]) -> Job:
+        return await asyncio.to_thread(self._enqueue_sync, video_id, stage, params)
+
+    async def claim(self, worker_id: str, stages: Optional[list[str]] = None) -> Optional[Job]:
+        return await asyncio.to_thread(self._claim_sync, worker_id, stages)
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        return await asyncio.to_thread(self._heartbeat_sync, job_id, worker_id)
+
+    async def complete(self, job_id: str, worker_id: str, result: dict[str, Any]) -> None:
+        await asyncio.to_thread(self._complete_sync, job_id, worker_id, result)
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        await asyncio.to_thread(self._fail_sync, job_id, worker_id, error)
+
+    async def requeue(self, job_id: str, worker_id: str) -> None:
+        await asyncio.to_thread(self._requeue_sync, job_id, worker_id)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get_sync, job_id)
+
+    async def stats(self) -> dict[str, int]:
+        return await asyncio.to_thread(self._stats_sync)
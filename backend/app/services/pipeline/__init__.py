@@ -0,0 +1,48 @@
+"""
+Pipeline orchestration services (stage manifest, single-flight, admission, stage runners).
+"""
+from .admission import AdmissionController, admission
+from .manifest import STAGE_DEPENDENCIES, StageManifest, hash_values
+from .singleflight import SingleFlight, single_flight
+from .stages import (
+    StageResult,
+    cached_export,
+    export_input_hash,
+    find_analysis_video,
+    find_source_video,
+    prepare_analysis_inputs,
+    record_plan,
+    run_audio_extraction,
+    run_html_export,
+    run_markdown_export,
+    run_pdf_export,
+    run_proxy,
+    run_scene_detection,
+    run_sprites,
+    run_transcription,
+)
+
+__all__ = [
+    "AdmissionController",
+    "admission",
+    "STAGE_DEPENDENCIES",
+    "StageManifest",
+    "StageResult",
+    "SingleFlight",
+    "single_flight",
+    "hash_values",
+    "cached_export",
+    "export_input_hash",
+    "find_source_video",
+    "find_analysis_video",
+    "prepare_analysis_inputs",
+    "record_plan",
+    "run_audio_extraction",
+    "run_proxy",
+    "run_transcription",
+    "run_scene_detection",
+    "run_sprites",
+    "run_markdown_export",
+    "run_pdf_export",
+    "run_html_export",
+]
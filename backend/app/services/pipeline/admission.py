@@ -0,0 +1,197 @@
+"""
+Admission control for expensive pipeline stages.
+
+受け付けはルート / ディスパッチで処理を始める前に 1 回だけ行う (admit)。リクエストが実行する
+パイプライン全体で使うステージの枠 (同時実行数 + 待ち行列の長さ) を予約し、どれかが満杯なら
+AdmissionRejectedError (HTTP 429) を送出する。Retry-After は直近の処理時間から推定する。
+ステージ本体では同時実行数の制限 (limit) のみ行い、空きを待つだけで拒否はしない。
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from app.core import AdmissionRejectedError, logger, settings
+
+# 推定に使う直近の処理時間の件数
+_DURATION_WINDOW = 20
+
+
+class StageGate:
+    """1 ステージ分の同時実行数制御と待ち行列"""
+
+    def __init__(self, stage: str, capacity: int, max_queue: int, default_duration: float):
+        """
+        Initialize stage gate.
+
+        Args:
+            stage: Stage name
+            capacity: Maximum concurrent jobs
+            max_queue: Maximum admitted requests beyond capacity before rejecting
+            default_duration: Assumed job duration when no history exists (seconds)
+        """
+        self.stage = stage
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.default_duration = default_duration
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._durations: deque[float] = deque(maxlen=_DURATION_WINDOW)
+
+    @property
+    def waiting(self) -> int:
+        """待ち行列の長さ"""
+        return len(self._waiters)
+
+    def average_duration(self) -> float:
+        """直近の平均処理時間 (秒)"""
+        if not self._durations:
+            return self.default_duration
+        return sum(self._durations) / len(self._durations)
+
+    def estimate_wait(self, position: Optional[int] = None) -> int:
+        """
+        Estimate seconds until a job at the given queue position would start.
+
+        Args:
+            position: Queue position (default: behind the current queue)
+
+        Returns:
+            Estimated wait in whole seconds (at least 1)
+        """
+        position = self.waiting if position is None else position
+        rounds = math.ceil((position + 1) / self.capacity)
+        return max(1, math.ceil(rounds * self.average_duration()))
+
+    def reserve(self) -> None:
+        """受け付け枠を予約 (同時実行数 + 待ち行列の長さを超えるなら AdmissionRejectedError)"""
+        if self.admitted >= self.capacity + self.max_queue:
+            self.rejected += 1
+            retry_after = self.estimate_wait(position=self.admitted - self.capacity)
+            logger.warning(
+                f"Admission rejected for {self.stage} "
+                f"(admitted={self.admitted}, running={self.running}, retry_after={retry_after}s)"
+            )
+            raise AdmissionRejectedError(self.stage, retry_after)
+        self.admitted += 1
+
+    def unreserve(self) -> None:
+        """受け付け枠を返却"""
+        self.admitted -= 1
+
+    async def acquire(self) -> None:
+        """実行枠を取得 (空きがなければ待つ、拒否はしない)"""
+        if self.running < self.capacity and not self._waiters:
+            self.running += 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # 枠を譲られた直後にキャンセルされた場合は次へ回す
+                self.release()
+            raise
+
+    def release(self, duration: Optional[float] = None) -> None:
+        """
+        Release a slot and hand it to the next waiter.
+
+        Args:
+            duration: Observed job duration to feed the Retry-After estimate
+        """
+        if duration is not None:
+            self._durations.append(duration)
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # running はそのまま次の待機者に引き継ぐ
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """現在の負荷を取得"""
+        return {
+            "capacity": self.capacity,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "avg_duration_sec": round(self.average_duration(), 3),
+            "estimated_wait_sec": self.estimate_wait() if self.running >= self.capacity else 0,
+        }
+
+
+class AdmissionController:
+    """ステージ名 → StageGate の管理"""
+
+    def __init__(self) -> None:
+        self._gates: dict[str, StageGate] = {}
+
+    def gate(self, stage: str) -> StageGate:
+        """ステージのゲートを取得 (設定から遅延生成)"""
+        if stage not in self._gates:
+            self._gates[stage] = StageGate(
+                stage=stage,
+                capacity=getattr(settings, f"{stage}_max_concurrent"),
+                max_queue=getattr(settings, f"{stage}_max_queue"),
+                default_duration=settings.admission_default_duration_sec,
+            )
+        return self._gates[stage]
+
+    @asynccontextmanager
+    async def admit(self, stages: Iterable[str]) -> AsyncIterator[None]:
+        """
+        Admit a request before any of its work starts, for the whole pipeline it will run.
+
+        Args:
+            stages: Gated stages (stt/vision/export) the request's pipeline may use
+
+        Raises:
+            AdmissionRejectedError: If any of the stages is already at capacity plus queue
+        """
+        reserved: list[StageGate] = []
+        try:
+            for stage in dict.fromkeys(stages):
+                gate = self.gate(stage)
+                gate.reserve()
+                reserved.append(gate)
+            yield
+        finally:
+            for gate in reserved:
+                gate.unreserve()
+
+    @asynccontextmanager
+    async def limit(self, stage: str) -> AsyncIterator[None]:
+        """
+        Hold an execution slot for a stage for the duration of the block (waits, never rejects).
+
+        Args:
+            stage: Stage name (stt/vision/export)
+        """
+        gate = self.gate(stage)
+        await gate.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            gate.release(time.monotonic() - started)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """全ステージの負荷を取得"""
+        return {stage: self.gate(stage).stats() for stage in ("stt", "vision", "export")}
+
+
+admission = AdmissionController()
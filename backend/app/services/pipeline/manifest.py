@@ -0,0 +1,253 @@
+"""
+Per-video stage manifest recording input hashes of each pipeline stage.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core import logger, settings
+from app.utils import FileLock, atomic_write_text, sha256_file
+
+# ステージ → 依存する上流ステージ
+STAGE_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "audio": (),
+    "proxy": (),
+    "transcription": ("audio",),
+    "scenes": ("proxy",),
+    "sprites": ("proxy",),
+    "plan": ("transcription", "scenes"),
+    "markdown": ("plan",),
+    "pdf": ("markdown",),
+    "html": ("markdown",),
+}
+
+MANIFEST_FILENAME = "manifest.json"
+
+# 同一プロセス内での manifest 読み書きを直列化 (プロセス間は FileLock で直列化)
+_manifest_lock = threading.RLock()
+
+
+def hash_values(*values: Any) -> str:
+    """
+    Hash arbitrary JSON-serializable values (settings, parameters, digests).
+
+    Args:
+        *values: Values to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def downstream_stages(stage: str) -> list[str]:
+    """指定ステージに (推移的に) 依存する下流ステージ一覧を取得"""
+    result: list[str] = []
+    pending = [stage]
+    while pending:
+        current = pending.pop()
+        for name, deps in STAGE_DEPENDENCIES.items():
+            if current in deps and name not in result:
+                result.append(name)
+                pending.append(name)
+    return result
+
+
+class StageManifest:
+    """動画毎のステージ manifest (intermediate_dir/<video_id>/manifest.json)"""
+
+    def __init__(self, video_id: str, base_dir: Optional[Path] = None):
+        """
+        Initialize stage manifest.
+
+        Args:
+            video_id: Video UUID
+            base_dir: Intermediate directory (default: settings.intermediate_dir)
+        """
+        self.video_id = video_id
+        self.path = (base_dir or settings.intermediate_dir) / video_id / MANIFEST_FILENAME
+
+    def _load(self) -> dict[str, Any]:
+        """manifest を読み込み"""
+        if not self.path.exists():
+            return {"video_id": self.video_id, "stages": {}, "files": {}}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Broken manifest, starting fresh: {self.path} ({e})")
+            return {"video_id": self.video_id, "stages": {}, "files": {}}
+        data.setdefault("stages", {})
+        data.setdefault("files", {})
+        return data
+
+    def _save(self, data: dict[str, Any]) -> None:
+        """manifest をアトミックに保存"""
+        atomic_write_text(self.path, json.dumps(data, indent=2, ensure_ascii=False))
+
+    def _update(self) -> "_ManifestTransaction":
+        """読み込み → 変更 → 保存をまとめて行うトランザクション"""
+        return _ManifestTransaction(self)
+
+    def file_digest(self, path: Path) -> str:
+        """
+        Get SHA-256 of a file, cached by (size, mtime) in the manifest.
+
+        Args:
+            path: File path
+
+        Returns:
+            Hex digest
+        """
+        return self.file_digests([path])[path]
+
+    def file_digests(self, paths: list[Path]) -> dict[Path, str]:
+        """
+        Get SHA-256 of several files with one manifest read and at most one write.
+
+        Digests cached by (size, mtime) are reused; the missing ones are computed and
+        recorded together in a single transaction. Blocking (file lock, hashing): call it
+        from a worker thread in async code.
+
+        Args:
+            paths: Existing file paths
+
+        Returns:
+            Mapping of each path to its hex digest
+        """
+        with _manifest_lock:
+            cached_files = self._load()["files"]
+
+        digests: dict[Path, str] = {}
+        computed: dict[str, dict[str, Any]] = {}
+        for path in dict.fromkeys(paths):
+            stat = path.stat()
+            key = str(path.resolve())
+            cached = cached_files.get(key) or computed.get(key)
+            if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                digests[path] = cached["sha256"]
+                continue
+            digests[path] = sha256_file(path)
+            computed[key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digests[path],
+            }
+
+        if computed:
+            with self._update() as data:
+                data["files"].update(computed)
+        return digests
+
+    def remember_digest(self, path: Path, digest: str) -> None:
+        """計算済みのファイルハッシュを記録 (アップロード時など)"""
+        stat = path.stat()
+        with self._update() as data:
+            data["files"][str(path.resolve())] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest,
+            }
+
+    def get(self, stage: str) -> Optional[dict[str, Any]]:
+        """ステージの記録を取得"""
+        with _manifest_lock:
+            return self._load()["stages"].get(stage)
+
+    def stages(self) -> dict[str, Any]:
+        """全ステージの記録を取得"""
+        with _manifest_lock:
+            return self._load()["stages"]
+
+    def is_fresh(self, stage: str, input_hash: str) -> bool:
+        """
+        Check whether a stage's recorded inputs match and its outputs still exist.
+
+        Args:
+            stage: Stage name
+            input_hash: Hash of current inputs and settings
+
+        Returns:
+            True if the stage can be skipped
+        """
+        entry = self.get(stage)
+        if entry is None or entry.get("input_hash") != input_hash:
+            return False
+        return all(Path(p).exists() for p in entry.get("outputs", []))
+
+    def record(self, stage: str, input_hash: str, outputs: list[Path]) -> None:
+        """
+        Record a completed stage and invalidate everything downstream of it.
+
+        Args:
+            stage: Stage name
+            input_hash: Hash of the inputs used
+            outputs: Output files produced
+        """
+        if stage not in STAGE_DEPENDENCIES:
+            raise ValueError(f"Unknown stage: {stage}")
+
+        with self._update() as data:
+            for name in downstream_stages(stage):
+                if data["stages"].pop(name, None) is not None:
+                    logger.info(f"Invalidated downstream stage '{name}' of '{stage}'")
+            data["stages"][stage] = {
+                "input_hash": input_hash,
+                "outputs": [str(p) for p in outputs],
+                "updated_at": datetime.now().isoformat(),
+            }
+
+    def invalidate(self, stage: str, include_self: bool = True) -> list[str]:
+        """
+        Invalidate a stage and everything downstream of it.
+
+        Args:
+            stage: Stage name
+            include_self: Also remove the stage itself
+
+        Returns:
+            Names of invalidated stages
+        """
+        targets = ([stage] if include_self else []) + downstream_stages(stage)
+        removed: list[str] = []
+        with self._update() as data:
+            for name in targets:
+                if data["stages"].pop(name, None) is not None:
+                    removed.append(name)
+        if removed:
+            logger.info(f"Invalidated stages for {self.video_id}: {removed}")
+        return removed
+
+
+class _ManifestTransaction:
+    """StageManifest の読み書きトランザクション"""
+
+    def __init__(self, manifest: StageManifest):
+        self.manifest = manifest
+        self.data: dict[str, Any] = {}
+        self._file_lock = FileLock(manifest.path.with_name(MANIFEST_FILENAME + ".lock"))
+
+    def __enter__(self) -> dict[str, Any]:
+        _manifest_lock.acquire()
+        try:
+            self._file_lock.acquire()
+            try:
+                self.data = self.manifest._load()
+            except BaseException:
+                self._file_lock.release()
+                raise
+        except BaseException:
+            _manifest_lock.release()
+            raise
+        return self.data
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        try:
+            if exc_type is None:
+                self.manifest._save(self.data)
+        finally:
+            self._file_lock.release()
+            _manifest_lock.release()
@@ -0,0 +1,92 @@
+"""
+Single-flight coalescing of identical concurrent stage executions.
+
+同一 (video_id, stage, params) の同時リクエストは 1 回の実行を共有する。
+プロセス内では実行中のタスクを待ち合わせ、プロセス間 (複数 uvicorn ワーカー) では
+data_dir 配下のファイルロックで直列化する。後続プロセスはロック取得後に manifest を
+確認するため、先行プロセスの成果物がそのまま再利用される。
+"""
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, Optional, TypeVar
+
+from app.core import logger, settings
+from app.utils.filelock import FileLock
+
+from .manifest import hash_values
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """(video_id, stage, params) 単位の重複実行抑止"""
+
+    def __init__(self, lock_dir: Optional[Path] = None):
+        """
+        Initialize single-flight group.
+
+        Args:
+            lock_dir: Directory for cross-process lock files (default: data_dir/locks)
+        """
+        self._lock_dir = lock_dir
+        self._in_flight: dict[tuple[str, str, str], asyncio.Task[Any]] = {}
+
+    @property
+    def lock_dir(self) -> Path:
+        """ロックファイルの保存先"""
+        return self._lock_dir or settings.data_dir / "locks"
+
+    def lock_path(self, video_id: str, stage: str, params_hash: str) -> Path:
+        """ロックファイルのパスを取得"""
+        return self.lock_dir / video_id / f"{stage}-{params_hash[:16]}.lock"
+
+    async def do(
+        self,
+        video_id: str,
+        stage: str,
+        params: Any,
+        fn: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Run fn once for concurrent identical requests and share its result.
+
+        Args:
+            video_id: Video UUID
+            stage: Stage name
+            params: Parameters distinguishing otherwise identical runs
+            fn: Coroutine factory performing the work
+
+        Returns:
+            Result of the (shared) execution
+        """
+        params_hash = hash_values(params)
+        key = (video_id, stage, params_hash)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            logger.info(f"Joining in-flight {stage} for {video_id}")
+        else:
+            task = asyncio.create_task(self._run_locked(key, fn))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # 呼び出し元がキャンセルされても共有タスクは継続させる
+        return await asyncio.shield(task)
+
+    async def _run_locked(self, key: tuple[str, str, str], fn: Callable[[], Awaitable[T]]) -> T:
+        """プロセス間ロックを取得して実行"""
+        video_id, stage, params_hash = key
+        lock = FileLock(self.lock_path(video_id, stage, params_hash))
+        async with lock:
+            return await fn()
+
+    def in_flight(self) -> list[dict[str, str]]:
+        """実行中のキー一覧を取得"""
+        return [
+            {"video_id": video_id, "stage": stage, "params_hash": params_hash}
+            for video_id, stage, params_hash in self._in_flight
+        ]
+
+
+single_flight = SingleFlight()
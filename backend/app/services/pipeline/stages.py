@@ -0,0 +1,682 @@
+"""
+Pipeline stage functions with manifest-based skipping.
+
+各ステージは入力 (ファイル内容のハッシュ + 設定値) を manifest と比較し、
+一致する場合は既存の成果物を再利用する。同一ステージの同時実行は
+single_flight により 1 回にまとめられる。
+"""
+import asyncio
+import shutil
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core import VideoProcessingError, logger, settings
+from app.models import ManualPlan
+from app.services.capture import generate_renditions, rendition_widths
+from app.services.export import (
+    MANUAL_CSS,
+    SCREEN_CSS,
+    HTMLExporter,
+    PDFExporter,
+    resolve_image_path,
+)
+from app.services.scenes import OpenCVSceneDetector
+from app.services.stt import get_stt_engine
+from app.services.summarizer import get_summarizer
+from app.services.template import get_template_renderer
+from app.utils import (
+    FFmpegProgress,
+    FFmpegWrapper,
+    atomic_write_text,
+    build_thumbnails_vtt,
+    describe_sprites,
+    media_probe,
+    unlink_if_shared,
+)
+
+from .admission import admission
+from .manifest import StageManifest, hash_values
+from .singleflight import single_flight
+
+AUDIO_SAMPLE_RATE = 16000
+
+ffmpeg = FFmpegWrapper()
+
+
+@dataclass
+class StageResult:
+    """ステージ実行結果"""
+
+    stage: str
+    output_path: Path
+    input_hash: str
+    cached: bool
+
+
+def find_source_video(video_id: str) -> Optional[Path]:
+    """アップロード済み動画 (source.*) のパスを取得"""
+    video_dir = settings.upload_dir / video_id
+    video_files = sorted(video_dir.glob("source.*"))
+    return video_files[0] if video_files else None
+
+
+def _require_source_video(video_id: str) -> Path:
+    """動画パスを取得 (存在しない場合はエラー)"""
+    video_path = find_source_video(video_id)
+    if video_path is None:
+        raise VideoProcessingError(f"動画が見つかりません: {video_id}")
+    return video_path
+
+
+async def _media_duration(video_path: Path) -> Optional[float]:
+    """動画の長さを取得 (失敗時は None、タイムアウトは上限値になる)"""
+    try:
+        return (await media_probe.probe(video_path)).duration_sec
+    except Exception as e:
+        logger.warning(f"Failed to get duration of {video_path}: {e}")
+        return None
+
+
+def _progress_logger(
+    video_id: str, stage: str, step: float = 10.0
+) -> Callable[[FFmpegProgress], None]:
+    """ffmpeg の進捗を一定間隔でログ出力するコールバックを作成"""
+    next_percent = step
+
+    def log(progress: FFmpegProgress) -> None:
+        nonlocal next_percent
+        percent = progress.percent
+        if percent is not None and (percent >= next_percent or progress.done):
+            logger.info(f"{stage} for {video_id}: {percent:.0f}% (speed={progress.speed}x)")
+            next_percent = (percent // step + 1) * step
+
+    return log
+
+
+async def run_audio_extraction(video_id: str) -> StageResult:
+    """
+    Extract mono 16 kHz audio from the source video.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for audio.wav
+    """
+    return await single_flight.do(video_id, "audio", {}, lambda: _run_audio_extraction(video_id))
+
+
+async def _run_audio_extraction(video_id: str) -> StageResult:
+    """音声抽出の本体"""
+    video_path = _require_source_video(video_id)
+    manifest = StageManifest(video_id)
+    audio_path = settings.intermediate_dir / video_id / "audio.wav"
+
+    video_digest = await asyncio.to_thread(manifest.file_digest, video_path)
+    input_hash = hash_values("audio", video_digest, AUDIO_SAMPLE_RATE)
+    if await asyncio.to_thread(manifest.is_fresh, "audio", input_hash):
+        logger.info(f"Audio up to date, skipping extraction: {video_id}")
+        return StageResult("audio", audio_path, input_hash, cached=True)
+
+    audio_path.parent.mkdir(parents=True, exist_ok=True)
+    # 重複排除で共有された音声を上書きしないよう切り離す
+    unlink_if_shared(audio_path)
+    async with admission.limit("stt"):
+        await ffmpeg.extract_audio_async(
+            video_path,
+            audio_path,
+            sample_rate=AUDIO_SAMPLE_RATE,
+            duration_sec=await _media_duration(video_path),
+            on_progress=_progress_logger(video_id, "audio"),
+        )
+    await asyncio.to_thread(manifest.record, "audio", input_hash, [audio_path])
+    return StageResult("audio", audio_path, input_hash, cached=False)
+
+
+def _proxy_params() -> dict[str, float]:
+    """プロキシ生成の設定値"""
+    return {
+        "height": settings.proxy_height,
+        "fps": settings.proxy_fps,
+        "gop_frames": settings.proxy_gop_frames,
+    }
+
+
+async def run_proxy(video_id: str) -> StageResult:
+    """
+    Transcode the low-resolution analysis proxy of a video.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for proxy.mp4
+    """
+    return await single_flight.do(video_id, "proxy", _proxy_params(), lambda: _run_proxy(video_id))
+
+
+async def _run_proxy(video_id: str) -> StageResult:
+    """プロキシ生成の本体"""
+    video_path = _require_source_video(video_id)
+    manifest = StageManifest(video_id)
+    proxy_path = settings.intermediate_dir / video_id / "proxy.mp4"
+    params = _proxy_params()
+
+    video_digest = await asyncio.to_thread(manifest.file_digest, video_path)
+    input_hash = hash_values("proxy", video_digest, params)
+    if await asyncio.to_thread(manifest.is_fresh, "proxy", input_hash):
+        logger.info(f"Proxy up to date, skipping transcode: {video_id}")
+        return StageResult("proxy", proxy_path, input_hash, cached=True)
+
+    unlink_if_shared(proxy_path)
+    async with admission.limit("vision"):
+        await ffmpeg.create_proxy_async(
+            video_path,
+            proxy_path,
+            height=params["height"],
+            fps=params["fps"],
+            gop_frames=params["gop_frames"],
+            duration_sec=await _media_duration(video_path),
+            on_progress=_progress_logger(video_id, "proxy"),
+        )
+    await asyncio.to_thread(manifest.record, "proxy", input_hash, [proxy_path])
+    return StageResult("proxy", proxy_path, input_hash, cached=False)
+
+
+async def prepare_analysis_inputs(video_id: str) -> StageResult:
+    """
+    Post-upload stage: build the analysis proxy (then the timeline sprites) and the
+    16 kHz mono audio track.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for proxy.mp4 (or audio.wav when the proxy is disabled)
+    """
+    if not settings.proxy_enabled:
+        return await run_audio_extraction(video_id)
+    proxy, _ = await asyncio.gather(
+        _run_proxy_and_sprites(video_id), run_audio_extraction(video_id)
+    )
+    return proxy
+
+
+async def _run_proxy_and_sprites(video_id: str) -> StageResult:
+    """プロキシ生成後にタイムラインのスプライトを生成 (スプライトの失敗は記録のみ)"""
+    proxy = await run_proxy(video_id)
+    if settings.sprites_enabled:
+        try:
+            await run_sprites(video_id)
+        except Exception as e:
+            logger.warning(f"Sprite generation failed for {video_id}: {e}")
+    return proxy
+
+
+async def find_analysis_video(video_id: str) -> Path:
+    """
+    Get the video used for analysis and previews (proxy if enabled, else the original).
+
+    プロキシが未生成の場合はここで生成する (アップロード後の生成と single-flight で合流)。
+    生成に失敗した場合は元動画を返す。
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        Path to the proxy or the source video
+    """
+    video_path = _require_source_video(video_id)
+    if not settings.proxy_enabled:
+        return video_path
+    try:
+        return (await run_proxy(video_id)).output_path
+    except Exception as e:
+        logger.warning(f"Proxy unavailable, analysing original for {video_id}: {e}")
+        return video_path
+
+
+async def run_transcription(video_id: str) -> StageResult:
+    """
+    Run speech-to-text (and summarization) for a video.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for transcription.json
+    """
+    return await single_flight.do(
+        video_id, "transcription", {}, lambda: _run_transcription(video_id)
+    )
+
+
+async def _run_transcription(video_id: str) -> StageResult:
+    """文字起こしの本体"""
+    video_path = _require_source_video(video_id)
+    audio = await run_audio_extraction(video_id)
+    manifest = StageManifest(video_id)
+    output_path = settings.intermediate_dir / video_id / "transcription.json"
+
+    input_hash = hash_values(
+        "transcription",
+        audio.input_hash,
+        video_path.name,
+        {
+            "stt_engine": settings.stt_engine,
+            "whisper_model": settings.whisper_model,
+            "language": settings.whisper_language,
+            "summarize": bool(settings.openai_api_key),
+            "openai_model": settings.openai_model,
+        },
+    )
+    if await asyncio.to_thread(manifest.is_fresh, "transcription", input_hash):
+        logger.info(f"Transcription up to date, skipping: {video_id}")
+        return StageResult("transcription", output_path, input_hash, cached=True)
+
+    # STT 実行
+    async with admission.limit("stt"):
+        stt_engine = get_stt_engine()
+        transcription = await stt_engine.transcribe(audio.output_path, video_path.name)
+
+    # 文字起こしテキストを結合
+    full_text = " ".join([seg.text for seg in transcription.segments])
+
+    # GPTで要約を実行
+    if settings.openai_api_key:
+        try:
+            logger.info(f"Starting summarization for video: {video_id}")
+            summarizer = get_summarizer()
+            transcription.summary = await summarizer.summarize(full_text)
+            logger.info(f"Summarization completed: {video_id}")
+        except Exception as e:
+            logger.warning(f"Summarization failed, continuing without summary: {e}")
+            transcription.summary = None
+    else:
+        logger.info("OpenAI API key not configured, skipping summarization")
+        transcription.summary = None
+
+    atomic_write_text(output_path, transcription.model_dump_json(indent=2))
+    await asyncio.to_thread(manifest.record, "transcription", input_hash, [output_path])
+    return StageResult("transcription", output_path, input_hash, cached=False)
+
+
+async def run_scene_detection(video_id: str) -> StageResult:
+    """
+    Detect scene changes and extract keyframes for a video.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for scenes.json
+    """
+    return await single_flight.do(video_id, "scenes", {}, lambda: _run_scene_detection(video_id))
+
+
+async def _run_scene_detection(video_id: str) -> StageResult:
+    """シーン検出の本体"""
+    video_path = _require_source_video(video_id)
+    manifest = StageManifest(video_id)
+    output_path = settings.intermediate_dir / video_id / "scenes.json"
+
+    detector = OpenCVSceneDetector()
+    # 変化検出はプロキシで行い、キーフレームは元動画の同時刻から取得する
+    analysis_path = await find_analysis_video(video_id)
+    use_proxy = analysis_path != video_path
+    video_digest = await asyncio.to_thread(manifest.file_digest, video_path)
+    input_hash = hash_values(
+        "scenes",
+        video_digest,
+        {
+            "threshold": detector.threshold,
+            "min_scene_duration": detector.min_scene_duration,
+            "method": detector.method,
+            "proxy": _proxy_params() if use_proxy else None,
+            "renditions": {
+                "widths": rendition_widths(),
+                "format": settings.rendition_format,
+                "quality": settings.rendition_quality,
+            },
+        },
+    )
+    if await asyncio.to_thread(manifest.is_fresh, "scenes", input_hash):
+        logger.info(f"Scenes up to date, skipping detection: {video_id}")
+        return StageResult("scenes", output_path, input_hash, cached=True)
+
+    capture_dir = settings.capture_dir / video_id
+    capture_dir.mkdir(parents=True, exist_ok=True)
+    for frame_path in capture_dir.glob("*.jpg"):
+        unlink_if_shared(frame_path)
+    async with admission.limit("vision"):
+        scene_result = await detector.detect_scenes(
+            analysis_path, capture_dir, keyframe_source=video_path if use_proxy else None
+        )
+        # 元動画のファイル名を記録 (プロキシ名ではなく)
+        scene_result.video_filename = video_path.name
+        # 一覧用・画面用・印刷用の縮小版を並列に生成
+        shutil.rmtree(capture_dir / "renditions", ignore_errors=True)
+        await generate_renditions(scene_result.scenes, capture_dir)
+
+    atomic_write_text(output_path, scene_result.model_dump_json(indent=2))
+    await asyncio.to_thread(manifest.record, "scenes", input_hash, [output_path])
+    return StageResult("scenes", output_path, input_hash, cached=False)
+
+
+def _sprite_params() -> dict[str, float]:
+    """スプライト生成の設定値"""
+    return {
+        "interval_sec": settings.sprite_interval_sec,
+        "width": settings.sprite_width,
+        "columns": settings.sprite_columns,
+        "rows": settings.sprite_rows,
+    }
+
+
+async def run_sprites(video_id: str) -> StageResult:
+    """
+    Generate timeline sprite sheets and their WebVTT thumbnail track.
+
+    Args:
+        video_id: Video UUID
+
+    Returns:
+        StageResult for sprites.json (layout and URLs)
+    """
+    return await single_flight.do(
+        video_id, "sprites", _sprite_params(), lambda: _run_sprites(video_id)
+    )
+
+
+async def _run_sprites(video_id: str) -> StageResult:
+    """スプライト生成の本体"""
+    video_path = _require_source_video(video_id)
+    manifest = StageManifest(video_id)
+    output_path = settings.intermediate_dir / video_id / "sprites.json"
+    params = _sprite_params()
+
+    # 縮小済みのプロキシから生成する (デコード量が少ない)
+    analysis_path = await find_analysis_video(video_id)
+    use_proxy = analysis_path != video_path
+    video_digest = await asyncio.to_thread(manifest.file_digest, video_path)
+    input_hash = hash_values(
+        "sprites",
+        video_digest,
+        params,
+        _proxy_params() if use_proxy else None,
+    )
+    if await asyncio.to_thread(manifest.is_fresh, "sprites", input_hash):
+        logger.info(f"Sprites up to date, skipping generation: {video_id}")
+        return StageResult("sprites", output_path, input_hash, cached=True)
+
+    # 入力ハッシュ名のディレクトリに出力し、URL 単位で長期キャッシュできるようにする
+    sprites_root = settings.intermediate_dir / video_id / "sprites"
+    shutil.rmtree(sprites_root, ignore_errors=True)
+    sheet_dir = sprites_root / input_hash[:16]
+    duration = await _media_duration(video_path)
+    async with admission.limit("vision"):
+        sheets = await ffmpeg.create_sprites_async(
+            analysis_path,
+            sheet_dir,
+            interval_sec=params["interval_sec"],
+            width=int(params["width"]),
+            columns=int(params["columns"]),
+            rows=int(params["rows"]),
+            duration_sec=duration,
+            on_progress=_progress_logger(video_id, "sprites"),
+        )
+    if not sheets:
+        raise VideoProcessingError(f"スプライトシートが生成されませんでした: {video_id}")
+
+    vtt_path = sheet_dir / "thumbnails.vtt"
+    sprites = describe_sprites(
+        video_id,
+        sheets,
+        vtt_path,
+        interval_sec=params["interval_sec"],
+        columns=int(params["columns"]),
+        rows=int(params["rows"]),
+        duration_sec=duration,
+    )
+    atomic_write_text(vtt_path, build_thumbnails_vtt(sprites, duration))
+    atomic_write_text(output_path, sprites.model_dump_json(indent=2))
+    await asyncio.to_thread(
+        manifest.record, "sprites", input_hash, [output_path, vtt_path, *sheets]
+    )
+    return StageResult("sprites", output_path, input_hash, cached=False)
+
+
+def record_plan(video_id: str, plan: ManualPlan) -> Path:
+    """
+    Save a manual plan and invalidate the exports derived from it.
+
+    Args:
+        video_id: Video UUID
+        plan: Manual plan (auto-generated or edited)
+
+    Returns:
+        Path to manual_plan.json
+    """
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    plan_json = plan.model_dump_json(indent=2)
+    atomic_write_text(plan_path, plan_json)
+    StageManifest(video_id).record("plan", hash_values("plan", plan_json), [plan_path])
+    return plan_path
+
+
+async def run_markdown_export(video_id: str, template_name: Optional[str] = None) -> StageResult:
+    """
+    Render the manual plan to Markdown unless the existing file is up to date.
+
+    Args:
+        video_id: Video UUID
+        template_name: Template filename (default: settings.default_template)
+
+    Returns:
+        StageResult for manual.md
+    """
+    template_name = template_name or settings.default_template
+    return await single_flight.do(
+        video_id,
+        "markdown",
+        {"template": template_name},
+        lambda: _run_markdown_export(video_id, template_name),
+    )
+
+
+def _plan_image_paths(plan_path: Path) -> list[Optional[Path]]:
+    """採用ステップの画像のパス (存在しない画像は None、画像の差し替えもエクスポートの入力)"""
+    plan = ManualPlan.model_validate_json(plan_path.read_text(encoding="utf-8"))
+    paths: list[Optional[Path]] = []
+    for step in plan.steps:
+        if step.selected and step.image:
+            image_path = resolve_image_path(step.image)
+            paths.append(image_path if image_path.exists() else None)
+    return paths
+
+
+def export_input_hash(video_id: str, stage: str, template_name: Optional[str] = None) -> str:
+    """
+    Compute the content hash of an export from its inputs, without rendering anything.
+
+    Markdown: plan JSON, template source and the images the plan references.
+    PDF: the Markdown inputs plus the engine, stylesheet and print settings.
+    HTML: the Markdown inputs plus the stylesheet and the rendition settings (srcset).
+    Blocking (manifest lock, hashing of changed files): run it in a worker thread from
+    async code.
+
+    Args:
+        video_id: Video UUID
+        stage: "markdown", "pdf" or "html"
+        template_name: Template filename (default: settings.default_template)
+
+    Returns:
+        Hex SHA-256 digest
+
+    Raises:
+        VideoProcessingError: If the manual plan does not exist
+    """
+    template_name = template_name or settings.default_template
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    if not plan_path.exists():
+        raise VideoProcessingError(f"マニュアル計画が見つかりません: {video_id}")
+
+    template_path = settings.template_dir / template_name
+    image_paths = _plan_image_paths(plan_path)
+    # 計画・テンプレート・画像のハッシュは manifest の 1 回の読み込み (と最大 1 回の書き込み) で取得
+    digests = StageManifest(video_id).file_digests(
+        [plan_path]
+        + ([template_path] if template_path.exists() else [])
+        + [path for path in image_paths if path is not None]
+    )
+    markdown_hash = hash_values(
+        "markdown",
+        digests[plan_path],
+        template_name,
+        digests.get(template_path),
+        [digests[path] if path is not None else None for path in image_paths],
+    )
+    if stage == "markdown":
+        return markdown_hash
+    if stage == "pdf":
+        return hash_values(
+            "pdf",
+            markdown_hash,
+            settings.pdf_engine,
+            MANUAL_CSS,
+            settings.pdf_image_dpi,
+            settings.pdf_content_width_mm,
+            settings.pdf_image_format,
+            settings.pdf_image_quality,
+            settings.pdf_chunk_steps,
+        )
+    if stage == "html":
+        return hash_values(
+            "html",
+            markdown_hash,
+            SCREEN_CSS,
+            rendition_widths(),
+            settings.rendition_format,
+        )
+    raise ValueError(f"Unknown export stage: {stage}")
+
+
+def cached_export(
+    video_id: str, stage: str, template_name: Optional[str] = None
+) -> Optional[StageResult]:
+    """
+    Get an export artifact if it is up to date with its inputs.
+
+    Args:
+        video_id: Video UUID
+        stage: "markdown", "pdf" or "html"
+        template_name: Template filename (default: settings.default_template)
+
+    Returns:
+        Cached StageResult, or None if the export has to be (re)generated
+    """
+    try:
+        input_hash = export_input_hash(video_id, stage, template_name)
+    except VideoProcessingError:
+        return None
+    manifest = StageManifest(video_id)
+    if not manifest.is_fresh(stage, input_hash):
+        return None
+    return StageResult(stage, Path(manifest.get(stage)["outputs"][0]), input_hash, cached=True)
+
+
+async def _run_markdown_export(video_id: str, template_name: str) -> StageResult:
+    """Markdown レンダリングの本体"""
+    renderer = get_template_renderer()
+    # デフォルトテンプレートが存在しない場合は作成
+    renderer.create_default_template()
+
+    manifest = StageManifest(video_id)
+    output_path = settings.export_dir / video_id / "manual.md"
+    input_hash = await asyncio.to_thread(export_input_hash, video_id, "markdown", template_name)
+    if await asyncio.to_thread(manifest.is_fresh, "markdown", input_hash):
+        logger.info(f"Markdown up to date, skipping render: {video_id}")
+        return StageResult("markdown", output_path, input_hash, cached=True)
+
+    plan_path = settings.intermediate_dir / video_id / "manual_plan.json"
+    plan = ManualPlan.model_validate_json(plan_path.read_text(encoding="utf-8"))
+    await renderer.render_to_file(plan, output_path, template_name)
+    await asyncio.to_thread(manifest.record, "markdown", input_hash, [output_path])
+    return StageResult("markdown", output_path, input_hash, cached=False)
+
+
+async def run_pdf_export(video_id: str, template_name: Optional[str] = None) -> StageResult:
+    """
+    Convert the (freshly rendered) Markdown manual to PDF.
+
+    Args:
+        video_id: Video UUID
+        template_name: Template filename (default: settings.default_template)
+
+    Returns:
+        StageResult for manual.pdf
+    """
+    template_name = template_name or settings.default_template
+    return await single_flight.do(
+        video_id,
+        "pdf",
+        {"template": template_name, "engine": settings.pdf_engine},
+        lambda: _run_pdf_export(video_id, template_name),
+    )
+
+
+async def _run_pdf_export(video_id: str, template_name: str) -> StageResult:
+    """PDF 変換の本体"""
+    # テンプレートのハッシュが Markdown 側と一致するよう、先にデフォルトテンプレートを用意する
+    get_template_renderer().create_default_template()
+    manifest = StageManifest(video_id)
+    output_path = settings.export_dir / video_id / "manual.pdf"
+    input_hash = await asyncio.to_thread(export_input_hash, video_id, "pdf", template_name)
+    if await asyncio.to_thread(manifest.is_fresh, "pdf", input_hash):
+        logger.info(f"PDF up to date, skipping conversion: {video_id}")
+        return StageResult("pdf", output_path, input_hash, cached=True)
+
+    # 計画の編集が反映されるよう、Markdown は常に鮮度を確認してから使う
+    markdown = await run_markdown_export(video_id, template_name)
+    async with admission.limit("export"):
+        await PDFExporter().markdown_to_pdf(markdown.output_path, output_path)
+    await asyncio.to_thread(manifest.record, "pdf", input_hash, [output_path])
+    return StageResult("pdf", output_path, input_hash, cached=False)
+
+
+async def run_html_export(video_id: str, template_name: Optional[str] = None) -> StageResult:
+    """
+    Convert the (freshly rendered) Markdown manual to a self-contained HTML page.
+
+    Args:
+        video_id: Video UUID
+        template_name: Template filename (default: settings.default_template)
+
+    Returns:
+        StageResult for manual.html
+    """
+    template_name = template_name or settings.default_template
+    return await single_flight.do(
+        video_id,
+        "html",
+        {"template": template_name},
+        lambda: _run_html_export(video_id, template_name),
+    )
+
+
+async def _run_html_export(video_id: str, template_name: str) -> StageResult:
+    """HTML 変換の本体 (ブラウザは使わない)"""
+    get_template_renderer().create_default_template()
+    manifest = StageManifest(video_id)
+    output_path = settings.export_dir / video_id / "manual.html"
+    input_hash = await asyncio.to_thread(export_input_hash, video_id, "html", template_name)
+    if await asyncio.to_thread(manifest.is_fresh, "html", input_hash):
+        logger.info(f"HTML up to date, skipping conversion: {video_id}")
+        return StageResult("html", output_path, input_hash, cached=True)
+
+    markdown = await run_markdown_export(video_id, template_name)
+    await HTMLExporter().markdown_to_html(markdown.output_path, output_path)
+    await asyncio.to_thread(manifest.record, "html", input_hash, [output_path])
+    return StageResult("html", output_path, input_hash, cached=False)
@@ -3,6 +3,7 @@ Base interface for scene detection strategies.
 """
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Optional
 
 from app.models import SceneDetectionResult
 
@@ -11,13 +12,17 @@ class SceneDetectionStrategy(ABC):
     """シーン検出の基底クラス (Strategy パターン)"""
 
     @abstractmethod
-    async def detect_scenes(self, video_path: Path, output_dir: Path) -> SceneDetectionResult:
+    async def detect_scenes(
+        self, video_path: Path, output_dir: Path, keyframe_source: Optional[Path] = None
+    ) -> SceneDetectionResult:
         """
         Detect scene changes in video and extract keyframes.
 
         Args:
-            video_path: Path to video file
+            video_path: Path to video file analysed for scene changes (e.g. a low-res proxy)
             output_dir: Directory to save captured frames
+            keyframe_source: Video to take keyframes from at the detected timestamps
+                (default: video_path)
 
         Returns:
             SceneDetectionResult with scene timestamps and frame paths
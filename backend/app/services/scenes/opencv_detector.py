@@ -1,16 +1,15 @@
 """
 OpenCV-based scene detection implementation.
 """
-import asyncio
 from pathlib import Path
 from typing import Optional
 
 import cv2
 import numpy as np
 
-from app.core import SceneDetectionError, logger, settings
+from app.core import SceneDetectionError, executors, logger, settings
 from app.models import SceneDetectionResult, SceneInfo
-from app.utils import FFmpegWrapper
+from app.utils import FFmpegWrapper, iter_frames, media_probe
 
 from .base import SceneDetectionStrategy
 
@@ -37,32 +36,41 @@ class OpenCVSceneDetector(SceneDetectionStrategy):
         self.method = method or settings.scene_detection_method
         self.ffmpeg = FFmpegWrapper()
 
-    async def detect_scenes(self, video_path: Path, output_dir: Path) -> SceneDetectionResult:
+    async def detect_scenes(
+        self, video_path: Path, output_dir: Path, keyframe_source: Optional[Path] = None
+    ) -> SceneDetectionResult:
         """シーン検出を実行"""
         logger.info(
             f"Starting scene detection for {video_path.name} "
             f"(method={self.method}, threshold={self.threshold})"
         )
 
-        # 非同期実行のため別スレッドで実行
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None, self._detect_scenes_sync, video_path, output_dir
+        # 非同期実行のため vision プールで実行
+        result = await executors.run(
+            "vision", self._detect_scenes_sync, video_path, output_dir, keyframe_source
         )
 
         logger.info(f"Scene detection completed: {len(result.scenes)} scenes detected")
         return result
 
-    def _detect_scenes_sync(self, video_path: Path, output_dir: Path) -> SceneDetectionResult:
+    def _detect_scenes_sync(
+        self, video_path: Path, output_dir: Path, keyframe_source: Optional[Path] = None
+    ) -> SceneDetectionResult:
         """同期的なシーン検出処理"""
         output_dir.mkdir(parents=True, exist_ok=True)
+        # 元動画から取り直すキーフレーム (時刻, 保存先, 解析動画のフレーム)
+        pending: list[tuple[float, Path, np.ndarray]] = []
 
         cap = cv2.VideoCapture(str(video_path))
         if not cap.isOpened():
             raise SceneDetectionError(f"動画を開けませんでした: {video_path}")
 
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # プローブ済みのメディア情報があれば使用 (なければ OpenCV のメタデータ)
+        media_info = media_probe.get_cached(video_path)
+        fps = (media_info and media_info.fps) or cap.get(cv2.CAP_PROP_FPS)
+        frame_count = (media_info and media_info.frame_count) or int(
+            cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        )
         min_frames = int(self.min_scene_duration * fps)
 
         scenes: list[SceneInfo] = []
@@ -90,7 +98,10 @@ class OpenCVSceneDetector(SceneDetectionStrategy):
                         frame_path = output_dir / f"scene_{len(scenes):04d}_{timestamp:.2f}s.jpg"
 
                         # キーフレームを保存
-                        cv2.imwrite(str(frame_path), frame)
+                        if keyframe_source is None:
+                            cv2.imwrite(str(frame_path), frame)
+                        else:
+                            pending.append((timestamp, frame_path, frame.copy()))
 
                         # 相対パスを計算（クロスプラットフォーム対応）
                         try:
@@ -121,7 +132,10 @@ class OpenCVSceneDetector(SceneDetectionStrategy):
             cap = cv2.VideoCapture(str(video_path))
             ret, first_frame = cap.read()
             if ret:
-                cv2.imwrite(str(first_frame_path), first_frame)
+                if keyframe_source is None:
+                    cv2.imwrite(str(first_frame_path), first_frame)
+                else:
+                    pending.append((0.0, first_frame_path, first_frame))
 
                 # 相対パスを計算（クロスプラットフォーム対応）
                 try:
@@ -139,11 +153,34 @@ class OpenCVSceneDetector(SceneDetectionStrategy):
                 )
             cap.release()
 
+        if pending:
+            self._write_keyframes_from_source(keyframe_source, pending)
+
         return SceneDetectionResult(
             video_filename=video_path.name,
             scenes=scenes,
         )
 
+    def _write_keyframes_from_source(
+        self, source_path: Path, pending: list[tuple[float, Path, np.ndarray]]
+    ) -> None:
+        """検出した時刻のキーフレームを元動画から取得 (失敗時は解析動画のフレームを使用)"""
+        cap = cv2.VideoCapture(str(source_path))
+        try:
+            if cap.isOpened():
+                # 時刻順に 1 回のデコードパスで取得
+                frames = iter_frames(cap, [p[0] for p in pending])
+            else:
+                frames = ((index, None) for index in range(len(pending)))
+            for index, frame in frames:
+                timestamp, frame_path, fallback = pending[index]
+                if frame is None:
+                    logger.warning(f"Keyframe at {timestamp:.2f}s taken from analysis video")
+                    frame = fallback
+                cv2.imwrite(str(frame_path), frame)
+        finally:
+            cap.release()
+
     def _detect_change(self, frame1: np.ndarray, frame2: np.ndarray) -> bool:
         """2フレーム間の変化を検出"""
         if self.method == "histogram":
@@ -6,7 +6,7 @@ from pathlib import Path
 
 from app.core import logger
 from app.models import Transcription, TranscriptionSegment
-from app.utils import FFmpegWrapper
+from app.utils import media_probe
 
 from .base import STTStrategy
 
@@ -18,27 +18,10 @@ class DummySTT(STTStrategy):
         """ダミーの文字起こし結果を生成"""
         logger.info(f"Dummy STT: Generating fake transcription for {video_filename}")
 
-        # 動画の長さを取得
-        ffmpeg = FFmpegWrapper()
-        # 音声ファイルから動画パスを推測 (実際は別途渡すべき)
+        # 音声の長さを取得 (キャッシュ / WAV ヘッダーから)
         duration = 60.0  # デフォルト値
-
         try:
-            # 実際の長さを取得する場合
-            import subprocess
-
-            cmd = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(audio_path),
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            duration = float(result.stdout.strip())
+            duration = (await media_probe.probe(audio_path)).duration_sec or duration
         except Exception:
             pass
 
@@ -9,7 +9,7 @@ from openai import AsyncOpenAI
 
 from app.core import STTError, logger, settings
 from app.models import Transcription, TranscriptionSegment
-from app.utils import FFmpegWrapper
+from app.utils import media_probe
 
 from .base import STTStrategy
 
@@ -36,7 +36,6 @@ class GPT4oSTT(STTStrategy):
             raise ValueError("OpenAI APIキーが設定されていません。環境変数OPENAI_API_KEYを設定してください。")
 
         self.client = AsyncOpenAI(api_key=self.api_key)
-        self.ffmpeg = FFmpegWrapper()
 
     async def transcribe(self, audio_path: Path, video_filename: str) -> Transcription:
         """音声認識を実行"""
@@ -46,6 +45,9 @@ class GPT4oSTT(STTStrategy):
         )
 
         try:
+            # 音声の長さを取得 (WAV ヘッダー / キャッシュから、ffprobe は起動しない)
+            duration = (await media_probe.probe(audio_path)).duration_sec or 0.0
+
             # 音声ファイルを開く
             with open(audio_path, "rb") as audio_file:
                 # GPT-4o Transcriptionを実行
@@ -83,7 +85,6 @@ class GPT4oSTT(STTStrategy):
             else:
                 # セグメント情報がない場合は、テキストを手動で分割
                 logger.warning("No segments in response, using manual splitting")
-                duration = self.ffmpeg.get_video_duration(audio_path)
                 full_text = response.text if hasattr(response, 'text') else ""
 
                 # 句読点や改行で分割してセグメントを作成
@@ -113,9 +114,6 @@ class GPT4oSTT(STTStrategy):
                         )
                     )
 
-            # 動画の長さを取得
-            duration = self.ffmpeg.get_video_duration(audio_path)
-
             logger.info(f"GPT-4o transcription completed: {len(segments)} segments")
 
             return Transcription(
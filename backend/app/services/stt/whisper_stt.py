@@ -1,18 +1,22 @@
 """
 Whisper-based STT implementation.
 """
-import asyncio
+import threading
 from pathlib import Path
 from typing import Optional
 
 import whisper
 
-from app.core import STTError, logger, settings
+from app.core import STTError, executors, logger, settings
 from app.models import Transcription, TranscriptionSegment
-from app.utils import FFmpegWrapper
+from app.utils import media_probe
 
 from .base import STTStrategy
 
+# ロード済みモデルのキャッシュ (プロセス単位、プロセスプールのワーカーでも再利用される)
+_MODEL_CACHE: dict[tuple[str, str], whisper.Whisper] = {}
+_MODEL_LOCK = threading.Lock()
+
 
 class WhisperSTT(STTStrategy):
     """OpenAI Whisperを使用した音声認識実装"""
@@ -34,20 +38,20 @@ class WhisperSTT(STTStrategy):
         self.model_name = model_name or settings.whisper_model
         self.device = device or settings.whisper_device
         self.language = language or settings.whisper_language
-        self.model: Optional[whisper.Whisper] = None
-        self.ffmpeg = FFmpegWrapper()
 
     def _load_model(self) -> whisper.Whisper:
-        """Whisperモデルをロード (遅延ロード)"""
-        if self.model is None:
-            logger.info(f"Loading Whisper model: {self.model_name} on {self.device}")
-            try:
-                self.model = whisper.load_model(self.model_name, device=self.device)
-                logger.info("Whisper model loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load Whisper model: {e}")
-                raise STTError(f"Whisperモデルのロードに失敗しました: {e}")
-        return self.model
+        """Whisperモデルをロード (遅延ロード、プロセス内でキャッシュ)"""
+        key = (self.model_name, self.device)
+        with _MODEL_LOCK:
+            if key not in _MODEL_CACHE:
+                logger.info(f"Loading Whisper model: {self.model_name} on {self.device}")
+                try:
+                    _MODEL_CACHE[key] = whisper.load_model(self.model_name, device=self.device)
+                    logger.info("Whisper model loaded successfully")
+                except Exception as e:
+                    logger.error(f"Failed to load Whisper model: {e}")
+                    raise STTError(f"Whisperモデルのロードに失敗しました: {e}")
+            return _MODEL_CACHE[key]
 
     async def transcribe(self, audio_path: Path, video_filename: str) -> Transcription:
         """音声認識を実行"""
@@ -56,9 +60,8 @@ class WhisperSTT(STTStrategy):
             f"(model={self.model_name}, language={self.language})"
         )
 
-        # 非同期実行のため別スレッドで実行
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, self._transcribe_sync, audio_path, video_filename)
+        # 非同期実行のため stt プールで実行
+        result = await executors.run("stt", self._transcribe_sync, audio_path, video_filename)
 
         logger.info(f"Transcription completed: {len(result.segments)} segments")
         return result
@@ -88,8 +91,8 @@ class WhisperSTT(STTStrategy):
                     )
                 )
 
-            # 動画の長さを取得
-            duration = self.ffmpeg.get_video_duration(audio_path)
+            # 音声の長さを取得 (WAV ヘッダー / キャッシュから)
+            duration = media_probe.probe_sync(audio_path).duration_sec or 0.0
 
             return Transcription(
                 video_filename=video_filename,
@@ -1,6 +1,6 @@
 """
 Template rendering services.
 """
-from .renderer import TemplateRenderer
+from .renderer import TemplateRenderer, get_template_renderer
 
-__all__ = ["TemplateRenderer"]
+__all__ = ["TemplateRenderer", "get_template_renderer"]
@@ -1,14 +1,60 @@
 """
 Template rendering service using Jinja2.
 """
-from datetime import datetime
+import asyncio
+import os
+import tempfile
+import threading
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound
+import aiofiles
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateNotFound,
+)
 
 from app.core import TemplateError, logger, settings
 from app.models import ManualPlan
+from app.utils import atomic_write_text
+
+# ストリーミング時に 1 回で書き出す量 (バイト)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _context(plan: ManualPlan) -> dict[str, Any]:
+    """レンダリング用のコンテキスト"""
+    return {
+        "title": plan.title,
+        "source_video": plan.source_video,
+        "created_at": plan.created_at.isoformat(),
+        "steps": [step for step in plan.steps if step.selected],  # 採用されたステップのみ
+    }
+
+
+def _next_chunk(generator: Iterator[str], chunk_size: int) -> bytes:
+    """chunk_size 以上になるまで (または最後まで) 出力を集める"""
+    parts: list[str] = []
+    size = 0
+    for part in generator:
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            break
+    return "".join(parts).encode("utf-8")
+
+
+async def _iter_chunks(generator: Iterator[str], chunk_size: int) -> AsyncIterator[bytes]:
+    """テンプレートの出力をスレッドで少しずつ生成して返す (イベントループを止めない)"""
+    while True:
+        chunk = await asyncio.to_thread(_next_chunk, generator, chunk_size)
+        if not chunk:
+            return
+        yield chunk
 
 
 class TemplateRenderer:
@@ -23,10 +69,17 @@ class TemplateRenderer:
         """
         self.template_dir = template_dir or settings.template_dir
         self.template_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_dir = settings.data_dir / "cache" / "jinja"
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
 
         self.env = Environment(
             loader=FileSystemLoader(str(self.template_dir)),
             autoescape=False,  # Markdownなので自動エスケープは無効
+            # コンパイル済みテンプレートを保持し、.j2 の更新時刻が変わった場合のみ再コンパイル
+            cache_size=settings.template_cache_size,
+            auto_reload=True,
+            # プロセス再起動後もコンパイル結果を再利用
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
         )
 
     async def render(
@@ -48,35 +101,92 @@ class TemplateRenderer:
         """
         template_name = template_name or settings.default_template
         logger.info(f"Rendering manual with template: {template_name}")
-
-        try:
-            template = self.env.get_template(template_name)
-        except TemplateNotFound:
-            raise TemplateError(f"テンプレートが見つかりません: {template_name}")
-
-        # レンダリング用のコンテキスト
-        context = {
-            "title": plan.title,
-            "source_video": plan.source_video,
-            "created_at": plan.created_at.isoformat(),
-            "steps": [step for step in plan.steps if step.selected],  # 採用されたステップのみ
-        }
+        template = self._get_template(template_name)
 
         # レンダリング
-        content = template.render(**context)
+        content = template.render(**_context(plan))
 
         # 保存 (オプション)
         if output_path:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(content, encoding="utf-8")
+            atomic_write_text(output_path, content)
             logger.info(f"Rendered manual saved to: {output_path}")
 
         return content
 
+    def iter_render(
+        self,
+        plan: ManualPlan,
+        template_name: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Render manual plan to Markdown incrementally (``template.generate()``).
+
+        The template is resolved immediately so that a missing template raises before any
+        output is produced; rendering runs in a worker thread one chunk at a time.
+
+        Args:
+            plan: Manual plan to render
+            template_name: Template filename (default: manual_default.md.j2)
+            chunk_size: Approximate size in bytes of each yielded chunk
+
+        Returns:
+            Async iterator of UTF-8 encoded chunks
+
+        Raises:
+            TemplateError: If the template does not exist
+        """
+        template_name = template_name or settings.default_template
+        logger.info(f"Streaming manual with template: {template_name}")
+        template = self._get_template(template_name)
+        return _iter_chunks(template.generate(**_context(plan)), chunk_size)
+
+    async def render_to_file(
+        self, plan: ManualPlan, output_path: Path, template_name: Optional[str] = None
+    ) -> int:
+        """
+        Render manual plan straight to a file without building the whole document in memory.
+
+        Args:
+            plan: Manual plan to render
+            output_path: Destination (replaced atomically when rendering completes)
+            template_name: Template filename (default: manual_default.md.j2)
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            TemplateError: If the template does not exist
+        """
+        chunks = self.iter_render(plan, template_name)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=str(output_path.parent), prefix=f".{output_path.name}.", suffix=".tmp"
+        )
+        os.close(fd)
+        written = 0
+        try:
+            async with aiofiles.open(tmp_name, "wb") as out:
+                async for chunk in chunks:
+                    await out.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        logger.info(f"Rendered manual saved to: {output_path} ({written} bytes)")
+        return written
+
+    def _get_template(self, template_name: str) -> Template:
+        """テンプレートを取得 (存在しない場合は TemplateError)"""
+        try:
+            return self.env.get_template(template_name)
+        except TemplateNotFound:
+            raise TemplateError(f"テンプレートが見つかりません: {template_name}")
+
     def create_default_template(self) -> Path:
         """デフォルトテンプレートを作成 (存在しない場合)"""
         template_path = self.template_dir / settings.default_template
-
         if template_path.exists():
             logger.debug(f"Template already exists: {template_path}")
             return template_path
@@ -122,3 +232,27 @@ source: {{ source_video }}
         template_path.write_text(default_content, encoding="utf-8")
         logger.info(f"Default template created: {template_path}")
         return template_path
+
+
+# (テンプレートディレクトリ, データディレクトリ) 毎に共有するレンダラー
+_renderers: dict[tuple[Path, Path], TemplateRenderer] = {}
+_renderers_lock = threading.Lock()
+
+
+def get_template_renderer(template_dir: Optional[Path] = None) -> TemplateRenderer:
+    """
+    Get the app-wide renderer (Jinja2 environment and compiled templates are reused).
+
+    Args:
+        template_dir: Directory containing templates (default: settings.template_dir)
+
+    Returns:
+        Shared TemplateRenderer for the directory
+    """
+    template_dir = template_dir or settings.template_dir
+    key = (template_dir.resolve(), settings.data_dir.resolve())
+    with _renderers_lock:
+        renderer = _renderers.get(key)
+        if renderer is None:
+            renderer = _renderers[key] = TemplateRenderer(template_dir)
+        return renderer
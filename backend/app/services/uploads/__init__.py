@@ -0,0 +1,16 @@
+"""
+Upload services (resumable chunked uploads, content-hash deduplication).
+"""
+from .dedup import ContentIndex, DedupResult, deduplicate, deduplicate_async
+from .resumable import ResumableUpload, merge_range, missing_ranges, sweep_expired_uploads
+
+__all__ = [
+    "ContentIndex",
+    "DedupResult",
+    "deduplicate",
+    "deduplicate_async",
+    "ResumableUpload",
+    "merge_range",
+    "missing_ranges",
+    "sweep_expired_uploads",
+]
@@ -0,0 +1,163 @@
+"""
+Content-hash deduplication of uploaded videos.
+
+SHA-256 → 正規動画 (最初にアップロードされた video_id) のインデックスを
+data_dir/content_index.json に保持する。同一内容の動画が再アップロードされた場合は
+動画ファイルと再利用可能な中間成果物 (音声・プロキシ・文字起こし・シーン検出) をハードリンクし、
+manifest のステージ記録を引き継ぐことで再処理を省略する。
+
+共有されたファイルはアトミックな置き換え (atomic_write_* / link_or_copy) でのみ更新されるため、
+一方の動画で再処理しても他方の成果物は変更されない。
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from app.core import logger, settings
+from app.models import SceneDetectionResult
+from app.services.pipeline import StageManifest, find_source_video
+from app.utils import FileLock, atomic_write_text, link_or_copy, media_probe
+
+INDEX_FILENAME = "content_index.json"
+
+# 引き継ぐステージ (依存関係順)
+REUSABLE_STAGES = ("audio", "proxy", "transcription", "scenes")
+
+
+@dataclass
+class DedupResult:
+    """重複排除の結果"""
+
+    duplicate_of: Optional[str] = None
+    available_stages: list[str] = field(default_factory=list)
+
+
+class ContentIndex:
+    """SHA-256 → 正規 video_id のインデックス"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize content index.
+
+        Args:
+            path: Index file (default: data_dir/content_index.json)
+        """
+        self.path = path or settings.data_dir / INDEX_FILENAME
+        self._lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def _load(self) -> dict[str, str]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Broken content index, starting fresh: {self.path} ({e})")
+            return {}
+
+    def claim(self, sha256: str, video_id: str) -> str:
+        """
+        Register a video as canonical for its hash unless a live canonical already exists.
+
+        Args:
+            sha256: Content hash
+            video_id: Newly uploaded video
+
+        Returns:
+            Canonical video_id (``video_id`` itself if it became canonical)
+        """
+        with self._lock:
+            index = self._load()
+            canonical = index.get(sha256)
+            if canonical and canonical != video_id and find_source_video(canonical) is not None:
+                return canonical
+            index[sha256] = video_id
+            atomic_write_text(self.path, json.dumps(index, indent=2))
+            return video_id
+
+    def lookup(self, sha256: str) -> Optional[str]:
+        """ハッシュに対応する正規 video_id を取得"""
+        return self._load().get(sha256)
+
+
+def deduplicate(video_id: str, video_path: Path, sha256: str) -> DedupResult:
+    """
+    Link a freshly uploaded video to an existing identical one and reuse its artifacts.
+
+    Args:
+        video_id: Newly uploaded video
+        video_path: Its source file
+        sha256: Its content hash
+
+    Returns:
+        DedupResult with the canonical video_id and stages now available
+    """
+    if not settings.upload_dedup:
+        return DedupResult()
+
+    canonical = ContentIndex().claim(sha256, video_id)
+    if canonical == video_id:
+        return DedupResult()
+
+    canonical_path = find_source_video(canonical)
+    if canonical_path is None or canonical_path.stat().st_size != video_path.stat().st_size:
+        return DedupResult()
+
+    # 動画ファイルを共有 (元のアップロード分のディスクを解放)
+    link_or_copy(canonical_path, video_path)
+    media_info = media_probe.get_cached(canonical_path)
+    if media_info is not None:
+        media_probe.remember(video_path, media_info)
+    manifest = StageManifest(video_id)
+    manifest.remember_digest(video_path, sha256)
+
+    source_manifest = StageManifest(canonical)
+    available: list[str] = []
+    for stage in REUSABLE_STAGES:
+        entry = source_manifest.get(stage)
+        if entry is None or not all(Path(p).exists() for p in entry.get("outputs", [])):
+            continue
+        # 文字起こしのハッシュにはファイル名 (source.<ext>) が含まれる
+        if stage == "transcription" and canonical_path.name != video_path.name:
+            continue
+        if stage == "transcription" and "audio" not in available:
+            continue
+
+        outputs = [_reuse_output(Path(p), video_id) for p in entry["outputs"]]
+        manifest.record(stage, entry["input_hash"], outputs)
+        available.append(stage)
+
+    logger.info(f"Duplicate upload {video_id} of {canonical}, reused stages: {available}")
+    return DedupResult(duplicate_of=canonical, available_stages=available)
+
+
+async def deduplicate_async(video_id: str, video_path: Path, sha256: str) -> DedupResult:
+    """deduplicate をスレッドで実行"""
+    return await asyncio.to_thread(deduplicate, video_id, video_path, sha256)
+
+
+def _reuse_output(path: Path, video_id: str) -> Path:
+    """成果物を新しい動画のディレクトリへリンク (scenes.json はパスを書き換えて保存)"""
+    target = settings.intermediate_dir / video_id / path.name
+    if path.name != "scenes.json":
+        link_or_copy(path, target)
+        return target
+
+    # キャプチャ画像をリンクし、scenes.json 内のパスを新しい動画のものに置き換える
+    result = SceneDetectionResult.model_validate_json(path.read_text(encoding="utf-8"))
+    capture_dir = settings.capture_dir / video_id
+    for scene in result.scenes:
+        frame = Path(scene.frame_path)
+        if frame.exists():
+            new_frame = capture_dir / frame.name
+            link_or_copy(frame, new_frame)
+            scene.frame_path = str(new_frame)
+        for rendition in scene.renditions:
+            image = Path(rendition.path)
+            if image.exists():
+                new_image = capture_dir / image.parent.name / image.name
+                link_or_copy(image, new_image)
+                rendition.path = str(new_image)
+    atomic_write_text(target, result.model_dump_json(indent=2))
+    return target
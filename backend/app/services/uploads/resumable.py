@@ -0,0 +1,376 @@
+"""
+Resumable (tus-style) chunked uploads.
+
+アップロードごとに upload_dir/<upload_id>/ 以下へ以下を保存する。
+
+- ``upload.part``: 事前確保した書き込み先 (チャンクはオフセット指定で pwrite)
+- ``upload.json``: 受信済みバイト範囲などの状態
+
+全範囲が揃った時点で ``source.<ext>`` へリネームする。SHA-256 は先頭から連続して
+受信済みの範囲について逐次計算するため、完了時にファイル全体を読み直す必要はない。
+upload_expiry_sec の間更新のない未完了アップロードは、ハッシュ計算状態とディレクトリごと破棄する。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core import ValidationError, logger, settings
+from app.services.pipeline import StageManifest
+from app.utils import (
+    EXTENSION_CONTAINERS,
+    SNIFF_BYTES,
+    FileLock,
+    atomic_write_text,
+    check_container,
+)
+
+from .dedup import deduplicate_async
+
+_STATE_FILE = "upload.json"
+_PARTIAL_FILE = "upload.part"
+_READ_CHUNK_SIZE = 1024 * 1024
+# 期限切れアップロードの掃除を行う最短間隔
+_SWEEP_INTERVAL_SEC = 300.0
+
+
+class _PrefixHasher:
+    """先頭から連続した範囲の SHA-256 を逐次計算"""
+
+    def __init__(self):
+        self.offset = 0
+        self.digest = hashlib.sha256()
+        self.lock = asyncio.Lock()
+        self.used_at = time.monotonic()
+
+
+# upload_id → ハッシュ計算状態 (プロセス内。再起動後は未計算分をファイルから読み直す)
+_hashers: dict[str, _PrefixHasher] = {}
+_last_sweep: Optional[float] = None
+
+
+def merge_range(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """
+    Merge a received byte range into a sorted list of disjoint ranges.
+
+    Args:
+        ranges: Sorted, disjoint [start, end) ranges
+        start: Start offset (inclusive)
+        end: End offset (exclusive)
+
+    Returns:
+        New sorted, disjoint range list
+    """
+    if end <= start:
+        return [list(r) for r in ranges]
+
+    merged: list[list[int]] = []
+    for s, e in sorted([*ranges, [start, end]]):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+def missing_ranges(ranges: list[list[int]], size: int) -> list[list[int]]:
+    """未受信のバイト範囲を取得"""
+    missing = []
+    cursor = 0
+    for s, e in ranges:
+        if s > cursor:
+            missing.append([cursor, s])
+        cursor = max(cursor, e)
+    if cursor < size:
+        missing.append([cursor, size])
+    return missing
+
+
+class ResumableUpload:
+    """再開可能アップロード"""
+
+    def __init__(self, upload_id: str, base_dir: Optional[Path] = None):
+        """
+        Initialize a handle to an upload.
+
+        Args:
+            upload_id: Upload ID (also used as the video_id)
+            base_dir: Upload root (default: settings.upload_dir)
+        """
+        self.upload_id = upload_id
+        self.dir = (base_dir or settings.upload_dir) / upload_id
+        self.state_path = self.dir / _STATE_FILE
+        self.partial_path = self.dir / _PARTIAL_FILE
+        self._lock = FileLock(self.dir / f"{_STATE_FILE}.lock")
+
+    @classmethod
+    def create(
+        cls, filename: str, size_bytes: int, base_dir: Optional[Path] = None
+    ) -> "ResumableUpload":
+        """
+        Create a new upload and preallocate its file.
+
+        Args:
+            filename: Original filename
+            size_bytes: Total size in bytes
+            base_dir: Upload root (default: settings.upload_dir)
+
+        Returns:
+            ResumableUpload handle
+
+        Raises:
+            ValidationError: If the extension or size is not acceptable
+        """
+        ext = Path(filename).suffix.lower().lstrip(".")
+        if ext not in settings.get_video_extensions():
+            raise ValidationError(
+                f"対応していない形式です。許可: {settings.allowed_video_extensions}"
+            )
+        if size_bytes <= 0:
+            raise ValidationError("ファイルサイズが不正です")
+        if size_bytes > settings.max_video_size_mb * 1024 * 1024:
+            raise ValidationError(
+                f"ファイルサイズが大きすぎます。最大: {settings.max_video_size_mb}MB"
+            )
+
+        upload = cls(str(uuid.uuid4()), base_dir)
+        upload.dir.mkdir(parents=True, exist_ok=True)
+
+        fd = os.open(upload.partial_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            try:
+                os.posix_fallocate(fd, 0, size_bytes)
+            except (AttributeError, OSError):
+                # fallocate 非対応の環境ではスパースファイルとして確保
+                os.ftruncate(fd, size_bytes)
+        finally:
+            os.close(fd)
+
+        now = datetime.now().isoformat()
+        upload._save(
+            {
+                "upload_id": upload.upload_id,
+                "filename": filename,
+                "ext": ext,
+                "size_bytes": size_bytes,
+                "ranges": [],
+                "completed": False,
+                "sha256": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        logger.info(f"Resumable upload created: {upload.upload_id} ({filename}, {size_bytes}B)")
+        return upload
+
+    def exists(self) -> bool:
+        """アップロードが存在するか"""
+        return self.state_path.exists()
+
+    def load(self) -> dict[str, Any]:
+        """状態を読み込み"""
+        return json.loads(self.state_path.read_text(encoding="utf-8"))
+
+    def _save(self, state: dict[str, Any]) -> None:
+        state["updated_at"] = datetime.now().isoformat()
+        atomic_write_text(self.state_path, json.dumps(state, ensure_ascii=False, indent=2))
+
+    @staticmethod
+    def contiguous_offset(state: dict[str, Any]) -> int:
+        """先頭から連続して受信済みのバイト数"""
+        ranges = state["ranges"]
+        return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+    async def write_chunk(
+        self, offset: int, chunks: AsyncIterator[bytes]
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Write a chunk of the file at the given offset.
+
+        チャンクは任意の順序で受け付ける。接続が途中で切れた場合も書き込み済みの範囲は
+        記録されるため、再送は未受信の範囲のみでよい。
+
+        Args:
+            offset: Byte offset of the chunk
+            chunks: Chunk body stream
+
+        Returns:
+            Tuple of (updated upload state, whether this call completed the upload).
+            The flag is decided under the lock that finalizes the file, so exactly one
+            of several concurrent calls filling the last gaps sees True.
+
+        Raises:
+            ValidationError: If the offset/length is out of range or the header is invalid
+        """
+        state = await asyncio.to_thread(self.load)
+        if state["completed"]:
+            return state, False
+
+        size = state["size_bytes"]
+        if offset < 0 or offset >= size:
+            raise ValidationError(f"オフセットが範囲外です: {offset}")
+
+        position = offset
+        header = b""
+        fd = os.open(self.partial_path, os.O_WRONLY)
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if position + len(chunk) > size:
+                    raise ValidationError("チャンクがファイルサイズを超えています")
+
+                # 先頭チャンクでコンテナ形式を検証 (不一致ならアップロードごと破棄)
+                if offset == 0 and position < SNIFF_BYTES:
+                    header += chunk[: SNIFF_BYTES - position]
+                    if len(header) >= min(SNIFF_BYTES, size):
+                        self._check_header(header, state)
+
+                await asyncio.to_thread(os.pwrite, fd, chunk, position)
+                position += len(chunk)
+        finally:
+            os.close(fd)
+            # 途中で切断されても書き込み済みの範囲は記録する
+            if position > offset and self.exists():
+                state = await self._record_range(offset, position)
+
+        return await self._advance(state)
+
+    def _check_header(self, header: bytes, state: dict[str, Any]) -> None:
+        """コンテナ形式を検証 (不一致ならアップロードを破棄)"""
+        try:
+            check_container(header, EXTENSION_CONTAINERS.get(state["ext"]))
+        except ValidationError:
+            self.delete()
+            raise
+
+    async def _record_range(self, start: int, end: int) -> dict[str, Any]:
+        """受信済み範囲を状態に追加"""
+        async with self._lock:
+            state = await asyncio.to_thread(self.load)
+            state["ranges"] = merge_range(state["ranges"], start, end)
+            await asyncio.to_thread(self._save, state)
+        return state
+
+    async def _advance(self, state: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+        """連続範囲のハッシュを進め、全範囲が揃っていれば確定 (戻り値: 状態, 今回確定したか)"""
+        hasher = _hashers.setdefault(self.upload_id, _PrefixHasher())
+        hasher.used_at = time.monotonic()
+        async with hasher.lock:
+            state = await asyncio.to_thread(self.load)
+            if state["completed"]:
+                return state, False
+
+            contiguous = self.contiguous_offset(state)
+            if hasher.offset < contiguous:
+                await asyncio.to_thread(self._hash_range, hasher, contiguous)
+
+            if contiguous < state["size_bytes"]:
+                return state, False
+            return await self._finalize(hasher.digest.hexdigest())
+
+    def _hash_range(self, hasher: _PrefixHasher, end: int) -> None:
+        """新たに連続した範囲のみを読み込んでハッシュを更新"""
+        with self.partial_path.open("rb") as f:
+            f.seek(hasher.offset)
+            while hasher.offset < end:
+                data = f.read(min(_READ_CHUNK_SIZE, end - hasher.offset))
+                if not data:
+                    break
+                hasher.digest.update(data)
+                hasher.offset += len(data)
+
+    async def _finalize(self, sha256: str) -> tuple[dict[str, Any], bool]:
+        """source.<ext> へ確定 (同一内容の動画があれば成果物を引き継ぐ、確定済みなら False)"""
+        async with self._lock:
+            state = await asyncio.to_thread(self.load)
+            if state["completed"]:
+                return state, False
+
+            # 先頭が飛ばされて送られた場合に備えて確定前にも検証
+            with self.partial_path.open("rb") as f:
+                self._check_header(f.read(SNIFF_BYTES), state)
+
+            video_path = self.dir / f"source.{state['ext']}"
+            os.replace(self.partial_path, video_path)
+            await asyncio.to_thread(
+                StageManifest(self.upload_id).remember_digest, video_path, sha256
+            )
+            dedup = await deduplicate_async(self.upload_id, video_path, sha256)
+
+            state["completed"] = True
+            state["sha256"] = sha256
+            state["duplicate_of"] = dedup.duplicate_of
+            state["available_stages"] = dedup.available_stages
+            await asyncio.to_thread(self._save, state)
+
+        _hashers.pop(self.upload_id, None)
+        logger.info(f"Resumable upload completed: {self.upload_id} ({state['size_bytes']}B)")
+        return state, True
+
+    def video_path(self, state: Optional[dict[str, Any]] = None) -> Path:
+        """確定後の動画パス"""
+        state = state or self.load()
+        return self.dir / f"source.{state['ext']}"
+
+    def delete(self) -> None:
+        """未完了のアップロードを破棄"""
+        _hashers.pop(self.upload_id, None)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def _remove_expired_uploads(base_dir: Path, cutoff: datetime) -> list[str]:
+    """cutoff 以降更新のない未完了アップロードのディレクトリを削除 (削除した upload_id)"""
+    removed = []
+    for state_path in base_dir.glob(f"*/{_STATE_FILE}"):
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            updated_at = datetime.fromisoformat(state["updated_at"])
+        except (OSError, ValueError, KeyError):
+            continue
+        if not state.get("completed") and updated_at < cutoff:
+            shutil.rmtree(state_path.parent, ignore_errors=True)
+            removed.append(state_path.parent.name)
+    return removed
+
+
+async def sweep_expired_uploads(base_dir: Optional[Path] = None, force: bool = False) -> int:
+    """
+    Discard abandoned resumable uploads and their in-memory hash state.
+
+    Runs at most once per sweep interval unless forced.
+
+    Args:
+        base_dir: Upload root (default: settings.upload_dir)
+        force: Sweep even if the last sweep was recent
+
+    Returns:
+        Number of upload directories removed
+    """
+    global _last_sweep
+    now = time.monotonic()
+    if not force and _last_sweep is not None and now - _last_sweep < _SWEEP_INTERVAL_SEC:
+        return 0
+    _last_sweep = now
+
+    expiry = settings.upload_expiry_sec
+    for upload_id, hasher in list(_hashers.items()):
+        if now - hasher.used_at > expiry and not hasher.lock.locked():
+            _hashers.pop(upload_id, None)
+
+    cutoff = datetime.now() - timedelta(seconds=expiry)
+    removed = await asyncio.to_thread(
+        _remove_expired_uploads, base_dir or settings.upload_dir, cutoff
+    )
+    for upload_id in removed:
+        _hashers.pop(upload_id, None)
+    if removed:
+        logger.info(f"Expired resumable uploads removed: {len(removed)}")
+    return len(removed)
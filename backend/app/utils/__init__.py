@@ -1,6 +1,72 @@
 """
 Utility functions and wrappers.
 """
+from .ffmpeg_runner import FFmpegProgress, FFmpegRunner, compute_timeout, ffmpeg_runner
 from .ffmpeg_wrapper import FFmpegWrapper
+from .filelock import FileLock
+from .frames import (
+    IMAGE_FORMATS,
+    IMAGE_MEDIA_TYPES,
+    FrameSpec,
+    encode_image,
+    extract_frames,
+    extract_frames_async,
+    iter_frames,
+    resize_to_width,
+)
+from .fs import (
+    atomic_write_bytes,
+    atomic_write_text,
+    link_or_copy,
+    sha256_file,
+    unlink_if_shared,
+)
+from .media_probe import MediaProbe, media_probe, parse_ffprobe
+from .sprites import build_thumbnails_vtt, data_url, describe_sprites, format_vtt_time
+from .static import CachingStaticFiles
+from .upload import (
+    EXTENSION_CONTAINERS,
+    SNIFF_BYTES,
+    MultipartFileStream,
+    UploadResult,
+    check_container,
+    save_upload_stream,
+    sniff_container,
+)
 
-__all__ = ["FFmpegWrapper"]
+__all__ = [
+    "FFmpegWrapper",
+    "FFmpegRunner",
+    "FFmpegProgress",
+    "ffmpeg_runner",
+    "compute_timeout",
+    "MediaProbe",
+    "media_probe",
+    "parse_ffprobe",
+    "FileLock",
+    "FrameSpec",
+    "IMAGE_FORMATS",
+    "IMAGE_MEDIA_TYPES",
+    "encode_image",
+    "extract_frames",
+    "extract_frames_async",
+    "iter_frames",
+    "resize_to_width",
+    "atomic_write_bytes",
+    "atomic_write_text",
+    "sha256_file",
+    "link_or_copy",
+    "unlink_if_shared",
+    "build_thumbnails_vtt",
+    "data_url",
+    "describe_sprites",
+    "format_vtt_time",
+    "CachingStaticFiles",
+    "EXTENSION_CONTAINERS",
+    "SNIFF_BYTES",
+    "MultipartFileStream",
+    "check_container",
+    "UploadResult",
+    "save_upload_stream",
+    "sniff_container",
+]
@@ -0,0 +1,310 @@
+"""
+Non-blocking FFmpeg / ffprobe runner based on asyncio subprocesses.
+
+- ``-progress pipe:1`` の出力を解析して進捗イベントを通知する
+- タイムアウトは動画の長さに比例して設定し、超過・キャンセル時はプロセスを終了させる
+- 同時に起動する ffmpeg / ffprobe プロセス数を settings.ffmpeg_max_processes で制限する
+"""
+import asyncio
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from app.core import VideoProcessingError, logger, settings
+
+# stderr の保持サイズ (エラーメッセージ用)
+_STDERR_TAIL_BYTES = 4096
+# terminate 後に kill するまでの猶予 (秒)
+_KILL_GRACE_SEC = 5.0
+
+
+@dataclass
+class FFmpegProgress:
+    """ffmpeg の進捗"""
+
+    label: str
+    out_time_sec: float = 0.0
+    duration_sec: Optional[float] = None
+    frame: int = 0
+    fps: float = 0.0
+    speed: Optional[float] = None
+    done: bool = False
+
+    @property
+    def percent(self) -> Optional[float]:
+        """進捗率 (0-100、長さ不明の場合は None)"""
+        if not self.duration_sec:
+            return None
+        return min(100.0, self.out_time_sec / self.duration_sec * 100)
+
+    def to_dict(self) -> dict[str, Any]:
+        """統計用の辞書に変換"""
+        data = asdict(self)
+        data["percent"] = None if self.percent is None else round(self.percent, 1)
+        return data
+
+
+ProgressCallback = Callable[[FFmpegProgress], None | Awaitable[None]]
+
+
+def compute_timeout(duration_sec: Optional[float]) -> float:
+    """
+    Compute a timeout that scales with the media duration.
+
+    Args:
+        duration_sec: Media duration (None if unknown)
+
+    Returns:
+        Timeout in seconds
+    """
+    if not duration_sec:
+        return settings.ffmpeg_timeout_max_sec
+    timeout = (
+        settings.ffmpeg_timeout_base_sec + duration_sec * settings.ffmpeg_timeout_per_media_sec
+    )
+    return min(timeout, settings.ffmpeg_timeout_max_sec)
+
+
+def parse_progress_line(line: str, progress: FFmpegProgress) -> bool:
+    """
+    Apply one ``key=value`` line of ``-progress`` output.
+
+    Args:
+        line: Output line
+        progress: Progress to update
+
+    Returns:
+        True when a progress block is complete (``progress=continue|end``)
+    """
+    key, sep, value = line.strip().partition("=")
+    if not sep:
+        return False
+    value = value.strip()
+    try:
+        if key in ("out_time_us", "out_time_ms"):
+            # ffmpeg は out_time_ms もマイクロ秒で出力する
+            if value.isdigit():
+                progress.out_time_sec = int(value) / 1_000_000
+        elif key == "frame":
+            progress.frame = int(value)
+        elif key == "fps":
+            progress.fps = float(value)
+        elif key == "speed":
+            progress.speed = float(value.rstrip("x")) if value not in ("N/A", "") else None
+        elif key == "progress":
+            progress.done = value == "end"
+            return True
+    except ValueError:
+        pass
+    return False
+
+
+class FFmpegRunner:
+    """ffmpeg / ffprobe の非同期実行 (同時プロセス数の上限付き)"""
+
+    def __init__(self, max_processes: Optional[int] = None):
+        """
+        Initialize runner.
+
+        Args:
+            max_processes: Maximum concurrent processes (default: settings.ffmpeg_max_processes)
+        """
+        self.max_processes = max_processes or settings.ffmpeg_max_processes
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        self._active: dict[int, FFmpegProgress] = {}
+        self._ids = itertools.count(1)
+        self._completed = 0
+        self._failed = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # イベントループ毎に作成 (ワーカー・テスト等でループが変わる場合に備える)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(
+        self,
+        args: list[str],
+        label: str = "ffmpeg",
+        duration_sec: Optional[float] = None,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Run ffmpeg with progress reporting.
+
+        Args:
+            args: ffmpeg arguments (without the ``ffmpeg`` executable)
+            label: Name shown in logs and stats
+            duration_sec: Media duration used for progress and timeout scaling
+            timeout: Explicit timeout in seconds (default: compute_timeout(duration_sec))
+            on_progress: Callback (sync or async) receiving FFmpegProgress
+
+        Raises:
+            VideoProcessingError: If ffmpeg fails or times out
+        """
+        cmd = ["ffmpeg", "-hide_banner", "-nostats", "-progress", "pipe:1", *args]
+        progress = FFmpegProgress(label=label, duration_sec=duration_sec)
+        timeout = timeout or compute_timeout(duration_sec)
+
+        async with self._slot():
+            run_id = next(self._ids)
+            self._active[run_id] = progress
+            try:
+                await self._execute(cmd, label, timeout, progress, on_progress)
+                self._completed += 1
+            except BaseException:
+                self._failed += 1
+                raise
+            finally:
+                self._active.pop(run_id, None)
+
+    async def probe(self, args: list[str], timeout: Optional[float] = None) -> str:
+        """
+        Run ffprobe and return its stdout.
+
+        Args:
+            args: ffprobe arguments (without the ``ffprobe`` executable)
+            timeout: Timeout in seconds (default: settings.ffprobe_timeout_sec)
+
+        Returns:
+            Decoded stdout
+
+        Raises:
+            VideoProcessingError: If ffprobe fails or times out
+        """
+        async with self._slot():
+            process = await self._spawn(["ffprobe", *args])
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=timeout or settings.ffprobe_timeout_sec
+                )
+            except TimeoutError:
+                await self._terminate(process)
+                raise VideoProcessingError("ffprobe がタイムアウトしました")
+            except BaseException:
+                await self._terminate(process)
+                raise
+            if process.returncode != 0:
+                message = stderr.decode("utf-8", "replace").strip()[-_STDERR_TAIL_BYTES:]
+                raise VideoProcessingError(f"ffprobe failed ({process.returncode}): {message}")
+            return stdout.decode("utf-8", "replace")
+
+    def _slot(self) -> "_Slot":
+        return _Slot(self)
+
+    @staticmethod
+    async def _spawn(cmd: list[str]) -> asyncio.subprocess.Process:
+        try:
+            return await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise VideoProcessingError(f"{cmd[0]} が見つかりません。インストールしてください")
+
+    async def _execute(
+        self,
+        cmd: list[str],
+        label: str,
+        timeout: float,
+        progress: FFmpegProgress,
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        """プロセスを起動し、進捗を読みながら終了を待つ"""
+        process = await self._spawn(cmd)
+        stderr_tail = bytearray()
+
+        async def read_progress() -> None:
+            assert process.stdout is not None
+            async for raw in process.stdout:
+                if parse_progress_line(raw.decode("utf-8", "replace"), progress) and on_progress:
+                    result = on_progress(progress)
+                    if asyncio.iscoroutine(result):
+                        await result
+
+        async def read_stderr() -> None:
+            assert process.stderr is not None
+            while chunk := await process.stderr.read(65536):
+                stderr_tail.extend(chunk)
+                del stderr_tail[:-_STDERR_TAIL_BYTES]
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(read_progress(), read_stderr(), process.wait()), timeout=timeout
+            )
+        except TimeoutError:
+            await self._terminate(process)
+            logger.error(f"{label} timed out after {timeout:.0f}s")
+            raise VideoProcessingError(f"{label} がタイムアウトしました ({timeout:.0f} 秒)")
+        except BaseException:
+            # キャンセル時も ffmpeg を残さない
+            await self._terminate(process)
+            raise
+
+        if process.returncode != 0:
+            message = stderr_tail.decode("utf-8", "replace").strip()
+            logger.error(f"{label} failed ({process.returncode}): {message}")
+            raise VideoProcessingError(f"{label} failed ({process.returncode}): {message}")
+        logger.debug(f"{label} finished in {time.monotonic() - started:.1f}s")
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process) -> None:
+        """プロセスを終了 (応答がなければ kill)"""
+        if process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=_KILL_GRACE_SEC)
+            except TimeoutError:
+                process.kill()
+                await process.wait()
+        except ProcessLookupError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get runner statistics.
+
+        Returns:
+            Max processes, running / waiting counts and per-process progress
+        """
+        return {
+            "max_processes": self.max_processes,
+            "running": len(self._active),
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "active": [p.to_dict() for p in self._active.values()],
+        }
+
+
+class _Slot:
+    """同時プロセス数の枠 (待機数を記録)"""
+
+    def __init__(self, runner: FFmpegRunner):
+        self.runner = runner
+
+    async def __aenter__(self) -> None:
+        self.semaphore = self.runner._get_semaphore()
+        self.runner._waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.runner._waiting -= 1
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.semaphore.release()
+
+
+ffmpeg_runner = FFmpegRunner()
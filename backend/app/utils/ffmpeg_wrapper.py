@@ -1,12 +1,119 @@
 """
 FFmpeg wrapper utilities for video processing.
+
+同期版 (subprocess.run) はワーカースレッド内からの呼び出し用。
+async def から呼ぶ場合はイベントループを塞がないよう ``*_async`` 版を使用すること。
 """
+import json
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from app.core import VideoProcessingError, logger
 
+from .ffmpeg_runner import ProgressCallback, ffmpeg_runner
+
+
+def _duration_args(video_path: Path) -> list[str]:
+    return [
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(video_path),
+    ]
+
+
+def _info_args(video_path: Path) -> list[str]:
+    return [
+        "-v",
+        "quiet",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        str(video_path),
+    ]
+
+
+def _audio_args(video_path: Path, output_path: Path, sample_rate: int) -> list[str]:
+    return [
+        "-i",
+        str(video_path),
+        "-vn",  # 映像を除外
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        "1",  # モノラル
+        "-y",  # 上書き
+        str(output_path),
+    ]
+
+
+def _proxy_args(
+    video_path: Path, output_path: Path, height: int, fps: float, gop_frames: int
+) -> list[str]:
+    return [
+        "-i",
+        str(video_path),
+        "-an",  # 音声は別途 16 kHz モノラルで抽出
+        "-vf",
+        f"fps={fps},scale=-2:'min({height},ih)'",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "28",
+        "-g",
+        str(gop_frames),
+        "-pix_fmt",
+        "yuv420p",
+        "-movflags",
+        "+faststart",
+        "-y",
+        str(output_path),
+    ]
+
+
+def _sprite_args(
+    video_path: Path, output_dir: Path, interval_sec: float, width: int, columns: int, rows: int
+) -> list[str]:
+    return [
+        "-i",
+        str(video_path),
+        "-an",
+        "-vf",
+        f"fps=1/{interval_sec},scale={width}:-2,tile={columns}x{rows}",
+        "-q:v",
+        "4",
+        "-y",
+        str(output_dir / "sprite_%03d.jpg"),
+    ]
+
+
+def _frame_args(
+    video_path: Path, timestamp: float, output_path: Path, width: Optional[int]
+) -> list[str]:
+    args = [
+        "-ss",
+        str(timestamp),
+        "-i",
+        str(video_path),
+        "-vframes",
+        "1",
+        "-q:v",
+        "2",  # 高品質
+    ]
+    if width:
+        args.extend(["-vf", f"scale={width}:-1"])
+    args.extend(["-y", str(output_path)])
+    return args
+
 
 class FFmpegWrapper:
     """FFmpegのラッパークラス"""
@@ -26,16 +133,7 @@ class FFmpegWrapper:
             VideoProcessingError: If ffprobe fails
         """
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(video_path),
-            ]
+            cmd = ["ffprobe", *_duration_args(video_path)]
             result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
             duration = float(result.stdout.strip())
             logger.info(f"Video duration: {duration}s for {video_path.name}")
@@ -62,20 +160,7 @@ class FFmpegWrapper:
         """
         try:
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            cmd = [
-                "ffmpeg",
-                "-i",
-                str(video_path),
-                "-vn",  # 映像を除外
-                "-acodec",
-                "pcm_s16le",
-                "-ar",
-                str(sample_rate),
-                "-ac",
-                "1",  # モノラル
-                "-y",  # 上書き
-                str(output_path),
-            ]
+            cmd = ["ffmpeg", *_audio_args(video_path, output_path, sample_rate)]
             subprocess.run(cmd, capture_output=True, check=True, timeout=300)
             logger.info(f"Audio extracted: {output_path}")
             return output_path
@@ -83,6 +168,119 @@ class FFmpegWrapper:
             logger.error(f"Failed to extract audio: {e}")
             raise VideoProcessingError(f"音声抽出に失敗しました: {e}")
 
+    @staticmethod
+    async def extract_audio_async(
+        video_path: Path,
+        output_path: Path,
+        sample_rate: int = 16000,
+        duration_sec: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Path:
+        """
+        Extract audio from video without blocking the event loop.
+
+        Args:
+            video_path: Path to input video
+            output_path: Path to output audio file
+            sample_rate: Audio sample rate (default: 16000 for Whisper)
+            duration_sec: Media duration (progress and timeout scaling)
+            on_progress: Progress callback
+
+        Returns:
+            Path to extracted audio file
+
+        Raises:
+            VideoProcessingError: If extraction fails or times out
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        await ffmpeg_runner.run(
+            _audio_args(video_path, output_path, sample_rate),
+            label="extract_audio",
+            duration_sec=duration_sec,
+            on_progress=on_progress,
+        )
+        logger.info(f"Audio extracted: {output_path}")
+        return output_path
+
+    @staticmethod
+    async def create_proxy_async(
+        video_path: Path,
+        output_path: Path,
+        height: int = 480,
+        fps: float = 5.0,
+        gop_frames: int = 5,
+        duration_sec: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Path:
+        """
+        Transcode the analysis proxy without blocking the event loop.
+
+        Args:
+            video_path: Path to input video
+            output_path: Path to output proxy (mp4)
+            height: Output height (width keeps aspect ratio)
+            fps: Output frame rate
+            gop_frames: Keyframe interval in frames (1 = all-intra)
+            duration_sec: Media duration (progress and timeout scaling)
+            on_progress: Progress callback
+
+        Returns:
+            Path to proxy video
+
+        Raises:
+            VideoProcessingError: If transcoding fails or times out
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        await ffmpeg_runner.run(
+            _proxy_args(video_path, output_path, height, fps, gop_frames),
+            label="create_proxy",
+            duration_sec=duration_sec,
+            on_progress=on_progress,
+        )
+        logger.info(f"Proxy created: {output_path}")
+        return output_path
+
+    @staticmethod
+    async def create_sprites_async(
+        video_path: Path,
+        output_dir: Path,
+        interval_sec: float = 2.0,
+        width: int = 160,
+        columns: int = 10,
+        rows: int = 10,
+        duration_sec: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> list[Path]:
+        """
+        Tile thumbnails into sprite sheets (sprite_001.jpg, ...) in one ffmpeg pass.
+
+        Args:
+            video_path: Path to input video
+            output_dir: Directory for the sprite sheets
+            interval_sec: Seconds between thumbnails
+            width: Thumbnail width (height keeps aspect ratio)
+            columns: Thumbnails per row
+            rows: Rows per sheet
+            duration_sec: Media duration (progress and timeout scaling)
+            on_progress: Progress callback
+
+        Returns:
+            Sprite sheet paths in order
+
+        Raises:
+            VideoProcessingError: If ffmpeg fails or times out
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        await ffmpeg_runner.run(
+            _sprite_args(video_path, output_dir, interval_sec, width, columns, rows),
+            label="create_sprites",
+            duration_sec=duration_sec,
+            on_progress=on_progress,
+        )
+        sheets = sorted(output_dir.glob("sprite_*.jpg"))
+        logger.info(f"Sprites created: {len(sheets)} sheets in {output_dir}")
+        return sheets
+
     @staticmethod
     def extract_frame(
         video_path: Path, timestamp: float, output_path: Path, width: Optional[int] = 1280
@@ -104,21 +302,7 @@ class FFmpegWrapper:
         """
         try:
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            cmd = [
-                "ffmpeg",
-                "-ss",
-                str(timestamp),
-                "-i",
-                str(video_path),
-                "-vframes",
-                "1",
-                "-q:v",
-                "2",  # 高品質
-            ]
-            if width:
-                cmd.extend(["-vf", f"scale={width}:-1"])
-            cmd.extend(["-y", str(output_path)])
-
+            cmd = ["ffmpeg", *_frame_args(video_path, timestamp, output_path, width)]
             subprocess.run(cmd, capture_output=True, check=True, timeout=30)
             logger.debug(f"Frame extracted at {timestamp}s: {output_path}")
             return output_path
@@ -127,7 +311,7 @@ class FFmpegWrapper:
             raise VideoProcessingError(f"フレーム抽出に失敗しました: {e}")
 
     @staticmethod
-    def get_video_info(video_path: Path) -> dict[str, any]:
+    def get_video_info(video_path: Path) -> dict[str, Any]:
         """
         Get comprehensive video information.
 
@@ -138,20 +322,30 @@ class FFmpegWrapper:
             Dictionary with video metadata
         """
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                str(video_path),
-            ]
+            cmd = ["ffprobe", *_info_args(video_path)]
             result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
-            import json
-
             return json.loads(result.stdout)
         except Exception as e:
             logger.error(f"Failed to get video info: {e}")
             raise VideoProcessingError(f"動画情報の取得に失敗しました: {e}")
+
+    @staticmethod
+    async def get_video_info_async(video_path: Path) -> dict[str, Any]:
+        """
+        Get comprehensive video information without blocking the event loop.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Dictionary with video metadata
+
+        Raises:
+            VideoProcessingError: If ffprobe fails
+        """
+        output = await ffmpeg_runner.probe(_info_args(video_path))
+        try:
+            return json.loads(output)
+        except ValueError as e:
+            logger.error(f"Failed to get video info: {e}")
+            raise VideoProcessingError(f"動画情報の取得に失敗しました: {e}")
@@ -0,0 +1,96 @@
+"""
+Advisory file locks shared across processes (uvicorn workers, worker nodes).
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+class FileLock:
+    """排他ファイルロック (POSIX: flock / Windows: msvcrt.locking)"""
+
+    def __init__(self, path: Path, poll_interval: float = 0.05):
+        """
+        Initialize file lock.
+
+        Args:
+            path: Lock file path (created if missing)
+            poll_interval: Polling interval for async acquisition (seconds)
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def _try_lock(self) -> bool:
+        """ノンブロッキングでロック取得を試みる"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Acquire the lock, blocking the current thread.
+
+        Args:
+            timeout: Maximum wait in seconds (None = wait forever)
+
+        Raises:
+            TimeoutError: If the lock could not be acquired in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"ロックを取得できませんでした: {self.path}")
+            time.sleep(self.poll_interval)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> None:
+        """イベントループをブロックせずにロックを取得"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"ロックを取得できませんでした: {self.path}")
+            await asyncio.sleep(self.poll_interval)
+
+    def release(self) -> None:
+        """ロックを解放"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "FileLock":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
@@ -0,0 +1,206 @@
+"""
+Batched frame extraction.
+
+複数の時刻のフレームを 1 回のデコードパスで取得する。
+時刻順に並べ替え、近い時刻は順次読み進め (grab のみ)、離れている場合だけシークする。
+時刻毎に ffmpeg を起動する FFmpegWrapper.extract_frame より大幅に速い。
+"""
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from app.core import VideoProcessingError, executors, logger
+
+from .media_probe import media_probe
+
+# この秒数以内の前方移動はシークせず順次読み進める (シーク = 直前のキーフレームからの再デコード)
+SEQUENTIAL_GAP_SEC = 2.0
+
+# 出力形式と MIME タイプ
+IMAGE_FORMATS = ("jpg", "png", "webp", "avif")
+IMAGE_MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+@dataclass
+class FrameSpec:
+    """取得するフレーム (時刻・保存先・出力幅)"""
+
+    timestamp: float
+    output_path: Path
+    # 出力幅 (アスペクト比維持、None は元の解像度)
+    width: Optional[int] = None
+
+
+def _encode_params(image_format: str, quality: int) -> list[int]:
+    """画像形式毎のエンコードパラメータ"""
+    if image_format == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if image_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    if image_format == "avif":
+        return [cv2.IMWRITE_AVIF_QUALITY, quality]
+    if image_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, 3]
+    raise VideoProcessingError(f"対応していない画像形式です: {image_format}")
+
+
+def encode_image(frame: np.ndarray, image_format: str = "jpg", quality: int = 90) -> bytes:
+    """
+    Encode a frame in memory.
+
+    Args:
+        frame: BGR frame
+        image_format: "jpg", "png", "webp" or "avif"
+        quality: JPEG / WebP quality (0-100)
+
+    Returns:
+        Encoded image bytes
+
+    Raises:
+        VideoProcessingError: If encoding fails
+    """
+    ok, buffer = cv2.imencode(f".{image_format}", frame, _encode_params(image_format, quality))
+    if not ok:
+        raise VideoProcessingError(f"画像のエンコードに失敗しました: {image_format}")
+    return buffer.tobytes()
+
+
+def resize_to_width(frame: np.ndarray, width: Optional[int]) -> np.ndarray:
+    """
+    Resize a frame to the given width, keeping its aspect ratio.
+
+    Args:
+        frame: BGR frame
+        width: Target width (None or a width >= the frame's keeps the original size)
+
+    Returns:
+        Resized frame
+    """
+    height, current = frame.shape[:2]
+    if not width or width >= current:
+        return frame
+    new_height = max(1, round(height * width / current))
+    return cv2.resize(frame, (width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def iter_frames(
+    cap: cv2.VideoCapture, timestamps: Sequence[float], fps: Optional[float] = None
+) -> Iterator[tuple[int, Optional[np.ndarray]]]:
+    """
+    Read frames at the given timestamps in a single pass ordered by time.
+
+    Args:
+        cap: Opened VideoCapture (its position is moved)
+        timestamps: Times in seconds (any order, duplicates allowed)
+        fps: Frame rate (default: the capture's metadata)
+
+    Yields:
+        (index into ``timestamps``, frame or None if it could not be read), in time order
+    """
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    max_gap = max(1, int(SEQUENTIAL_GAP_SEC * fps))
+    # 次に read/grab で得られるフレーム番号
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    current: Optional[np.ndarray] = None
+    current_index = -1
+
+    for index in sorted(range(len(timestamps)), key=lambda i: timestamps[i]):
+        target = max(0, round(timestamps[index] * fps))
+
+        if target == current_index and current is not None:
+            yield index, current
+            continue
+
+        if target < position or target - position > max_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            position = target
+
+        # 目的のフレームまではデコードのみ (色変換・コピーを省略)
+        ok = True
+        while position < target and ok:
+            ok = cap.grab()
+            position += 1
+        ok = ok and cap.grab()
+        frame = cap.retrieve()[1] if ok else None
+        if ok:
+            position += 1
+            current, current_index = frame, target
+        yield index, frame
+
+
+def extract_frames(
+    video_path: Path,
+    specs: Sequence[FrameSpec],
+    image_format: Optional[str] = None,
+    quality: int = 90,
+) -> list[Optional[Path]]:
+    """
+    Extract frames at many timestamps with one VideoCapture pass.
+
+    Args:
+        video_path: Path to video file
+        specs: Frames to extract (timestamp, output path, per-output width)
+        image_format: "jpg", "png", "webp" or "avif" (default: each output path's suffix)
+        quality: JPEG / WebP quality (0-100)
+
+    Returns:
+        Output paths in the order of ``specs`` (None where the frame could not be read)
+
+    Raises:
+        VideoProcessingError: If the video cannot be opened
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise VideoProcessingError(f"動画を開けませんでした: {video_path}")
+
+    media_info = media_probe.get_cached(video_path)
+    fps = media_info.fps if media_info else None
+    results: list[Optional[Path]] = [None] * len(specs)
+    try:
+        for index, frame in iter_frames(cap, [s.timestamp for s in specs], fps):
+            spec = specs[index]
+            if frame is None:
+                logger.warning(f"Frame at {spec.timestamp:.2f}s could not be read")
+                continue
+            fmt = image_format or spec.output_path.suffix.lower().lstrip(".").replace("jpeg", "jpg")
+            output_path = spec.output_path.with_suffix(f".{fmt}")
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            image = resize_to_width(frame, spec.width)
+            if not cv2.imwrite(str(output_path), image, _encode_params(fmt, quality)):
+                raise VideoProcessingError(f"フレームの保存に失敗しました: {output_path}")
+            results[index] = output_path
+    finally:
+        cap.release()
+
+    logger.debug(f"Extracted {sum(p is not None for p in results)} frames from {video_path.name}")
+    return results
+
+
+async def extract_frames_async(
+    video_path: Path,
+    specs: Sequence[FrameSpec],
+    image_format: Optional[str] = None,
+    quality: int = 90,
+) -> list[Optional[Path]]:
+    """
+    Extract frames in the vision pool without blocking the event loop.
+
+    Args:
+        video_path: Path to video file
+        specs: Frames to extract (timestamp, output path, per-output width)
+        image_format: "jpg", "png", "webp" or "avif" (default: each output path's suffix)
+        quality: JPEG / WebP quality (0-100)
+
+    Returns:
+        Output paths in the order of ``specs`` (None where the frame could not be read)
+    """
+    return await executors.run("vision", extract_frames, video_path, specs, image_format, quality)
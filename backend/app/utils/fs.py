@@ -0,0 +1,98 @@
+"""
+Filesystem helpers.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> Path:
+    """
+    Write bytes atomically (temp file + rename).
+
+    既存ファイルがハードリンクで共有されていても、新しい inode に置き換わるため
+    リンク先の内容は変更されない。
+
+    Args:
+        path: Destination path
+        data: Content to write
+
+    Returns:
+        Destination path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> Path:
+    """テキストをアトミックに書き込む"""
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def sha256_file(path: Path) -> str:
+    """
+    Compute SHA-256 of a file in chunks.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """
+    Atomically place a hard link to ``src`` at ``dst`` (copy if linking is not possible).
+
+    既存の ``dst`` は置き換えられる。別ファイルシステム等でハードリンクできない場合は
+    コピーにフォールバックする。
+
+    Args:
+        src: Existing file
+        dst: Destination path
+
+    Returns:
+        True if a hard link was created, False if the file was copied
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst.with_name(f".{dst.name}.{os.getpid()}.link")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_path)
+        linked = True
+    except OSError:
+        shutil.copy2(src, tmp_path)
+        linked = False
+    try:
+        os.replace(tmp_path, dst)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return linked
+
+
+def unlink_if_shared(path: Path) -> None:
+    """ハードリンクで共有されているファイルを切り離す (上書き前に呼ぶ)"""
+    try:
+        if path.stat().st_nlink > 1:
+            path.unlink()
+    except FileNotFoundError:
+        pass
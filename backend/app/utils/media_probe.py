@@ -0,0 +1,270 @@
+"""
+Media probing with a cache keyed on path + size + mtime.
+
+ffprobe の結果を型付きの MediaInfo に変換し、メモリと data_dir/probe_cache/ に保存する。
+ファイルが変更されない限り同じファイルに対して ffprobe を再実行しない。
+WAV ファイルは ffprobe を使わずヘッダーから読み取る。
+"""
+import hashlib
+import json
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core import VideoProcessingError, logger, settings
+from app.models import MediaInfo
+
+from .ffmpeg_wrapper import FFmpegWrapper
+from .fs import atomic_write_text
+
+CacheKey = tuple[str, int, int]
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """ "30000/1001" 形式のフレームレートを数値に変換"""
+    if not value:
+        return None
+    num, _, den = value.partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_ffprobe(data: dict[str, Any]) -> MediaInfo:
+    """
+    Convert ``ffprobe -show_format -show_streams`` JSON into MediaInfo.
+
+    Args:
+        data: Parsed ffprobe JSON
+
+    Returns:
+        MediaInfo
+    """
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = _to_float(fmt.get("duration"))
+    if duration is None and video is not None:
+        duration = _to_float(video.get("duration"))
+
+    info = MediaInfo(
+        duration_sec=duration,
+        format_name=fmt.get("format_name"),
+        size_bytes=_to_int(fmt.get("size")),
+        bit_rate=_to_int(fmt.get("bit_rate")),
+    )
+    if video is not None:
+        info.has_video = True
+        info.width = _to_int(video.get("width"))
+        info.height = _to_int(video.get("height"))
+        info.fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(
+            video.get("r_frame_rate")
+        )
+        info.frame_count = _to_int(video.get("nb_frames"))
+        if info.frame_count is None and info.fps and duration:
+            info.frame_count = int(round(info.fps * duration))
+        info.video_codec = video.get("codec_name")
+    if audio is not None:
+        info.has_audio = True
+        info.audio_codec = audio.get("codec_name")
+        info.sample_rate = _to_int(audio.get("sample_rate"))
+        info.channels = _to_int(audio.get("channels"))
+    return info
+
+
+def probe_wav(path: Path) -> MediaInfo:
+    """WAV ファイルの情報をヘッダーから取得 (ffprobe 不要)"""
+    with wave.open(str(path), "rb") as wav:
+        frames = wav.getnframes()
+        rate = wav.getframerate()
+        sample_width = wav.getsampwidth()
+        channels = wav.getnchannels()
+    return MediaInfo(
+        duration_sec=frames / rate if rate else None,
+        format_name="wav",
+        size_bytes=path.stat().st_size,
+        bit_rate=rate * sample_width * 8 * channels,
+        has_audio=True,
+        audio_codec=f"pcm_s{sample_width * 8}le" if sample_width > 1 else "pcm_u8",
+        sample_rate=rate,
+        channels=channels,
+    )
+
+
+class MediaProbe:
+    """MediaInfo のキャッシュ付き取得"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = 256):
+        """
+        Initialize media probe.
+
+        Args:
+            cache_dir: Persistent cache directory (default: data_dir/probe_cache)
+            max_entries: Maximum entries kept in memory
+        """
+        self._cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory: OrderedDict[CacheKey, MediaInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir or settings.data_dir / "probe_cache"
+
+    @staticmethod
+    def _key(path: Path) -> CacheKey:
+        stat = path.stat()
+        return (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    def _cache_file(self, key: CacheKey) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(key[0].encode('utf-8')).hexdigest()}.json"
+
+    def get_cached(self, path: Path) -> Optional[MediaInfo]:
+        """
+        Get cached MediaInfo without probing.
+
+        Args:
+            path: Media file
+
+        Returns:
+            Cached MediaInfo, or None if the file is unknown or has changed
+        """
+        try:
+            key = self._key(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            info = self._memory.get(key)
+            if info is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return info.model_copy()
+
+        cache_file = self._cache_file(key)
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if [data.get("path"), data.get("size"), data.get("mtime_ns")] != list(key):
+            return None
+
+        info = MediaInfo.model_validate(data["info"])
+        self._store_memory(key, info)
+        with self._lock:
+            self.hits += 1
+        return info.model_copy()
+
+    def remember(self, path: Path, info: MediaInfo) -> None:
+        """
+        Store MediaInfo for a file (e.g. a hard link to an already probed file).
+
+        Args:
+            path: Media file
+            info: Its media info
+        """
+        key = self._key(path)
+        self._store_memory(key, info)
+        payload = {"path": key[0], "size": key[1], "mtime_ns": key[2], "info": info.model_dump()}
+        try:
+            atomic_write_text(self._cache_file(key), json.dumps(payload, ensure_ascii=False))
+        except OSError as e:
+            logger.warning(f"Failed to persist probe cache for {path}: {e}")
+
+    def _store_memory(self, key: CacheKey, info: MediaInfo) -> None:
+        with self._lock:
+            self._memory[key] = info.model_copy()
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def probe(self, path: Path) -> MediaInfo:
+        """
+        Get MediaInfo, running ffprobe asynchronously only on a cache miss.
+
+        Args:
+            path: Media file
+
+        Returns:
+            MediaInfo
+
+        Raises:
+            VideoProcessingError: If the file cannot be probed
+        """
+        info = self.get_cached(path)
+        if info is not None:
+            return info
+        if path.suffix.lower() == ".wav":
+            info = self._probe_wav(path)
+        else:
+            info = parse_ffprobe(await FFmpegWrapper.get_video_info_async(path))
+        return self._record_miss(path, info)
+
+    def probe_sync(self, path: Path) -> MediaInfo:
+        """
+        Get MediaInfo from a worker thread (blocking ffprobe on a cache miss).
+
+        Args:
+            path: Media file
+
+        Returns:
+            MediaInfo
+
+        Raises:
+            VideoProcessingError: If the file cannot be probed
+        """
+        info = self.get_cached(path)
+        if info is not None:
+            return info
+        if path.suffix.lower() == ".wav":
+            info = self._probe_wav(path)
+        else:
+            info = parse_ffprobe(FFmpegWrapper.get_video_info(path))
+        return self._record_miss(path, info)
+
+    @staticmethod
+    def _probe_wav(path: Path) -> MediaInfo:
+        try:
+            return probe_wav(path)
+        except (OSError, wave.Error, EOFError) as e:
+            raise VideoProcessingError(f"音声情報の取得に失敗しました: {e}")
+
+    def _record_miss(self, path: Path, info: MediaInfo) -> MediaInfo:
+        with self._lock:
+            self.misses += 1
+        self.remember(path, info)
+        logger.info(
+            f"Probed {path.name}: duration={info.duration_sec}s, "
+            f"{info.width}x{info.height}@{info.fps}, audio={info.has_audio}"
+        )
+        return info
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュ統計"""
+        with self._lock:
+            return {"entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+
+media_probe = MediaProbe()
@@ -0,0 +1,110 @@
+"""
+Timeline sprite sheets and WebVTT thumbnail tracks.
+
+スプライトシートは ffmpeg の fps + scale + tile フィルターで生成し、
+各サムネイルの位置を WebVTT (``sprite_001.jpg#xywh=x,y,w,h``) で示す。
+"""
+import math
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from app.core import settings
+from app.models import TimelineSprites
+
+
+def format_vtt_time(seconds: float) -> str:
+    """秒を WebVTT の時刻表記 (HH:MM:SS.mmm) に変換"""
+    millis = max(0, round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def data_url(path: Path) -> str:
+    """
+    Get the ``/data`` URL of a file stored under settings.data_dir.
+
+    Args:
+        path: File under data_dir
+
+    Returns:
+        URL path (e.g. /data/intermediate/<id>/sprites.json)
+    """
+    relative = path.resolve().relative_to(settings.data_dir.resolve())
+    return f"/data/{relative.as_posix()}"
+
+
+def describe_sprites(
+    video_id: str,
+    sheets: list[Path],
+    vtt_path: Path,
+    interval_sec: float,
+    columns: int,
+    rows: int,
+    duration_sec: Optional[float] = None,
+) -> TimelineSprites:
+    """
+    Describe generated sprite sheets (tile size is read from the first sheet).
+
+    Args:
+        video_id: Video UUID
+        sheets: Sprite sheet paths in order
+        vtt_path: Path where the WebVTT track is (or will be) written
+        interval_sec: Seconds between thumbnails
+        columns: Thumbnails per row
+        rows: Rows per sheet
+        duration_sec: Media duration (None: assume every sheet is full)
+
+    Returns:
+        TimelineSprites
+    """
+    # tile フィルターは最終シートも columns x rows の大きさで出力する
+    with Image.open(sheets[0]) as image:
+        sheet_width, sheet_height = image.size
+    capacity = len(sheets) * columns * rows
+    count = capacity
+    if duration_sec:
+        count = min(capacity, max(1, math.ceil(duration_sec / interval_sec)))
+
+    return TimelineSprites(
+        video_id=video_id,
+        interval_sec=interval_sec,
+        tile_width=sheet_width // columns,
+        tile_height=sheet_height // rows,
+        columns=columns,
+        rows=rows,
+        count=count,
+        sheets=[data_url(sheet) for sheet in sheets],
+        vtt_url=data_url(vtt_path),
+    )
+
+
+def build_thumbnails_vtt(sprites: TimelineSprites, duration_sec: Optional[float] = None) -> str:
+    """
+    Build a WebVTT thumbnail track pointing into the sprite sheets.
+
+    Args:
+        sprites: Sprite layout
+        duration_sec: Media duration (clamps the end of the last cue)
+
+    Returns:
+        WebVTT text (sheet references are relative to the track's URL)
+    """
+    per_sheet = sprites.columns * sprites.rows
+    lines = ["WEBVTT", ""]
+    for index in range(sprites.count):
+        start = index * sprites.interval_sec
+        end = start + sprites.interval_sec
+        if duration_sec:
+            end = max(start, min(end, duration_sec))
+        sheet, position = divmod(index, per_sheet)
+        x = (position % sprites.columns) * sprites.tile_width
+        y = (position // sprites.columns) * sprites.tile_height
+        sheet_name = sprites.sheets[sheet].rsplit("/", 1)[-1]
+        lines.append(f"{format_vtt_time(start)} --> {format_vtt_time(end)}")
+        lines.append(f"{sheet_name}#xywh={x},{y},{sprites.tile_width},{sprites.tile_height}")
+        lines.append("")
+    return "\n".join(lines)
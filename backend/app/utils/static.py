@@ -0,0 +1,75 @@
+"""
+Static file serving for /data with cache headers.
+
+内容が変わると URL も変わるファイル (スプライトシート等、入力ハッシュ名のディレクトリ配下)
+は長期間キャッシュさせ、その他のスプライト・WebVTT は ETag / Last-Modified による再検証を
+必須にする。それ以外のファイルには Cache-Control を付けない。
+"""
+import fnmatch
+import os
+from typing import Optional
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core import settings
+
+# data_dir からの相対パスで指定 (ディレクトリ名が入力ハッシュ)
+IMMUTABLE_PATTERNS = ("intermediate/*/sprites/*/*",)
+# 再検証を必須にするファイル
+REVALIDATE_PATTERNS = ("intermediate/*/sprites/*", "*.vtt")
+
+
+class CachingStaticFiles(StaticFiles):
+    """Cache-Control を付与する StaticFiles"""
+
+    def __init__(
+        self,
+        *args,
+        immutable_patterns: Optional[tuple[str, ...]] = None,
+        revalidate_patterns: Optional[tuple[str, ...]] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize static files.
+
+        Args:
+            immutable_patterns: Glob patterns (relative to the directory) of content-addressed
+                files served with a long max-age (default: IMMUTABLE_PATTERNS)
+            revalidate_patterns: Glob patterns of files served with no-cache
+                (default: REVALIDATE_PATTERNS)
+        """
+        super().__init__(*args, **kwargs)
+        self.immutable_patterns = immutable_patterns or IMMUTABLE_PATTERNS
+        self.revalidate_patterns = revalidate_patterns or REVALIDATE_PATTERNS
+
+    def file_response(
+        self,
+        full_path: "os.PathLike[str]",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        cache_control = self.cache_control(self.get_path(scope))
+        if cache_control is not None:
+            response.headers["Cache-Control"] = cache_control
+        return response
+
+    def cache_control(self, path: str) -> Optional[str]:
+        """
+        Get the Cache-Control value for a request path.
+
+        Args:
+            path: Path relative to the served directory
+
+        Returns:
+            Cache-Control header value (None leaves the response without one)
+        """
+        path = path.replace(os.sep, "/")
+        if any(fnmatch.fnmatch(path, pattern) for pattern in self.immutable_patterns):
+            return f"public, max-age={settings.static_immutable_max_age_sec}, immutable"
+        if any(fnmatch.fnmatch(path, pattern) for pattern in self.revalidate_patterns):
+            return "no-cache"
+        return None
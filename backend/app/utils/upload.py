@@ -0,0 +1,243 @@
+"""
+Streaming upload helpers (multipart parsing, size enforcement, hashing, header sniffing).
+"""
+import hashlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+
+from app.core import ValidationError
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart  # type: ignore[no-redef]
+    from multipart.multipart import parse_options_header  # type: ignore[no-redef]
+
+# 先頭何バイトでコンテナ形式を判定するか
+SNIFF_BYTES = 12
+
+# 拡張子 → コンテナ形式
+EXTENSION_CONTAINERS = {
+    "mp4": "isobmff",
+    "m4v": "isobmff",
+    "mov": "isobmff",
+    "mkv": "matroska",
+    "webm": "matroska",
+    "avi": "avi",
+}
+
+# ISO BMFF (mp4/mov) の先頭ボックスとして現れる型
+_ISOBMFF_BOXES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Detect the container format from the first bytes of a file.
+
+    Args:
+        header: Leading bytes (at least SNIFF_BYTES for a reliable result)
+
+    Returns:
+        Container name (isobmff/matroska/avi) or None if unrecognised
+    """
+    if len(header) >= 8 and header[4:8] in _ISOBMFF_BOXES:
+        return "isobmff"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "matroska"
+    if header[:4] == b"RIFF" and header[8:12] == b"AVI ":
+        return "avi"
+    return None
+
+
+@dataclass
+class UploadResult:
+    """ストリーミング保存の結果"""
+
+    path: Path
+    size_bytes: int
+    sha256: str
+    container: Optional[str]
+
+
+async def save_upload_stream(
+    chunks: AsyncIterator[bytes],
+    output_path: Path,
+    extension: str,
+    max_bytes: int,
+) -> UploadResult:
+    """
+    Write an upload stream to disk while enforcing size, hashing and sniffing the header.
+
+    サイズ上限を超えた時点、または先頭バイトが拡張子と一致しない時点で中断し、
+    書き込み途中のファイルは削除する。
+
+    Args:
+        chunks: Upload body chunks
+        output_path: Destination path
+        extension: Declared file extension (mp4/mov/...)
+        max_bytes: Maximum allowed size in bytes
+
+    Returns:
+        UploadResult with size and SHA-256
+
+    Raises:
+        ValidationError: If the stream exceeds max_bytes or the header does not
+            match the extension
+    """
+    digest = hashlib.sha256()
+    header = b""
+    container: Optional[str] = None
+    sniffed = False
+    size = 0
+    expected = EXTENSION_CONTAINERS.get(extension)
+    partial_path = output_path.with_name(output_path.name + ".part")
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        async with aiofiles.open(partial_path, "wb") as out:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValidationError(
+                        f"ファイルサイズが大きすぎます。最大: {max_bytes // (1024 * 1024)}MB"
+                    )
+
+                if not sniffed:
+                    header += chunk[: SNIFF_BYTES - len(header)]
+                    if len(header) >= SNIFF_BYTES:
+                        container = check_container(header, expected)
+                        sniffed = True
+
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if not sniffed:
+            container = check_container(header, expected)
+
+        partial_path.replace(output_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+    return UploadResult(
+        path=output_path, size_bytes=size, sha256=digest.hexdigest(), container=container
+    )
+
+
+def check_container(header: bytes, expected: Optional[str]) -> Optional[str]:
+    """
+    Check that the sniffed container matches the expected one.
+
+    Args:
+        header: Leading bytes of the file
+        expected: Expected container (None to accept anything)
+
+    Returns:
+        Detected container name
+
+    Raises:
+        ValidationError: If the container does not match
+    """
+    container = sniff_container(header)
+    if expected is not None and container != expected:
+        raise ValidationError(f"ファイル内容が拡張子と一致しません (検出: {container or '不明'})")
+    return container
+
+
+class MultipartFileStream:
+    """multipart/form-data 本文から 1 つのファイルパートをストリームとして取り出す"""
+
+    def __init__(self, content_type: str, field_name: str = "file"):
+        """
+        Initialize multipart file stream.
+
+        Args:
+            content_type: Request Content-Type header
+            field_name: Form field name of the file part
+
+        Raises:
+            ValidationError: If the request is not multipart/form-data
+        """
+        mime, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if mime != b"multipart/form-data" or not boundary:
+            raise ValidationError("multipart/form-data で送信してください")
+
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self._pending: list[bytes] = []
+        self._in_target = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._parser = multipart.MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_target = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name == self.field_name and self.filename is None:
+            self._in_target = True
+            self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_target:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_target = False
+
+    async def iter_file(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Yield the file part's bytes as the request body arrives.
+
+        Args:
+            body: Raw request body chunks (request.stream())
+
+        Yields:
+            File content chunks
+        """
+        async for raw in body:
+            self._parser.write(raw)
+            if self._pending:
+                data = b"".join(self._pending)
+                self._pending.clear()
+                yield data
+        self._parser.finalize()
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending.clear()
+            yield data
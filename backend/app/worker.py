@@ -0,0 +1,191 @@
+"""
+Standalone worker entry point.
+
+API プロセス (app.main:app) とは別プロセスで起動し、共有ジョブキューからジョブを取得して
+STT / シーン検出 / エクスポートを実行する。data_dir は API と共有すること。
+
+    JOB_BACKEND=sqlite python -m app.worker --concurrency 2
+"""
+import argparse
+import asyncio
+import signal
+import socket
+import uuid
+from typing import Optional
+
+from app.core import (
+    AdmissionRejectedError,
+    apply_thread_caps,
+    apply_thread_env,
+    executors,
+    logger,
+    settings,
+)
+
+# OpenMP / BLAS は読み込み時にスレッド数を決めるため、numpy / cv2 / torch を読み込む前に設定する
+apply_thread_env()
+
+from app.models import Job  # noqa: E402
+from app.services.export import browser_pool, weasyprint_engine  # noqa: E402
+from app.services.jobs import (  # noqa: E402
+    JOB_STAGES,
+    JobQueue,
+    execute_admitted_job,
+    get_job_queue,
+    result_to_dict,
+)
+
+
+class Worker:
+    """ジョブキューを処理するワーカー"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: Optional[str] = None,
+        stages: Optional[list[str]] = None,
+        concurrency: int = 1,
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            queue: Shared job queue
+            worker_id: Worker ID (default: hostname + random suffix)
+            stages: Stages to handle (default: all)
+            concurrency: Number of jobs processed in parallel
+        """
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.stages = stages or list(JOB_STAGES)
+        self.concurrency = concurrency
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """新規ジョブの取得を停止 (実行中のジョブは完了まで待つ)"""
+        logger.info(f"Worker {self.worker_id} stopping...")
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """ワーカーを起動"""
+        logger.info(
+            f"Worker {self.worker_id} started "
+            f"(backend={settings.job_backend}, stages={self.stages}, "
+            f"concurrency={self.concurrency})"
+        )
+        await asyncio.gather(*[self._loop() for _ in range(self.concurrency)])
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _loop(self) -> None:
+        """ジョブ取得ループ"""
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(self.worker_id, self.stages)
+            except Exception as e:
+                logger.error(f"Failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                await self._idle()
+                continue
+
+            await self.process(job)
+
+    async def _idle(self) -> None:
+        """ポーリング間隔だけ待機 (停止要求があれば即座に戻る)"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=settings.job_poll_interval_sec)
+        except TimeoutError:
+            pass
+
+    async def process(self, job: Job) -> None:
+        """
+        Process a claimed job while keeping its lease alive.
+
+        Args:
+            job: Claimed job
+        """
+        logger.info(f"Processing job {job.job_id}: {job.stage} for {job.video_id}")
+        task = asyncio.create_task(execute_admitted_job(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, task))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            logger.warning(f"Job {job.job_id} abandoned (lease lost)")
+            return
+        except AdmissionRejectedError as e:
+            # 実行を開始できなかっただけなので試行回数に数えず戻し、少し待ってから取得し直す
+            logger.info(f"Job {job.job_id} requeued (admission rejected): {e}")
+            await self.queue.requeue(job.job_id, self.worker_id)
+            await self._idle()
+            return
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            await self.queue.fail(job.job_id, self.worker_id, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self.queue.complete(job.job_id, self.worker_id, result_to_dict(result))
+        logger.info(f"Job {job.job_id} completed (cached={result.cached})")
+
+    async def _heartbeat(self, job: Job, task: asyncio.Task) -> None:
+        """リースを延長 (失った場合は実行を中断)"""
+        while not task.done():
+            await asyncio.sleep(settings.job_heartbeat_sec)
+            try:
+                alive = await self.queue.heartbeat(job.job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job.job_id}: {e}")
+                continue
+            if not alive:
+                task.cancel()
+                return
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings.ensure_directories()
+    apply_thread_caps()
+
+    queue = get_job_queue()
+    if queue is None:
+        raise SystemExit("JOB_BACKEND が local のためワーカーは不要です (sqlite / redis を指定)")
+
+    worker = Worker(
+        queue=queue,
+        worker_id=args.worker_id,
+        stages=args.stages.split(",") if args.stages else None,
+        concurrency=args.concurrency,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # pragma: no cover - Windows
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        await queue.close()
+        await browser_pool.close()
+        weasyprint_engine.shutdown()
+        executors.shutdown()
+
+
+def main() -> None:
+    """コマンドラインエントリポイント"""
+    parser = argparse.ArgumentParser(description="Video Manual Generator worker")
+    parser.add_argument("--worker-id", default=None, help="ワーカーID")
+    parser.add_argument(
+        "--stages",
+        default=None,
+        help=f"処理するステージ (カンマ区切り: {','.join(JOB_STAGES)})",
+    )
+    parser.add_argument("--concurrency", type=int, default=1, help="同時処理ジョブ数")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Benchmarks (python -m benchmarks.<name>).
+"""
@@ -0,0 +1,101 @@
+"""
+Frame extraction benchmark.
+
+1 回の VideoCapture パスでまとめて取得する extract_frames と、時刻毎に ffmpeg を起動する
+FFmpegWrapper.extract_frame を N 回呼ぶ場合の所要時間を比較する (ffmpeg が PATH に必要)。
+
+Usage:
+    cd backend && python -m benchmarks.frame_extraction --frames 60 --duration 120
+"""
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.utils import FFmpegWrapper
+from app.utils.frames import FrameSpec, extract_frames
+
+
+def build_video(path: Path, duration: float, fps: float, width: int, height: int, gop: int) -> Path:
+    """ベンチマーク用の H.264 動画 (フレーム毎に内容が変わる、キーフレーム間隔 gop)"""
+    raw = path.with_suffix(".avi")
+    writer = cv2.VideoWriter(str(raw), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    base = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    for n in range(int(duration * fps)):
+        frame = np.roll(base, n * 4, axis=1)
+        cv2.putText(frame, str(n), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(raw), "-c:v", "libx264", "-preset", "veryfast"]
+        + ["-g", str(gop), "-pix_fmt", "yuv420p", "-y", str(path)],
+        check=True,
+    )
+    raw.unlink()
+    return path
+
+
+def timestamps(count: int, duration: float) -> list[float]:
+    """動画全体に均等に配置した時刻"""
+    return [round(duration * (n + 0.5) / count, 3) for n in range(count)]
+
+
+def measure_batch(video: Path, times: list[float], output_dir: Path, width: int) -> float:
+    """extract_frames (1 パス) の所要時間 (秒)"""
+    specs = [FrameSpec(t, output_dir / f"batch_{n:04d}.jpg", width) for n, t in enumerate(times)]
+    started = time.perf_counter()
+    extract_frames(video, specs)
+    return time.perf_counter() - started
+
+
+def measure_per_frame(video: Path, times: list[float], output_dir: Path, width: int) -> float:
+    """FFmpegWrapper.extract_frame を時刻毎に呼んだ場合の所要時間 (秒)"""
+    started = time.perf_counter()
+    for n, t in enumerate(times):
+        FFmpegWrapper.extract_frame(video, t, output_dir / f"single_{n:04d}.jpg", width)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """コマンドラインエントリポイント"""
+    parser = argparse.ArgumentParser(description="Frame extraction benchmark")
+    parser.add_argument("--frames", type=int, default=60, help="Frames to extract")
+    parser.add_argument("--duration", type=float, default=120.0, help="Video length in seconds")
+    parser.add_argument("--fps", type=float, default=30.0, help="Video frame rate")
+    parser.add_argument("--size", default="1280x720", help="Video resolution (WxH)")
+    parser.add_argument("--gop", type=int, default=250, help="Keyframe interval in frames")
+    parser.add_argument("--width", type=int, default=1280, help="Output image width")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        parser.error("ffmpeg was not found on PATH")
+    video_width, video_height = (int(v) for v in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        video = build_video(
+            tmp_dir / "benchmark.mp4", args.duration, args.fps, video_width, video_height, args.gop
+        )
+        times = timestamps(args.frames, args.duration)
+        batch = measure_batch(video, times, tmp_dir, args.width)
+        per_frame = measure_per_frame(video, times, tmp_dir, args.width)
+
+    print(
+        f"frames={args.frames} duration={args.duration}s "
+        f"video={args.size}@{args.fps}fps gop={args.gop}"
+    )
+    print(f"extract_frames (one pass):     {batch:8.2f}s ({args.frames / batch:7.1f} frames/s)")
+    print(
+        f"{args.frames} x extract_frame (ffmpeg): {per_frame:8.2f}s "
+        f"({args.frames / per_frame:7.1f} frames/s)"
+    )
+    print(f"speedup: {per_frame / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Template rendering benchmark.
+
+リクエスト毎にレンダラーを作り直す場合と、共有レンダラー (コンパイル済みテンプレートと
+バイトコードキャッシュを再利用) の場合の 1 秒あたりのレンダリング回数を比較する。
+
+Usage:
+    cd backend && python -m benchmarks.template_render --steps 500 --iterations 50
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.core import settings
+from app.models import ManualPlan, ManualStep
+from app.services.template import TemplateRenderer, get_template_renderer
+
+
+def build_plan(steps: int) -> ManualPlan:
+    """ベンチマーク用のマニュアル計画"""
+    return ManualPlan(
+        title="ベンチマーク",
+        source_video="benchmark.mp4",
+        steps=[
+            ManualStep(
+                title=f"手順 {n}",
+                narration=f"画面右上のメニューから項目 {n} を選択します。" * 3,
+                note="保存前に内容を確認してください。" if n % 5 == 0 else None,
+                start=n * 5.0,
+                end=n * 5.0 + 4.5,
+                image=f"data/captures/benchmark/scene_{n:04d}.png",
+            )
+            for n in range(steps)
+        ],
+    )
+
+
+async def measure(make_renderer: Callable[[], TemplateRenderer], plan: ManualPlan, n: int) -> float:
+    """1 秒あたりのレンダリング回数"""
+    started = time.perf_counter()
+    for _ in range(n):
+        renderer = make_renderer()
+        renderer.create_default_template()
+        await renderer.render(plan)
+    return n / (time.perf_counter() - started)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.data_dir = Path(tmp) / "data"
+        settings.template_dir = Path(tmp) / "templates"
+        plan = build_plan(args.steps)
+
+        fresh = await measure(TemplateRenderer, plan, args.iterations)
+        shared = await measure(get_template_renderer, plan, args.iterations)
+
+    print(f"steps={args.steps} iterations={args.iterations}")
+    print(f"new renderer per request: {fresh:8.1f} renders/s")
+    print(f"shared renderer:          {shared:8.1f} renders/s ({shared / fresh:.2f}x)")
+
+
+def main() -> None:
+    """コマンドラインエントリポイント"""
+    parser = argparse.ArgumentParser(description="Template rendering benchmark")
+    parser.add_argument("--steps", type=int, default=500, help="Steps in the manual plan")
+    parser.add_argument("--iterations", type=int, default=50, help="Renders per measurement")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+
+from app.core import settings
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """Point all storage directories at a temporary data directory"""
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(settings, "data_dir", data_dir)
+    monkeypatch.setattr(settings, "upload_dir", data_dir / "uploads")
+    monkeypatch.setattr(settings, "capture_dir", data_dir / "captures")
+    monkeypatch.setattr(settings, "intermediate_dir", data_dir / "intermediate")
+    monkeypatch.setattr(settings, "export_dir", data_dir / "exports")
+    monkeypatch.setattr(settings, "template_dir", tmp_path / "templates")
+    settings.ensure_directories()
+    return data_dir
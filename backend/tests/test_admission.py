@@ -0,0 +1,95 @@
+"""
+Tests for admission control
+"""
+import asyncio
+
+import pytest
+
+from app.core import AdmissionRejectedError
+from app.services.pipeline.admission import AdmissionController, StageGate
+
+
+async def test_gate_limit_waits_and_never_rejects():
+    """Jobs beyond capacity wait for a slot instead of being rejected"""
+    gate = StageGate("stt", capacity=1, max_queue=0, default_duration=10.0)
+    await gate.acquire()
+
+    waiters = [asyncio.create_task(gate.acquire()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert gate.waiting == 3
+    assert gate.rejected == 0
+
+    for duration in (4.0, 6.0, 5.0):
+        gate.release(duration=duration)
+    await asyncio.gather(*waiters)
+    assert gate.running == 1
+    assert gate.waiting == 0
+
+    gate.release(duration=5.0)
+    assert gate.running == 0
+    assert gate.average_duration() == 5.0
+
+
+async def test_admit_reserves_every_stage_or_none():
+    """Admission reserves all gates of a pipeline up front and rejects beyond capacity + queue"""
+    controller = AdmissionController()
+    stt = controller.gate("stt")
+    vision = controller.gate("vision")
+    vision.admitted = vision.capacity + vision.max_queue
+
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        async with controller.admit(["stt", "vision"]):
+            pytest.fail("rejected requests must not start")
+    assert exc_info.value.retry_after >= 1
+    assert vision.rejected == 1
+    # 先に予約した stt の枠も返却される
+    assert stt.admitted == 0
+
+    vision.admitted = 0
+    async with controller.admit(["stt", "vision", "stt"]):
+        assert stt.admitted == 1
+        assert vision.admitted == 1
+    assert stt.admitted == 0
+    assert vision.admitted == 0
+
+
+async def test_cancelled_waiter_leaves_queue():
+    """A cancelled waiter frees its queue position"""
+    gate = StageGate("export", capacity=1, max_queue=1, default_duration=1.0)
+    await gate.acquire()
+
+    waiter = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert gate.waiting == 0
+    gate.release()
+    assert gate.running == 0
+
+
+def test_retry_after_scales_with_queue_and_capacity():
+    """Retry-After grows with the queue and shrinks with capacity"""
+    gate = StageGate("vision", capacity=2, max_queue=10, default_duration=30.0)
+    assert gate.estimate_wait(position=0) == 30
+    assert gate.estimate_wait(position=3) == 60
+
+
+async def test_dispatch_rejects_before_running_any_stage(data_dirs, monkeypatch):
+    """A full gate rejects the request before any stage of its pipeline starts"""
+    from app.services.jobs import dispatch
+    from app.services.pipeline import admission
+
+    started = []
+
+    async def runner(video_id, **params):
+        started.append(video_id)
+
+    monkeypatch.setitem(dispatch.STAGE_RUNNERS, "pdf", runner)
+    gate = admission.gate("export")
+    monkeypatch.setattr(gate, "admitted", gate.capacity + gate.max_queue)
+
+    with pytest.raises(AdmissionRejectedError):
+        await dispatch.dispatch_stage("video-1", "pdf")
+    assert started == []
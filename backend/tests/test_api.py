@@ -25,6 +25,8 @@ def test_health():
     data = response.json()
     assert data["status"] == "healthy"
     assert "config" in data
+    assert set(data["executors"]) == {"stt", "vision", "export"}
+    assert data["load"]["stt"]["running"] == 0
 
 
 # 追加のテストはここに記述
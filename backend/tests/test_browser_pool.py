@@ -0,0 +1,107 @@
+"""
+Browser pool tests
+"""
+import asyncio
+
+from app.services.export import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+
+    async def new_page(self):
+        if not self.browser.connected:
+            raise RuntimeError("Target closed")
+        self.browser.open_pages += 1
+        self.browser.peak_pages = max(self.browser.peak_pages, self.browser.open_pages)
+        return object()
+
+    async def close(self):
+        self.browser.open_pages = max(0, self.browser.open_pages - 1)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.open_pages = 0
+        self.peak_pages = 0
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self):
+        if not self.connected:
+            raise RuntimeError("Browser has been closed")
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+def _pool(**kwargs) -> tuple[BrowserPool, list[FakeBrowser]]:
+    launched: list[FakeBrowser] = []
+
+    async def launcher():
+        launched.append(FakeBrowser())
+        return launched[-1]
+
+    return BrowserPool(launcher=launcher, **kwargs), launched
+
+
+async def test_pool_reuses_and_recycles_browser():
+    """Test pages share one warm browser, which is replaced after max jobs"""
+    pool, launched = _pool(size=1, pages_per_browser=2, max_jobs_per_browser=3)
+    await pool.start()
+
+    for _ in range(3):
+        async with pool.page():
+            pass
+    assert len(launched) == 1
+    assert launched[0].closed
+
+    async with pool.page():
+        pass
+    assert len(launched) == 2
+    assert pool.stats()["recycled"] == 1
+    await pool.close()
+    assert launched[1].closed
+
+
+async def test_pool_bounds_concurrent_pages():
+    """Test concurrent pages are limited to size x pages_per_browser"""
+    pool, launched = _pool(size=2, pages_per_browser=2, max_jobs_per_browser=100)
+    running = 0
+    peak = 0
+
+    async def job():
+        nonlocal running, peak
+        async with pool.page():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(job() for _ in range(10)))
+    assert peak == 4
+    assert len(launched) == 2
+    assert all(browser.peak_pages <= 2 for browser in launched)
+    assert pool.stats()["active_pages"] == 0
+    await pool.close()
+
+
+async def test_pool_replaces_crashed_browser():
+    """Test a disconnected browser is dropped and a new one launched"""
+    pool, launched = _pool(size=1, pages_per_browser=1, max_jobs_per_browser=100)
+    async with pool.page():
+        pass
+    launched[0].connected = False
+
+    async with pool.page():
+        pass
+    assert len(launched) == 2
+    assert pool.stats()["crashed"] == 1
+    assert pool.stats()["browsers"] == 1
+    await pool.close()
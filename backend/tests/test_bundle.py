@@ -0,0 +1,66 @@
+"""
+ZIP bundle export tests
+"""
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from app.core import settings
+from app.main import app
+from app.models import ManualPlan, ManualStep
+from app.services.export import iter_bundle
+from app.services.pipeline import record_plan
+
+
+def test_bundle_rewrites_links_and_stores_images(data_dirs):
+    """Test images are bundled once under images/ and stored without compression"""
+    first = settings.capture_dir / "vid" / "scene_001.jpg"
+    other = settings.capture_dir / "other" / "scene_001.jpg"
+    for path in (first, other):
+        path.parent.mkdir(parents=True)
+        path.write_bytes(path.parent.name.encode() * 100_000)
+    md_content = (
+        "# Manual\n\n![a](captures/vid/scene_001.jpg)\n\n![b](captures/vid/scene_001.jpg)\n\n"
+        "![c](captures/other/scene_001.jpg)\n\n![missing](captures/none.png)\n"
+    )
+
+    chunks = list(iter_bundle(md_content, chunk_size=64 * 1024))
+    assert max(len(chunk) for chunk in chunks) < 128 * 1024
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["manual.md", "images/scene_001.jpg", "images/scene_001_2.jpg"]
+        markdown = archive.read("manual.md").decode("utf-8")
+        assert markdown.count("](images/scene_001.jpg)") == 2
+        assert "](images/scene_001_2.jpg)" in markdown
+        assert "](captures/none.png)" in markdown
+        info = archive.getinfo("images/scene_001.jpg")
+        assert info.compress_type == zipfile.ZIP_STORED
+        assert archive.read(info) == first.read_bytes()
+
+
+def test_bundle_endpoint_streams_zip(data_dirs):
+    """Test the bundle endpoint renders the manual and streams it with its images"""
+    image = settings.capture_dir / "video-1" / "scene_001.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"png")
+    plan = ManualPlan(
+        title="テスト",
+        source_video="sample.mp4",
+        steps=[
+            ManualStep(
+                title="Step", narration="メニューを開きます", start=0.0, end=5.0, image=str(image)
+            )
+        ],
+    )
+    record_plan("video-1", plan)
+    client = TestClient(app)
+
+    response = client.get("/export/bundle/video-1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.read("images/scene_001.png") == b"png"
+        assert "](images/scene_001.png)" in archive.read("manual.md").decode("utf-8")
+    assert client.get("/export/bundle/video-2").status_code == 404
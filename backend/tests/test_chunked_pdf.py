@@ -0,0 +1,126 @@
+"""
+Chunked PDF rendering tests
+"""
+import re
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core import settings
+from app.services.export import PDFExporter
+from app.services.export import pdf_exporter as pdf_module
+from app.services.export.chunked import heading_levels, merge_pdfs, split_markdown
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _manual(steps: int) -> str:
+    body = "".join(f"## Step {n}: Do {n}\n\ntext\n\n" for n in range(1, steps + 1))
+    return f"# Manual\n\nintro\n\n{body}```\n## not a step\n```\n"
+
+
+def _write_pdf(path, titles: list[tuple[int, str]]) -> None:
+    """見出し毎に 1 ページの PDF (Chromium と同様、文書内の最上位の見出しをしおりの最上位にする)"""
+    writer = pypdf.PdfWriter()
+    parents = []
+    top = min(level for level, _ in titles)
+    for page, (level, title) in enumerate(titles):
+        writer.add_blank_page(width=595, height=842)
+        depth = level - top
+        del parents[depth:]
+        parents.append(
+            writer.add_outline_item(title, page, parent=parents[-1] if parents else None)
+        )
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def test_split_markdown_keeps_preamble_and_code_blocks():
+    """Test chunks hold N step sections and headings inside code blocks are ignored"""
+    chunks = split_markdown(_manual(5), 2)
+    assert len(chunks) == 3
+    assert chunks[0].startswith("# Manual")
+    assert [c.count("## Step") for c in chunks] == [2, 2, 1]
+    assert "## not a step" in chunks[2]
+    assert "".join(chunks) == _manual(5)
+    assert heading_levels(chunks[0]) == [0, 1, 1]
+    assert heading_levels(chunks[2]) == [1]
+
+
+def test_merge_pdfs_keeps_outline_continuous(tmp_path):
+    """Test bookmarks of later chunks nest under the title and point at merged pages"""
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    _write_pdf(first, [(0, "Manual"), (1, "Step 1"), (1, "Step 2")])
+    _write_pdf(second, [(1, "Step 3"), (1, "Step 4")])
+    output = tmp_path / "merged.pdf"
+
+    pages = merge_pdfs([str(first), str(second)], str(output), "", [[0, 1, 1], [1, 1]])
+    assert pages == 5
+
+    reader = pypdf.PdfReader(output)
+    title, children = reader.outline
+    assert title.title == "Manual"
+    assert [item.title for item in children] == ["Step 1", "Step 2", "Step 3", "Step 4"]
+    assert [reader.get_destination_page_number(item) for item in children] == [1, 2, 3, 4]
+
+
+class FakePage:
+    """見出し (h1/h2) 毎に 1 ページの PDF を書き出すページ"""
+
+    def __init__(self, calls: list):
+        self.calls = calls
+        self.html = ""
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    async def goto(self, url, wait_until=None):
+        route = type("Route", (), {})()
+        route.request = type("Request", (), {"url": url})()
+
+        async def fulfill(**kwargs):
+            self.html = kwargs["body"]
+
+        route.fulfill = fulfill
+        await self.handler(route)
+
+    async def pdf(self, path, display_header_footer=False, **kwargs):
+        headings = [
+            (int(level) - 1, title)
+            for level, title in re.findall(r"<h([12])>([^<]*)</h[12]>", self.html)
+        ]
+        if headings:
+            _write_pdf(path, headings)
+        else:
+            # ページ番号だけの文書
+            writer = pypdf.PdfWriter()
+            for _ in range(self.html.count("break-after") + 1):
+                writer.add_blank_page(width=595, height=842)
+            with open(path, "wb") as f:
+                writer.write(f)
+        self.calls.append((len(headings), display_header_footer))
+
+
+async def test_large_manual_is_rendered_in_chunks(data_dirs, monkeypatch):
+    """Test chunks render without page numbers and one page-number stamp covers all pages"""
+    monkeypatch.setattr(settings, "pdf_chunk_steps", 2)
+    markdown_path = settings.export_dir / "vid" / "manual.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text(_manual(5), encoding="utf-8")
+    calls: list = []
+
+    @asynccontextmanager
+    async def fake_page():
+        yield FakePage(calls)
+
+    monkeypatch.setattr(pdf_module.browser_pool, "page", fake_page)
+    output = settings.export_dir / "vid" / "manual.pdf"
+    await PDFExporter(engine="playwright").markdown_to_pdf(markdown_path, output)
+
+    # チャンク 3 つ (番号なし) + ページ番号 PDF (番号あり)
+    assert sorted(calls) == [(0, True), (1, False), (2, False), (3, False)]
+    reader = pypdf.PdfReader(output)
+    assert len(reader.pages) == 6
+    title, children = reader.outline
+    assert [item.title for item in children] == [f"Step {n}: Do {n}" for n in range(1, 6)]
+    assert not list(output.parent.glob(".chunks-*"))
@@ -0,0 +1,87 @@
+"""
+Tests for stage executor pools
+"""
+import os
+import threading
+
+import pytest
+
+from app.core import settings
+from app.core.executors import ExecutorRegistry, StageExecutor, compute_thread_caps
+
+
+async def test_stage_executor_runs_in_named_pool():
+    """Work runs on the stage's own worker threads"""
+    executor = StageExecutor(name="vision", max_workers=2)
+    try:
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+    finally:
+        executor.shutdown()
+
+    assert thread_name.startswith("vision-worker")
+
+
+async def test_stage_executor_stats():
+    """Completed and failed jobs are counted"""
+    executor = StageExecutor(name="export", max_workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    try:
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(RuntimeError):
+            await executor.run(fail)
+        stats = executor.stats()
+    finally:
+        executor.shutdown()
+
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["utilization"] == 0.0
+
+
+async def test_process_executor_runs_initializer(tmp_path):
+    """Process workers run the extra initializer once at startup"""
+    executor = StageExecutor(
+        name="export",
+        max_workers=1,
+        mode="process",
+        initializer=os.chdir,
+        initargs=(str(tmp_path),),
+    )
+    try:
+        cwd = await executor.run(os.getcwd)
+    finally:
+        executor.shutdown()
+
+    assert cwd == str(tmp_path)
+
+
+def test_registry_rejects_unknown_stage():
+    """Unknown stage names are rejected"""
+    with pytest.raises(ValueError):
+        ExecutorRegistry().get("gpu")
+
+
+def test_thread_caps_are_positive():
+    """Auto thread caps never drop below one"""
+    caps = compute_thread_caps()
+    assert set(caps) == {"torch", "opencv", "omp"}
+    assert all(value >= 1 for value in caps.values())
+
+
+def test_thread_caps_split_cores_across_pools(monkeypatch):
+    """Each pool gets a share of the cores divided by its worker count"""
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(12)), raising=False)
+    monkeypatch.setattr(settings, "stt_workers", 1)
+    monkeypatch.setattr(settings, "vision_workers", 2)
+    monkeypatch.setattr(settings, "export_workers", 2)
+    for name in ("torch_num_threads", "opencv_num_threads", "omp_num_threads"):
+        monkeypatch.setattr(settings, name, 0)
+
+    caps = compute_thread_caps()
+    assert caps == {"torch": 4, "opencv": 2, "omp": 2}
+    # 全プールが同時に動いてもスレッド数の合計はコア数以下
+    assert 1 * caps["torch"] + 2 * caps["opencv"] + 2 * caps["omp"] <= 12
@@ -0,0 +1,85 @@
+"""
+Async FFmpeg runner tests (using a stand-in ffmpeg script)
+"""
+import asyncio
+import os
+import stat
+import time
+
+import pytest
+
+from app.core import VideoProcessingError, settings
+from app.utils import FFmpegProgress, FFmpegRunner, compute_timeout
+
+FAKE_FFMPEG = """#!/bin/sh
+[ -n "$FAKE_FFMPEG_HANG" ] && exec sleep "$FAKE_FFMPEG_HANG"
+sleep "${FAKE_FFMPEG_SLEEP:-0}"
+printf 'frame=10\\nfps=25.0\\nout_time_us=5000000\\nspeed=2.0x\\nprogress=continue\\n'
+printf 'frame=20\\nfps=25.0\\nout_time_us=10000000\\nspeed=2.0x\\nprogress=end\\n'
+exit "${FAKE_FFMPEG_EXIT:-0}"
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """Put a stand-in ffmpeg on PATH"""
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+async def test_progress_events(fake_ffmpeg):
+    """Test -progress output is parsed into events"""
+    events: list[tuple[float, bool]] = []
+
+    def on_progress(progress: FFmpegProgress) -> None:
+        events.append((progress.percent, progress.done))
+
+    await FFmpegRunner().run(
+        ["-i", "in.mp4", "out.wav"], duration_sec=10.0, on_progress=on_progress
+    )
+
+    assert events == [(50.0, False), (100.0, True)]
+
+
+async def test_failure_and_timeout(fake_ffmpeg, monkeypatch):
+    """Test non-zero exit and timeouts raise and leave no process running"""
+    runner = FFmpegRunner()
+    monkeypatch.setenv("FAKE_FFMPEG_EXIT", "1")
+    with pytest.raises(VideoProcessingError):
+        await runner.run([])
+
+    monkeypatch.setenv("FAKE_FFMPEG_EXIT", "0")
+    monkeypatch.setenv("FAKE_FFMPEG_HANG", "10")
+    started = time.monotonic()
+    with pytest.raises(VideoProcessingError):
+        await runner.run([], timeout=0.3)
+    assert time.monotonic() - started < 5
+    assert runner.stats()["running"] == 0
+    assert runner.stats()["failed"] == 2
+
+
+async def test_concurrency_cap(fake_ffmpeg, monkeypatch):
+    """Test the number of concurrent processes is capped"""
+    monkeypatch.setenv("FAKE_FFMPEG_SLEEP", "0.3")
+    runner = FFmpegRunner(max_processes=1)
+
+    tasks = [asyncio.create_task(runner.run([])) for _ in range(2)]
+    await asyncio.sleep(0.1)
+    assert runner.stats()["running"] == 1
+    assert runner.stats()["waiting"] == 1
+    await asyncio.gather(*tasks)
+    assert runner.stats()["completed"] == 2
+
+
+def test_timeout_scales_with_duration(monkeypatch):
+    """Test timeouts grow with media duration and are capped"""
+    monkeypatch.setattr(settings, "ffmpeg_timeout_base_sec", 60.0)
+    monkeypatch.setattr(settings, "ffmpeg_timeout_per_media_sec", 2.0)
+    monkeypatch.setattr(settings, "ffmpeg_timeout_max_sec", 1000.0)
+
+    assert compute_timeout(100.0) == 260.0
+    assert compute_timeout(3600.0) == 1000.0
+    assert compute_timeout(None) == 1000.0
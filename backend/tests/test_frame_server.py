@@ -0,0 +1,96 @@
+"""
+Frame server tests
+"""
+import asyncio
+import threading
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core import executors, settings
+from app.main import app
+from app.services.frames import DecoderPool, FrameCache, FrameServer
+
+client = TestClient(app)
+
+
+def _upload_counter_video(video_id: str, frames: int = 40, fps: float = 10) -> None:
+    """フレーム番号を輝度に埋め込んだ動画を配置"""
+    video_dir = settings.upload_dir / video_id
+    video_dir.mkdir(parents=True)
+    writer = cv2.VideoWriter(
+        str(video_dir / "source.avi"), cv2.VideoWriter_fourcc(*"MJPG"), fps, (320, 240)
+    )
+    for n in range(frames):
+        writer.write(np.full((240, 320, 3), n * 5, dtype=np.uint8))
+    writer.release()
+
+
+def test_frame_endpoint(data_dirs):
+    """Test frames are decoded at the timestamp, resized and then served from cache"""
+    _upload_counter_video("vid")
+
+    response = client.get("/videos/vid/frame", params={"t": 2.0, "w": 160})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["x-cache"] == "MISS"
+    assert float(response.headers["x-frame-time"]) == 2.0
+    image = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape[:2] == (120, 160)
+    assert abs(int(image.mean()) - 100) <= 4
+
+    # 近い時刻は開いたままのデコーダーで読み進める
+    nearby = client.get("/videos/vid/frame", params={"t": 2.5, "w": 160, "format": "png"})
+    assert nearby.headers["content-type"] == "image/png"
+    again = client.get("/videos/vid/frame", params={"t": 2.0, "w": 160})
+    assert again.headers["x-cache"] == "HIT"
+    assert again.content == response.content
+
+    stats = client.get("/health").json()["frames"]
+    assert stats["decoders"]["reused"] >= 1
+
+
+def test_frame_endpoint_not_found(data_dirs):
+    """Test unknown videos and timestamps past the end return 404"""
+    assert client.get("/videos/missing/frame", params={"t": 0}).status_code == 404
+
+    _upload_counter_video("short", frames=10)
+    assert client.get("/videos/short/frame", params={"t": 60}).status_code == 404
+
+
+def test_frame_cache_is_byte_bounded():
+    """Test least recently used images are evicted by total size"""
+    cache = FrameCache(max_bytes=10)
+    cache.put(("a", 0, 0, 0, "jpg"), b"12345")
+    cache.put(("b", 0, 0, 0, "jpg"), b"12345")
+    assert cache.get(("a", 0, 0, 0, "jpg")) is not None
+    cache.put(("c", 0, 0, 0, "jpg"), b"123")
+
+    assert cache.get(("b", 0, 0, 0, "jpg")) is None
+    assert cache.get(("a", 0, 0, 0, "jpg")) is not None
+    assert cache.stats()["bytes"] == 8
+
+
+async def test_frame_server_not_blocked_by_vision_pool(data_dirs):
+    """Test frame requests share decoder slots and still return while the vision pool is busy"""
+    _upload_counter_video("vid")
+    server = FrameServer(pool=DecoderPool(per_video=1), cache=FrameCache(0))
+    vision = executors.get("vision")
+    release = threading.Event()
+    busy = [
+        asyncio.ensure_future(executors.run("vision", release.wait, 30))
+        for _ in range(vision.max_workers + 1)
+    ]
+    try:
+        frames = await asyncio.wait_for(
+            asyncio.gather(*(server.get_frame("vid", t, 160) for t in (0.5, 1.0, 2.0))),
+            timeout=10,
+        )
+        assert [frame.timestamp for frame in frames] == [0.5, 1.0, 2.0]
+        assert server.pool.stats()["opened"] == 1
+        assert vision.stats()["running"] == vision.max_workers
+    finally:
+        release.set()
+        await asyncio.gather(*busy)
+        server.close()
@@ -0,0 +1,52 @@
+"""
+Batched frame extraction tests
+"""
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.utils import FrameSpec, extract_frames
+
+
+def _write_counter_video(path: Path, frames: int, fps: float = 10) -> Path:
+    """フレーム番号を輝度に埋め込んだ動画を作成"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (320, 240))
+    for n in range(frames):
+        writer.write(np.full((240, 320, 3), n * 4, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_extract_frames_single_pass(tmp_path):
+    """Test unordered timestamps, per-output width and format in one call"""
+    video = _write_counter_video(tmp_path / "source.avi", 50)
+    specs = [
+        FrameSpec(4.0, tmp_path / "a.jpg"),
+        FrameSpec(0.5, tmp_path / "b.png", width=160),
+        FrameSpec(4.0, tmp_path / "c.jpg", width=80),
+        FrameSpec(99.0, tmp_path / "missing.jpg"),
+    ]
+
+    results = extract_frames(video, specs)
+
+    assert results[:3] == [tmp_path / "a.jpg", tmp_path / "b.png", tmp_path / "c.jpg"]
+    assert results[3] is None
+    a = cv2.imread(str(results[0]))
+    b = cv2.imread(str(results[1]))
+    assert a.shape[:2] == (240, 320)
+    assert b.shape[:2] == (120, 160)
+    assert cv2.imread(str(results[2])).shape[:2] == (60, 80)
+    # フレーム 40 と 5 の輝度
+    assert abs(int(a.mean()) - 160) <= 4
+    assert abs(int(b.mean()) - 20) <= 4
+
+
+def test_extract_frames_format_override(tmp_path):
+    """Test image_format overrides the output suffix"""
+    video = _write_counter_video(tmp_path / "source.avi", 10)
+
+    results = extract_frames(video, [FrameSpec(0.0, tmp_path / "frame.jpg")], "webp")
+
+    assert results == [tmp_path / "frame.webp"]
+    assert cv2.imread(str(results[0])) is not None
@@ -0,0 +1,72 @@
+"""
+HTML export tests
+"""
+import re
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core import settings
+from app.main import app
+from app.models import ManualPlan, ManualStep, SceneInfo
+from app.services.capture import generate_renditions
+from app.services.export import HTMLExporter
+from app.services.pipeline import record_plan
+
+
+async def test_html_export_uses_lazy_responsive_images(data_dirs):
+    """Test images get a srcset of the renditions with relative URLs and lazy loading"""
+    capture = settings.capture_dir / "vid" / "scene_001.png"
+    capture.parent.mkdir(parents=True)
+    cv2.imwrite(str(capture), np.full((1080, 1920, 3), 200, dtype=np.uint8))
+    await generate_renditions([SceneInfo(time=0.0, frame_path=str(capture))], capture.parent)
+    markdown_path = settings.export_dir / "vid" / "manual.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text(
+        "# 設定マニュアル\n\n![Step 1](captures/vid/scene_001.png)\n\n![none](captures/none.png)\n",
+        encoding="utf-8",
+    )
+
+    output = settings.export_dir / "vid" / "manual.html"
+    await HTMLExporter().markdown_to_html(markdown_path, output)
+    document = output.read_text(encoding="utf-8")
+
+    assert "<title>設定マニュアル</title>" in document
+    assert "<link" not in document and "<script" not in document
+    image = re.search(r'<img alt="Step 1"[^>]*>', document).group(0)
+    srcset = re.search(r'srcset="([^"]+)"', image).group(1).split(", ")
+    assert [entry.rsplit(" ", 1)[1] for entry in srcset] == ["320w", "1280w", "1920w"]
+    assert srcset[0].startswith("../../captures/vid/renditions/scene_001.thumb.")
+    assert 'src="../../captures/vid/renditions/scene_001.screen.' in image
+    assert 'width="1920" height="1080"' in image
+    assert 'loading="lazy"' in image
+    for entry in srcset:
+        assert (output.parent / entry.rsplit(" ", 1)[0]).resolve().exists()
+    assert '<img alt="none" src="captures/none.png" loading="lazy"' in document
+
+
+def test_html_endpoint_is_cached_by_markdown_hash(data_dirs):
+    """Test the HTML export is reused until the Markdown inputs change"""
+    plan = ManualPlan(
+        title="テスト",
+        source_video="sample.mp4",
+        steps=[ManualStep(title="Step", narration="メニューを開きます", start=0.0, end=5.0)],
+    )
+    record_plan("video-1", plan)
+    client = TestClient(app)
+
+    first = client.post("/export/html", json={"video_id": "video-1", "format": "html"}).json()
+    second = client.post("/export/html", json={"video_id": "video-1", "format": "html"}).json()
+    assert not first["cached"]
+    assert second["cached"]
+    assert first["download_url"] == "/data/exports/video-1/manual.html"
+    assert "メニューを開きます" in (settings.export_dir / "video-1" / "manual.html").read_text(
+        encoding="utf-8"
+    )
+
+    plan.steps[0].narration = "設定を開きます"
+    record_plan("video-1", plan)
+    third = client.post("/export/html", json={"video_id": "video-1", "format": "html"}).json()
+    assert not third["cached"]
+    assert third["content_hash"] != first["content_hash"]
@@ -0,0 +1,178 @@
+"""
+Tests for the shared job queue and worker
+"""
+import time
+
+import pytest
+
+from app.models import ManualPlan, ManualStep
+from app.services.jobs import RedisJobQueue, SQLiteJobQueue
+from app.services.pipeline import record_plan
+from app.worker import Worker
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, data_dirs):
+    """Build a queue for each backend (redis uses a local stand-in)"""
+
+    def factory(lease_sec=60.0, max_attempts=3):
+        if request.param == "sqlite":
+            return SQLiteJobQueue(
+                path=data_dirs / "jobs.sqlite3", lease_sec=lease_sec, max_attempts=max_attempts
+            )
+        fakeredis = pytest.importorskip("fakeredis")
+        return RedisJobQueue(
+            lease_sec=lease_sec,
+            max_attempts=max_attempts,
+            client=fakeredis.FakeAsyncRedis(decode_responses=True),
+        )
+
+    return factory
+
+
+async def test_enqueue_deduplicates_active_jobs(make_queue):
+    """Identical jobs are enqueued only once while active"""
+    queue = make_queue()
+    first = await queue.enqueue("video-1", "transcription", {})
+    second = await queue.enqueue("video-1", "transcription", {})
+    other = await queue.enqueue("video-1", "scenes", {})
+
+    assert first.job_id == second.job_id
+    assert other.job_id != first.job_id
+
+
+async def test_concurrent_enqueue_creates_one_job(make_queue):
+    """Concurrent identical enqueues share one job and queue it once"""
+    import asyncio
+
+    queue = make_queue()
+    jobs = await asyncio.gather(*(queue.enqueue("video-1", "scenes", {}) for _ in range(5)))
+
+    assert len({job.job_id for job in jobs}) == 1
+    assert (await queue.stats())["queued"] == 1
+
+
+async def test_claim_heartbeat_complete(make_queue):
+    """A claimed job is leased to one worker until completed"""
+    queue = make_queue()
+    job = await queue.enqueue("video-1", "scenes", {})
+
+    claimed = await queue.claim("worker-a")
+    assert claimed.job_id == job.job_id
+    assert claimed.status == "running"
+    assert await queue.claim("worker-b") is None
+
+    assert await queue.heartbeat(job.job_id, "worker-a")
+    assert not await queue.heartbeat(job.job_id, "worker-b")
+
+    await queue.complete(job.job_id, "worker-a", {"output_path": "x"})
+    finished = await queue.get(job.job_id)
+    assert finished.status == "completed"
+    assert finished.result == {"output_path": "x"}
+
+
+async def test_expired_lease_is_reclaimed(make_queue):
+    """Jobs of crashed workers are picked up by another worker"""
+    queue = make_queue(lease_sec=0.05)
+    job = await queue.enqueue("video-1", "transcription", {})
+    await queue.claim("crashed-worker")
+
+    time.sleep(0.1)
+    reclaimed = await queue.claim("worker-b")
+
+    assert reclaimed.job_id == job.job_id
+    assert reclaimed.worker_id == "worker-b"
+    assert reclaimed.attempts == 2
+    assert not await queue.heartbeat(job.job_id, "crashed-worker")
+
+
+async def test_failed_job_is_retried_until_max_attempts(make_queue):
+    """Failures requeue the job until attempts run out"""
+    queue = make_queue(max_attempts=2)
+    job = await queue.enqueue("video-1", "pdf", {})
+
+    await queue.claim("worker-a")
+    await queue.fail(job.job_id, "worker-a", "boom")
+    assert (await queue.get(job.job_id)).status == "queued"
+
+    await queue.claim("worker-a")
+    await queue.fail(job.job_id, "worker-a", "boom")
+    failed = await queue.get(job.job_id)
+    assert failed.status == "failed"
+    assert failed.error == "boom"
+
+
+async def test_worker_runs_stage_and_reports_result(make_queue):
+    """The worker executes the stage and stores its result on the job"""
+    queue = make_queue()
+    record_plan(
+        "video-1",
+        ManualPlan(
+            title="テスト",
+            source_video="sample.mp4",
+            steps=[ManualStep(title="Step", narration="開きます", start=0.0, end=5.0)],
+        ),
+    )
+    job = await queue.enqueue("video-1", "markdown", {"template_name": None})
+
+    worker = Worker(queue, worker_id="worker-a")
+    await worker.process(await queue.claim(worker.worker_id))
+
+    finished = await queue.get(job.job_id)
+    assert finished.status == "completed"
+    assert finished.result["output_path"].endswith("manual.md")
+    assert finished.result["cached"] is False
+
+
+async def test_claim_takes_oldest_job_across_stages(make_queue):
+    """Later stages are not starved by a steady stream of earlier-stage jobs"""
+    queue = make_queue()
+    pdf = await queue.enqueue("video-1", "pdf", {})
+    proxy = await queue.enqueue("video-2", "proxy", {})
+
+    assert (await queue.claim("worker-a")).job_id == pdf.job_id
+    assert (await queue.claim("worker-a")).job_id == proxy.job_id
+
+
+async def test_admission_rejection_requeues_without_attempt(make_queue, monkeypatch):
+    """A job rejected by the admission gate goes back to the queue uncounted"""
+    from app.core import settings
+    from app.services.pipeline import admission
+
+    # 受け付け枠を使い切った状態にする
+    gate = admission.gate("export")
+    monkeypatch.setattr(gate, "admitted", gate.capacity + gate.max_queue)
+    monkeypatch.setattr(settings, "job_poll_interval_sec", 0.01)
+    queue = make_queue(max_attempts=1)
+    job = await queue.enqueue("video-1", "pdf", {})
+
+    worker = Worker(queue, worker_id="worker-a")
+    for _ in range(3):
+        await worker.process(await queue.claim(worker.worker_id))
+
+    requeued = await queue.get(job.job_id)
+    assert requeued.status == "queued"
+    assert requeued.attempts == 0
+    assert (await queue.claim("worker-b")).job_id == job.job_id
+
+
+async def test_stale_heartbeat_racing_reclaim_keeps_new_owner(make_queue):
+    """A heartbeat of the old owner interleaved with a reclaim never revives its lease"""
+    import asyncio
+
+    queue = make_queue(lease_sec=0.05)
+    job = await queue.enqueue("video-1", "scenes", {})
+    await queue.claim("crashed-worker")
+    time.sleep(0.1)
+
+    alive, reclaimed = await asyncio.gather(
+        queue.heartbeat(job.job_id, "crashed-worker"), queue.claim("worker-b")
+    )
+    current = await queue.get(job.job_id)
+    if alive:
+        # ハートビートが先に延長した場合、回収されずに元のワーカーが保持する
+        assert reclaimed is None and current.worker_id == "crashed-worker"
+    else:
+        assert reclaimed.job_id == job.job_id and current.worker_id == "worker-b"
+    assert current.status == "running"
+    assert await queue.claim("worker-c") is None
@@ -0,0 +1,77 @@
+"""
+Media probe cache tests
+"""
+import os
+import wave
+
+from app.utils import FFmpegWrapper, MediaProbe, parse_ffprobe
+
+FFPROBE_JSON = {
+    "format": {"duration": "12.5", "format_name": "mov,mp4", "size": "1000", "bit_rate": "640"},
+    "streams": [
+        {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1920,
+            "height": 1080,
+            "avg_frame_rate": "30000/1001",
+            "nb_frames": "375",
+        },
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2},
+    ],
+}
+
+
+def test_parse_ffprobe():
+    """Test ffprobe JSON is converted to MediaInfo"""
+    info = parse_ffprobe(FFPROBE_JSON)
+
+    assert info.duration_sec == 12.5
+    assert (info.width, info.height) == (1920, 1080)
+    assert round(info.fps, 2) == 29.97
+    assert info.frame_count == 375
+    assert info.video_codec == "h264"
+    assert info.has_audio and info.audio_codec == "aac" and info.sample_rate == 48000
+
+
+async def test_probe_is_cached_by_path_size_mtime(tmp_path, monkeypatch):
+    """Test ffprobe runs once per file version, across probe instances"""
+    calls = []
+
+    async def fake_info(path):
+        calls.append(path)
+        return FFPROBE_JSON
+
+    monkeypatch.setattr(FFmpegWrapper, "get_video_info_async", staticmethod(fake_info))
+    video = tmp_path / "source.mp4"
+    video.write_bytes(b"video")
+    cache_dir = tmp_path / "probe_cache"
+
+    probe = MediaProbe(cache_dir=cache_dir)
+    assert (await probe.probe(video)).duration_sec == 12.5
+    await probe.probe(video)
+    # 再起動後も永続キャッシュを利用
+    assert (await MediaProbe(cache_dir=cache_dir).probe(video)).width == 1920
+    assert len(calls) == 1
+
+    # 内容が変われば再取得
+    video.write_bytes(b"changed video")
+    os.utime(video, ns=(0, 1))
+    await probe.probe(video)
+    assert len(calls) == 2
+
+
+async def test_wav_probe_without_ffprobe(tmp_path):
+    """Test WAV duration is read from the header"""
+    audio = tmp_path / "audio.wav"
+    with wave.open(str(audio), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000 * 3)
+
+    info = await MediaProbe(cache_dir=tmp_path / "cache").probe(audio)
+
+    assert info.duration_sec == 3.0
+    assert info.sample_rate == 16000 and info.channels == 1
+    assert info.audio_codec == "pcm_s16le"
@@ -0,0 +1,116 @@
+"""
+PDF exporter tests (the PDF engines are replaced by fakes)
+"""
+import re
+from contextlib import asynccontextmanager
+
+import cv2
+import numpy as np
+import pytest
+
+from app.core import settings
+from app.services.export import PDFExporter
+from app.services.export import pdf_exporter as pdf_module
+from app.services.export.weasyprint_engine import make_url_fetcher
+
+
+class FakeRequest:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, url: str):
+        self.request = FakeRequest(url)
+        self.response: dict = {}
+
+    async def fulfill(self, **kwargs):
+        self.response = kwargs
+
+
+class FakePage:
+    """goto で HTML と画像を route ハンドラーから取得するページ"""
+
+    def __init__(self):
+        self.handler = None
+        self.html = ""
+        self.images: dict[str, dict] = {}
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    async def goto(self, url, wait_until=None):
+        document = FakeRoute(url)
+        await self.handler(document)
+        self.html = document.response["body"]
+        for src in re.findall(r'<img[^>]* src="([^"]+)"', self.html):
+            image = FakeRoute(url + src)
+            await self.handler(image)
+            self.images[src] = image.response
+
+    async def pdf(self, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4 fake")
+
+
+async def test_playwright_serves_images_through_route(data_dirs, monkeypatch):
+    """Test the page HTML keeps short image URLs and images are served from files"""
+    capture = settings.capture_dir / "vid" / "scene_001.png"
+    capture.parent.mkdir(parents=True)
+    cv2.imwrite(str(capture), np.full((1080, 1920, 3), 200, dtype=np.uint8))
+    markdown_path = settings.export_dir / "vid" / "manual.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text(
+        "# Manual\n\n![step](captures/vid/scene_001.png)\n\n![missing](captures/none.png)\n",
+        encoding="utf-8",
+    )
+
+    page = FakePage()
+
+    @asynccontextmanager
+    async def fake_page():
+        yield page
+
+    monkeypatch.setattr(pdf_module.browser_pool, "page", fake_page)
+    output = settings.export_dir / "vid" / "manual.pdf"
+    await PDFExporter(engine="playwright").markdown_to_pdf(markdown_path, output)
+
+    assert output.read_bytes().startswith(b"%PDF")
+    assert "base64" not in page.html
+    assert 'src="captures/vid/scene_001.png"' in page.html
+    served = page.images["captures/vid/scene_001.png"]
+    assert served["content_type"] == "image/jpeg"
+    assert cv2.imread(served["path"]).shape[1] == 1004
+    assert page.images["captures/none.png"]["status"] == 404
+
+
+async def test_weasyprint_uses_shared_routes_and_stylesheet(data_dirs, monkeypatch):
+    """Test the WeasyPrint engine gets the same image routes and a stylesheet-free document"""
+    capture = settings.capture_dir / "vid" / "scene_001.png"
+    capture.parent.mkdir(parents=True)
+    cv2.imwrite(str(capture), np.full((240, 320, 3), 200, dtype=np.uint8))
+    markdown_path = settings.export_dir / "vid" / "manual.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text("![step](captures/vid/scene_001.png)\n", encoding="utf-8")
+
+    calls = []
+
+    async def fake_render(html, origin, routes, output_path, page_numbers=True):
+        calls.append((html, origin, routes))
+        output_path.write_bytes(b"%PDF-1.4 fake")
+
+    monkeypatch.setattr(pdf_module.weasyprint_engine, "render", fake_render)
+    output = settings.export_dir / "vid" / "manual.pdf"
+    await PDFExporter(engine="weasyprint").markdown_to_pdf(markdown_path, output)
+
+    html, origin, routes = calls[0]
+    assert "<style></style>" in html
+    assert 'src="captures/vid/scene_001.png"' in html
+    fetch = make_url_fetcher(origin, {path: str(file) for path, file in routes.items()})
+    image = fetch(f"{origin}/captures/vid/scene_001.png")
+    assert image["mime_type"] == "image/jpeg"
+    assert image["string"][:2] == b"\xff\xd8"
+    with pytest.raises(ValueError):
+        fetch(f"{origin}/captures/other.png")
+    with pytest.raises(ValueError):
+        fetch("https://example.com/tracker.png")
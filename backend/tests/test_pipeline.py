@@ -0,0 +1,185 @@
+"""
+Tests for the stage manifest and resumable pipeline stages
+"""
+import asyncio
+
+from app.core import settings
+from app.models import ManualPlan, ManualStep
+from app.services.pipeline import (
+    SingleFlight,
+    StageManifest,
+    hash_values,
+    record_plan,
+    run_markdown_export,
+)
+from app.utils import FileLock, sha256_file
+
+
+def _plan(narration: str = "メニューを開きます") -> ManualPlan:
+    return ManualPlan(
+        title="テスト",
+        source_video="sample.mp4",
+        steps=[ManualStep(title="Step", narration=narration, start=0.0, end=5.0)],
+    )
+
+
+def test_manifest_fresh_and_downstream_invalidation(data_dirs):
+    """Recording an upstream stage invalidates everything downstream"""
+    manifest = StageManifest("video-1")
+    output = data_dirs / "out.json"
+    output.write_text("{}", encoding="utf-8")
+
+    manifest.record("transcription", "h1", [output])
+    manifest.record("plan", "h2", [output])
+    manifest.record("markdown", "h3", [output])
+    assert manifest.is_fresh("markdown", "h3")
+    assert not manifest.is_fresh("markdown", "other")
+
+    manifest.record("transcription", "h1-changed", [output])
+    assert manifest.get("plan") is None
+    assert manifest.get("markdown") is None
+    assert manifest.is_fresh("transcription", "h1-changed")
+
+
+def test_manifest_requires_outputs(data_dirs):
+    """A stage whose outputs were deleted is not fresh"""
+    manifest = StageManifest("video-1")
+    output = data_dirs / "out.json"
+    output.write_text("{}", encoding="utf-8")
+    manifest.record("scenes", "h", [output])
+
+    output.unlink()
+    assert not manifest.is_fresh("scenes", "h")
+
+
+def test_file_digest_is_cached_by_size_and_mtime(data_dirs):
+    """File digests are recorded and recomputed only when the file changes"""
+    manifest = StageManifest("video-1")
+    path = data_dirs / "input.bin"
+    path.write_bytes(b"abc")
+    first = manifest.file_digest(path)
+
+    path.write_bytes(b"abcd")
+    assert manifest.file_digest(path) != first
+
+
+def test_hash_values_is_order_independent_for_dicts():
+    """Settings dicts hash identically regardless of key order"""
+    assert hash_values({"a": 1, "b": 2}) == hash_values({"b": 2, "a": 1})
+
+
+async def test_markdown_export_skips_until_plan_changes(data_dirs):
+    """Markdown is re-rendered only after the plan is edited"""
+    record_plan("video-1", _plan())
+
+    first = await run_markdown_export("video-1")
+    second = await run_markdown_export("video-1")
+    assert not first.cached
+    assert second.cached
+
+    record_plan("video-1", _plan("設定を開きます"))
+    third = await run_markdown_export("video-1")
+    assert not third.cached
+    assert "設定を開きます" in third.output_path.read_text(encoding="utf-8")
+    assert third.output_path == settings.export_dir / "video-1" / "manual.md"
+
+
+async def test_single_flight_coalesces_identical_requests(data_dirs):
+    """Concurrent identical requests share one execution"""
+    group = SingleFlight(lock_dir=data_dirs / "locks")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    results = await asyncio.gather(
+        *[group.do("video-1", "transcription", {}, work) for _ in range(5)]
+    )
+
+    assert results == ["done"] * 5
+    assert calls == 1
+    assert group.in_flight() == []
+
+
+async def test_single_flight_distinguishes_params(data_dirs):
+    """Different params run separately"""
+    group = SingleFlight(lock_dir=data_dirs / "locks")
+    calls = []
+
+    async def work(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    results = await asyncio.gather(
+        group.do("video-1", "markdown", {"template": "a"}, lambda: work("a")),
+        group.do("video-1", "markdown", {"template": "b"}, lambda: work("b")),
+    )
+
+    assert sorted(results) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_file_lock_is_exclusive(data_dirs):
+    """A held file lock cannot be acquired again"""
+    path = data_dirs / "locks" / "test.lock"
+    with FileLock(path):
+        other = FileLock(path)
+        try:
+            other.acquire(timeout=0.1)
+            acquired = True
+        except TimeoutError:
+            acquired = False
+    assert not acquired
+
+
+def test_export_hash_tracks_referenced_images(data_dirs):
+    """Repeat exports are served from cache until a referenced image changes"""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    image = settings.capture_dir / "video-1" / "scene_001.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"v1")
+    plan = _plan()
+    plan.steps[0].image = str(image)
+    record_plan("video-1", plan)
+    client = TestClient(app)
+
+    first = client.post("/export/markdown", json={"video_id": "video-1"}).json()
+    second = client.post("/export/markdown", json={"video_id": "video-1"}).json()
+    assert not first["cached"]
+    assert second["cached"]
+    assert second["content_hash"] == first["content_hash"]
+
+    image.write_bytes(b"v2 (re-captured)")
+    third = client.post("/export/markdown", json={"video_id": "video-1"}).json()
+    assert not third["cached"]
+    assert third["content_hash"] != first["content_hash"]
+
+
+def test_file_digests_batch_writes_manifest_once(data_dirs, monkeypatch):
+    """Missing digests are computed together and recorded in one manifest write"""
+    manifest = StageManifest("video-1")
+    paths = []
+    for index in range(5):
+        path = data_dirs / f"image_{index}.png"
+        path.write_bytes(f"image {index}".encode())
+        paths.append(path)
+
+    saves = []
+    original_save = StageManifest._save
+    monkeypatch.setattr(
+        StageManifest, "_save", lambda self, data: saves.append(1) or original_save(self, data)
+    )
+    digests = manifest.file_digests(paths)
+    assert len(saves) == 1
+    assert digests[paths[0]] == sha256_file(paths[0])
+
+    # 変更のないファイルはキャッシュから返し、書き込みも行わない
+    assert manifest.file_digests(paths) == digests
+    assert len(saves) == 1
@@ -0,0 +1,82 @@
+"""
+Print image preparation tests
+"""
+import cv2
+import numpy as np
+
+from app.core import settings
+from app.services.export.print_images import prepare_print_images, print_image_width
+
+
+async def test_prepare_print_images_resizes_and_caches(data_dirs, monkeypatch):
+    """Test captures are downscaled to the printable width once and then reused"""
+    monkeypatch.setattr(settings, "pdf_image_dpi", 150)
+    monkeypatch.setattr(settings, "pdf_content_width_mm", 170.0)
+    capture_dir = settings.capture_dir / "vid"
+    capture_dir.mkdir(parents=True)
+    large = capture_dir / "scene_001.png"
+    small = capture_dir / "scene_002.png"
+    cv2.imwrite(str(large), np.full((2160, 3840, 3), 128, dtype=np.uint8))
+    cv2.imwrite(str(small), np.full((240, 320, 3), 64, dtype=np.uint8))
+
+    prepared = await prepare_print_images([large, small, large])
+    assert print_image_width() == 1004
+    assert prepared[large].suffix == ".jpg"
+    assert cv2.imread(str(prepared[large])).shape[:2] == (565, 1004)
+    assert prepared[large].stat().st_size < large.stat().st_size
+    # 本文幅より小さい画像は拡大しない
+    assert cv2.imread(str(prepared[small])).shape[:2] == (240, 320)
+
+    mtime = prepared[large].stat().st_mtime_ns
+    again = await prepare_print_images([large])
+    assert again[large] == prepared[large]
+    assert again[large].stat().st_mtime_ns == mtime
+
+    # 品質を変えると別のキャッシュになる
+    monkeypatch.setattr(settings, "pdf_image_quality", 50)
+    lower = await prepare_print_images([large])
+    assert lower[large] != prepared[large]
+
+
+async def test_prepare_print_images_keeps_unreadable_source(data_dirs):
+    """Test images that cannot be decoded fall back to the original file"""
+    broken = settings.capture_dir / "broken.png"
+    broken.write_bytes(b"not an image")
+
+    prepared = await prepare_print_images([broken])
+    assert prepared[broken] == broken
+
+
+async def test_prepare_print_images_replaces_stale_version(data_dirs, monkeypatch):
+    """Test re-captured images replace their previous print image and digests stay bounded"""
+    from app.services.export import print_images
+
+    monkeypatch.setattr(print_images, "DIGEST_CACHE_SIZE", 1)
+    capture = settings.capture_dir / "scene_001.png"
+    other = settings.capture_dir / "scene_002.png"
+    cv2.imwrite(str(capture), np.full((240, 320, 3), 64, dtype=np.uint8))
+    cv2.imwrite(str(other), np.full((240, 320, 3), 32, dtype=np.uint8))
+
+    first = (await prepare_print_images([capture, other]))[capture]
+    assert len(print_images._digests) == 1
+
+    cv2.imwrite(str(capture), np.full((240, 320, 3), 200, dtype=np.uint8))
+    second = (await prepare_print_images([capture]))[capture]
+    assert second != first
+    assert second.exists()
+    assert not first.exists()
+    assert len(list(print_images.print_image_dir().iterdir())) == 2
+
+
+async def test_prepare_print_images_ignores_lossy_renditions(data_dirs):
+    """Test print images are encoded from the original capture, not its print rendition"""
+    from app.services.capture import RENDITION_DIRNAME
+
+    capture = settings.capture_dir / "scene_001.png"
+    cv2.imwrite(str(capture), np.full((240, 320, 3), 200, dtype=np.uint8))
+    rendition = capture.parent / RENDITION_DIRNAME / "scene_001.print.webp"
+    rendition.parent.mkdir(parents=True)
+    cv2.imwrite(str(rendition), np.full((240, 320, 3), 10, dtype=np.uint8))
+
+    prepared = await prepare_print_images([capture])
+    assert abs(int(cv2.imread(str(prepared[capture])).mean()) - 200) <= 2
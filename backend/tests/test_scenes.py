@@ -0,0 +1,60 @@
+"""
+Scene detection tests
+"""
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.models import SceneInfo
+from app.services.capture import find_rendition_file, generate_renditions, pick_rendition
+from app.services.scenes import OpenCVSceneDetector
+
+
+def _write_video(path: Path, size: tuple[int, int], fps: float, seconds: int) -> Path:
+    """1 秒毎に色が切り替わる動画を作成"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for second in range(seconds):
+        color = (0, 0, 0) if second % 2 == 0 else (255, 255, 255)
+        frame = np.full((size[1], size[0], 3), color, dtype=np.uint8)
+        for _ in range(int(fps)):
+            writer.write(frame)
+    writer.release()
+    return path
+
+
+async def test_keyframes_taken_from_original(tmp_path):
+    """Test detection on a proxy stores keyframes at the original resolution"""
+    original = _write_video(tmp_path / "source.avi", (320, 240), 10, 6)
+    proxy = _write_video(tmp_path / "proxy.avi", (160, 120), 5, 6)
+    detector = OpenCVSceneDetector(threshold=30, min_scene_duration=0.5, method="histogram")
+
+    result = await detector.detect_scenes(proxy, tmp_path / "captures", keyframe_source=original)
+
+    assert len(result.scenes) >= 2
+    assert [s.time for s in result.scenes] == sorted(s.time for s in result.scenes)
+    for scene in result.scenes:
+        image = cv2.imread(str(scene.frame_path))
+        assert image.shape[:2] == (240, 320)
+
+
+async def test_renditions(tmp_path):
+    """Test renditions are generated per size without upscaling and picked by width"""
+    capture = tmp_path / "scene_0000_0.00s.jpg"
+    cv2.imwrite(str(capture), np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8))
+    scenes = [SceneInfo(time=0.0, frame_path=str(capture))]
+
+    await generate_renditions(scenes, tmp_path)
+
+    by_name = {r.name: r for r in scenes[0].renditions}
+    assert (by_name["thumb"].width, by_name["thumb"].height) == (320, 180)
+    # 元画像より大きいサイズは作らず同じファイルを共有
+    assert by_name["screen"].width == by_name["print"].width == 640
+    screen, printed = Path(by_name["screen"].path), Path(by_name["print"].path)
+    assert screen.stat().st_ino == printed.stat().st_ino
+    assert screen.suffix == ".webp"
+    assert cv2.imread(str(screen)).shape[:2] == (360, 640)
+
+    assert pick_rendition(scenes[0].renditions, 200).name == "thumb"
+    assert pick_rendition(scenes[0].renditions, 4000).width == 640
+    assert find_rendition_file(capture, "print") == printed
@@ -0,0 +1,56 @@
+"""
+Timeline sprite and static cache header tests
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.core import settings
+from app.utils import CachingStaticFiles, build_thumbnails_vtt, describe_sprites
+
+
+def test_thumbnails_vtt_layout(data_dirs):
+    """Test cues point at the right sheet and tile, clamped to the duration"""
+    sheet_dir = settings.intermediate_dir / "vid" / "sprites" / "abc"
+    sheet_dir.mkdir(parents=True)
+    sheets = []
+    for n in (1, 2):
+        sheet = sheet_dir / f"sprite_{n:03d}.jpg"
+        Image.new("RGB", (48, 18)).save(sheet)
+        sheets.append(sheet)
+
+    sprites = describe_sprites(
+        "vid", sheets, sheet_dir / "thumbnails.vtt", 2.0, columns=3, rows=2, duration_sec=15.0
+    )
+    vtt = build_thumbnails_vtt(sprites, 15.0)
+
+    assert (sprites.tile_width, sprites.tile_height, sprites.count) == (16, 9, 8)
+    assert sprites.vtt_url == "/data/intermediate/vid/sprites/abc/thumbnails.vtt"
+    lines = vtt.splitlines()
+    assert lines[0] == "WEBVTT"
+    assert lines[2:4] == ["00:00:00.000 --> 00:00:02.000", "sprite_001.jpg#xywh=0,0,16,9"]
+    # 5 枚目は 1 枚目のシートの 2 行目、8 枚目は 2 枚目のシートの 2 列目
+    assert "sprite_001.jpg#xywh=16,9,16,9" in lines
+    assert lines[-2:] == ["00:00:14.000 --> 00:00:15.000", "sprite_002.jpg#xywh=16,0,16,9"]
+
+
+def test_static_cache_headers(tmp_path):
+    """Test content-addressed sprites are cached long and only sprite files get revalidated"""
+    sprite = tmp_path / "intermediate" / "vid" / "sprites" / "abc" / "sprite_001.jpg"
+    sprite.parent.mkdir(parents=True)
+    sprite.write_bytes(b"jpeg")
+    capture = tmp_path / "captures" / "vid" / "scene_0000_0.00s.jpg"
+    capture.parent.mkdir(parents=True)
+    capture.write_bytes(b"jpeg")
+    vtt = tmp_path / "intermediate" / "vid" / "thumbnails.vtt"
+    vtt.write_text("WEBVTT\n", encoding="utf-8")
+    app = FastAPI()
+    app.mount("/data", CachingStaticFiles(directory=str(tmp_path)))
+    client = TestClient(app)
+
+    response = client.get("/data/intermediate/vid/sprites/abc/sprite_001.jpg")
+    assert "immutable" in response.headers["cache-control"]
+    assert client.get("/data/intermediate/vid/thumbnails.vtt").headers["cache-control"] == (
+        "no-cache"
+    )
+    assert "cache-control" not in client.get("/data/captures/vid/scene_0000_0.00s.jpg").headers
@@ -0,0 +1,83 @@
+"""
+Template renderer tests
+"""
+import os
+
+from app.core import settings
+from app.models import ManualPlan, ManualStep
+from app.services.template import get_template_renderer
+
+
+def _plan() -> ManualPlan:
+    return ManualPlan(
+        title="テスト",
+        source_video="sample.mp4",
+        steps=[ManualStep(title="Step", narration="メニューを開きます", start=0.0, end=5.0)],
+    )
+
+
+async def test_shared_renderer_reloads_only_on_mtime_change(data_dirs):
+    """Test the renderer is shared, templates stay compiled and reload when edited"""
+    renderer = get_template_renderer()
+    assert get_template_renderer() is renderer
+
+    template = settings.template_dir / "custom.md.j2"
+    template.write_text("v1 {{ title }}", encoding="utf-8")
+    assert await renderer.render(_plan(), "custom.md.j2") == "v1 テスト"
+    compiled = renderer.env.get_template("custom.md.j2")
+    assert renderer.env.get_template("custom.md.j2") is compiled
+    assert list((data_dirs / "cache" / "jinja").iterdir())
+
+    template.write_text("v2 {{ title }}", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert await renderer.render(_plan(), "custom.md.j2") == "v2 テスト"
+
+
+def test_default_template_recreated_after_removal(data_dirs):
+    """Test the shared renderer recreates the default template if it is deleted"""
+    renderer = get_template_renderer()
+    template = renderer.create_default_template()
+    template.unlink()
+
+    assert renderer.create_default_template() == template
+    assert template.exists()
+
+
+async def test_streaming_render_matches_render(data_dirs):
+    """Test streamed and file output equal render() and large output is chunked"""
+    renderer = get_template_renderer()
+    renderer.create_default_template()
+    plan = _plan()
+    plan.steps = plan.steps * 200
+    expected = await renderer.render(plan)
+
+    chunks = [chunk async for chunk in renderer.iter_render(plan, chunk_size=1024)]
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode("utf-8") == expected
+
+    output = data_dirs / "exports" / "vid" / "manual.md"
+    output.parent.mkdir(parents=True)
+    size = await renderer.render_to_file(plan, output)
+    assert output.read_text(encoding="utf-8") == expected
+    assert size == output.stat().st_size
+    assert [p.name for p in output.parent.iterdir()] == ["manual.md"]
+
+
+def test_stream_markdown_route(data_dirs):
+    """Test the streaming endpoint returns the rendered manual"""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    plan_path = settings.intermediate_dir / "vid" / "manual_plan.json"
+    plan_path.parent.mkdir(parents=True)
+    plan_path.write_text(_plan().model_dump_json(), encoding="utf-8")
+
+    client = TestClient(app)
+    response = client.get("/export/markdown/vid/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/markdown")
+    assert "メニューを開きます" in response.text
+    assert client.get("/export/markdown/other/stream").status_code == 404
+    assert client.get("/export/markdown/vid/stream?template=none.md.j2").status_code == 500
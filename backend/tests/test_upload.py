@@ -0,0 +1,213 @@
+"""
+Streaming upload tests
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import settings
+from app.main import app
+from app.models import SceneDetectionResult, SceneInfo
+from app.services.pipeline import StageManifest
+from app.services.uploads import ResumableUpload, sweep_expired_uploads
+from app.utils import atomic_write_text, sniff_container
+
+client = TestClient(app)
+
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00"
+
+
+def test_sniff_container():
+    """Test container detection from leading bytes"""
+    assert sniff_container(MP4_HEADER) == "isobmff"
+    assert sniff_container(b"\x1a\x45\xdf\xa3" + b"\x00" * 8) == "matroska"
+    assert sniff_container(b"RIFF\x00\x00\x00\x00AVI LIST") == "avi"
+    assert sniff_container(b"<html><body>") is None
+
+
+def test_upload_streams_and_hashes(data_dirs):
+    """Test upload is stored with its SHA-256"""
+    content = MP4_HEADER + b"\x00" * 200_000
+    response = client.post("/videos/upload", files={"file": ("demo.mp4", content, "video/mp4")})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size_bytes"] == len(content)
+    assert data["sha256"] == hashlib.sha256(content).hexdigest()
+
+    video_dir = settings.upload_dir / data["video_id"]
+    assert (video_dir / "source.mp4").read_bytes() == content
+    assert not list(video_dir.glob("*.part"))
+
+
+def test_upload_rejects_mismatched_container(data_dirs):
+    """Test a file whose header does not match its extension is rejected"""
+    response = client.post(
+        "/videos/upload", files={"file": ("demo.mp4", b"<html>not a video</html>", "video/mp4")}
+    )
+
+    assert response.status_code == 400
+    assert not any(settings.upload_dir.iterdir())
+
+
+@pytest.mark.parametrize("send_length", [True, False])
+def test_upload_rejects_oversized(data_dirs, monkeypatch, send_length):
+    """Test oversized uploads are rejected before or while streaming"""
+    monkeypatch.setattr(settings, "max_video_size_mb", 1)
+    content = MP4_HEADER + b"\x00" * (1024 * 1024)
+
+    if send_length:
+        response = client.post("/videos/upload", files={"file": ("big.mp4", content, "video/mp4")})
+    else:
+        boundary = "testboundary"
+        head = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="big.mp4"\r\n'
+            "Content-Type: video/mp4\r\n\r\n"
+        ).encode()
+        body = head + content + f"\r\n--{boundary}--\r\n".encode()
+
+        def chunked():
+            for i in range(0, len(body), 64 * 1024):
+                yield body[i : i + 64 * 1024]
+
+        response = client.post(
+            "/videos/upload",
+            content=chunked(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+
+    assert response.status_code == 400
+    assert "大きすぎます" in response.json()["detail"]
+    assert not any(settings.upload_dir.iterdir())
+
+
+def test_resumable_upload_out_of_order(data_dirs):
+    """Test chunks sent out of order are assembled with an incremental hash"""
+    content = MP4_HEADER + bytes(range(256)) * 1000
+    response = client.post(
+        "/videos/uploads", json={"filename": "long.mp4", "size_bytes": len(content)}
+    )
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+    url = f"/videos/uploads/{upload_id}"
+
+    # 後半を先に送信
+    middle = len(content) // 2
+    response = client.patch(url, content=content[middle:], headers={"Upload-Offset": str(middle)})
+    assert response.status_code == 200
+    assert response.json()["offset"] == 0
+    assert response.json()["missing_ranges"] == [[0, middle]]
+
+    response = client.head(url)
+    assert response.headers["Upload-Offset"] == "0"
+
+    response = client.patch(url, content=content[:middle], headers={"Upload-Offset": "0"})
+    data = response.json()
+    assert data["completed"] is True
+    assert data["offset"] == len(content)
+    assert data["sha256"] == hashlib.sha256(content).hexdigest()
+
+    video_dir = settings.upload_dir / upload_id
+    assert (video_dir / "source.mp4").read_bytes() == content
+    assert not (video_dir / "upload.part").exists()
+
+
+def test_resumable_upload_rejects_bad_chunks(data_dirs):
+    """Test out-of-range chunks and mismatched containers are rejected"""
+    response = client.post("/videos/uploads", json={"filename": "a.mp4", "size_bytes": 32})
+    url = f"/videos/uploads/{response.json()['upload_id']}"
+
+    response = client.patch(url, content=b"x" * 8, headers={"Upload-Offset": "30"})
+    assert response.status_code == 400
+
+    response = client.patch(url, content=b"<html>" + b"x" * 26, headers={"Upload-Offset": "0"})
+    assert response.status_code == 400
+    assert client.head(url).status_code == 404
+
+
+def test_duplicate_upload_reuses_artifacts(data_dirs):
+    """Test a re-upload is hard-linked and inherits finished stages"""
+    content = MP4_HEADER + b"\x01" * 4096
+    first = client.post("/videos/upload", files={"file": ("a.mp4", content, "video/mp4")}).json()
+    assert first["duplicate_of"] is None
+    video_id = first["video_id"]
+
+    # 既存動画の処理済み成果物を用意
+    manifest = StageManifest(video_id)
+    work_dir = settings.intermediate_dir / video_id
+    frame = settings.capture_dir / video_id / "scene_0000_0.00s.jpg"
+    frame.parent.mkdir(parents=True)
+    frame.write_bytes(b"jpeg")
+    (work_dir / "audio.wav").write_bytes(b"wav")
+    (work_dir / "transcription.json").write_text("{}")
+    scenes = SceneDetectionResult(
+        video_filename="source.mp4", scenes=[SceneInfo(time=0.0, frame_path=str(frame))]
+    )
+    (work_dir / "scenes.json").write_text(scenes.model_dump_json())
+    manifest.record("audio", "h-audio", [work_dir / "audio.wav"])
+    manifest.record("transcription", "h-stt", [work_dir / "transcription.json"])
+    manifest.record("scenes", "h-scenes", [work_dir / "scenes.json"])
+
+    second = client.post("/videos/upload", files={"file": ("b.mp4", content, "video/mp4")}).json()
+    assert second["duplicate_of"] == video_id
+    assert second["available_stages"] == ["audio", "transcription", "scenes"]
+
+    new_id = second["video_id"]
+    source = settings.upload_dir / video_id / "source.mp4"
+    assert (settings.upload_dir / new_id / "source.mp4").stat().st_ino == source.stat().st_ino
+    assert StageManifest(new_id).is_fresh("transcription", "h-stt")
+
+    new_scenes = SceneDetectionResult.model_validate_json(
+        (settings.intermediate_dir / new_id / "scenes.json").read_text()
+    )
+    new_frame = Path(new_scenes.scenes[0].frame_path)
+    assert new_frame.parent == settings.capture_dir / new_id
+    assert new_frame.stat().st_ino == frame.stat().st_ino
+
+
+async def test_sweep_expired_uploads(data_dirs, monkeypatch):
+    """Test abandoned resumable uploads and their hash state are discarded"""
+    from app.services.uploads import resumable
+
+    stale = ResumableUpload.create("stale.mp4", 64)
+    fresh = ResumableUpload.create("fresh.mp4", 64)
+    state = stale.load()
+    state["updated_at"] = "2000-01-01T00:00:00"
+    atomic_write_text(stale.state_path, json.dumps(state))
+    resumable._hashers[stale.upload_id] = resumable._PrefixHasher()
+    resumable._hashers["gone"] = resumable._PrefixHasher()
+    resumable._hashers["gone"].used_at -= settings.upload_expiry_sec + 1
+
+    assert await sweep_expired_uploads(force=True) == 1
+    assert not stale.dir.exists()
+    assert fresh.exists()
+    assert stale.upload_id not in resumable._hashers
+    assert "gone" not in resumable._hashers
+    # 直後の呼び出しは間隔内のため何もしない
+    assert await sweep_expired_uploads() == 0
+
+
+async def test_concurrent_last_chunks_finalize_once(data_dirs):
+    """Test only one of two requests filling the last gaps reports completing the upload"""
+    import asyncio
+
+    content = MP4_HEADER + bytes(range(256)) * 64
+    upload = ResumableUpload.create("race.mp4", len(content))
+    first, second = len(content) // 3, 2 * len(content) // 3
+
+    async def body(start: int, end: int):
+        yield content[start:end]
+
+    _, finalized = await upload.write_chunk(first, body(first, second))
+    assert finalized is False
+
+    results = await asyncio.gather(
+        upload.write_chunk(0, body(0, first)), upload.write_chunk(second, body(second, None))
+    )
+    assert sorted(finalized for _, finalized in results) == [False, True]
+    assert upload.load()["completed"] is True
+    assert upload.video_path().read_bytes() == content
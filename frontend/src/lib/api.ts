@@ -40,9 +40,18 @@ export interface Transcription {
   segments: TranscriptionSegment[]
 }
 
+export interface ImageRendition {
+  name: 'thumb' | 'screen' | 'print'
+  width: number
+  height: number
+  format: string
+  path: string
+}
+
 export interface SceneInfo {
   time: number
   frame_path: string
+  renditions?: ImageRendition[]
 }
 
 export interface SceneDetectionResult {
@@ -55,6 +64,7 @@ export interface ManualStep {
   narration: string
   note?: string
   image?: string
+  image_renditions?: ImageRendition[]
   start: number
   end: number
   selected: boolean
@@ -72,6 +82,9 @@ export interface ExportResponse {
   format: string
   output_path: string
   download_url: string
+  // 入力 (計画・テンプレート・画像・設定) のハッシュ。変わっていなければ成果物は最新
+  content_hash: string
+  cached: boolean
 }
 
 // API メソッド
@@ -177,6 +190,22 @@ export const exportApi = {
     return response.data
   },
 
+  // HTML エクスポート (画面表示用)
+  exportHtml: async (videoId: string, template?: string): Promise<ExportResponse> => {
+    const response = await api.post('/export/html', {
+      video_id: videoId,
+      format: 'html',
+      template,
+    })
+    return response.data
+  },
+
+  // ZIP バンドル (Markdown + 画像) のダウンロード URL 取得
+  getBundleUrl: (videoId: string, template?: string): string => {
+    const query = template ? `?template=${encodeURIComponent(template)}` : ''
+    return `${API_BASE_URL}/export/bundle/${videoId}${query}`
+  },
+
   // ダウンロード URL 取得
   getDownloadUrl: (videoId: string, filename: string): string => {
     return `${API_BASE_URL}/export/download/${videoId}/${filename}`
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useParams } from 'react-router-dom'
-import { Download, FileText, FileDown, Loader2 } from 'lucide-react'
+import { Archive, Download, ExternalLink, FileText, FileDown, Globe, Loader2 } from 'lucide-react'
 import { exportApi } from '../lib/api'
 
 export default function ExportPage() {
@@ -9,6 +9,7 @@ export default function ExportPage() {
   const [exportedFiles, setExportedFiles] = useState<{
     markdown?: string
     pdf?: string
+    html?: string
   }>({})
 
   const handleExportMarkdown = async () => {
@@ -45,6 +46,23 @@ export default function ExportPage() {
     }
   }
 
+  const handleExportHtml = async () => {
+    if (!videoId) return
+
+    setExporting(true)
+    try {
+      const response = await exportApi.exportHtml(videoId)
+      setExportedFiles(prev => ({
+        ...prev,
+        html: response.download_url,
+      }))
+    } catch (err) {
+      console.error('HTML export failed:', err)
+    } finally {
+      setExporting(false)
+    }
+  }
+
   return (
     <div className="max-w-2xl mx-auto">
       <div className="bg-white rounded-lg shadow-md p-8">
@@ -131,10 +149,74 @@ export default function ExportPage() {
               )}
             </div>
           </div>
+
+          {/* HTML エクスポート */}
+          <div className="border rounded-lg p-6">
+            <div className="flex items-center justify-between">
+              <div className="flex items-center space-x-3">
+                <Globe className="h-8 w-8 text-emerald-600" />
+                <div>
+                  <h3 className="font-medium text-gray-900">HTML</h3>
+                  <p className="text-sm text-gray-500">
+                    ブラウザですぐに閲覧
+                  </p>
+                </div>
+              </div>
+              {exportedFiles.html ? (
+                <a
+                  href={`http://localhost:8000${exportedFiles.html}`}
+                  target="_blank"
+                  rel="noreferrer"
+                  className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-green-600 hover:bg-green-700"
+                >
+                  <ExternalLink className="mr-2 h-4 w-4" />
+                  開く
+                </a>
+              ) : (
+                <button
+                  onClick={handleExportHtml}
+                  disabled={exporting}
+                  className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 disabled:bg-gray-400"
+                >
+                  {exporting ? (
+                    <Loader2 className="animate-spin mr-2 h-4 w-4" />
+                  ) : (
+                    <FileDown className="mr-2 h-4 w-4" />
+                  )}
+                  エクスポート
+                </button>
+              )}
+            </div>
+          </div>
+
+          {/* ZIP バンドル (Markdown + 画像) */}
+          <div className="border rounded-lg p-6">
+            <div className="flex items-center justify-between">
+              <div className="flex items-center space-x-3">
+                <Archive className="h-8 w-8 text-amber-600" />
+                <div>
+                  <h3 className="font-medium text-gray-900">ZIP (Markdown + 画像)</h3>
+                  <p className="text-sm text-gray-500">
+                    オフラインでも画像付きで閲覧可能
+                  </p>
+                </div>
+              </div>
+              {videoId && (
+                <a
+                  href={exportApi.getBundleUrl(videoId)}
+                  download
+                  className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-green-600 hover:bg-green-700"
+                >
+                  <Download className="mr-2 h-4 w-4" />
+                  ダウンロード
+                </a>
+              )}
+            </div>
+          </div>
         </div>
 
         {/* 完了メッセージ */}
-        {(exportedFiles.markdown || exportedFiles.pdf) && (
+        {(exportedFiles.markdown || exportedFiles.pdf || exportedFiles.html) && (
           <div className="mt-8 bg-green-50 rounded-md p-4">
             <p className="text-sm text-green-800">
               ✅ エクスポートが完了しました!ダウンロードボタンからファイルを取得できます。
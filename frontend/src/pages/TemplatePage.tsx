@@ -103,6 +103,12 @@ export default function TemplatePage() {
                   {step.image && (
                     <img
                       src={`http://localhost:8000/${step.image}`}
+                      srcSet={step.image_renditions
+                        ?.filter((r) => r.name !== 'print')
+                        .map((r) => `http://localhost:8000/${r.path} ${r.width}w`)
+                        .join(', ')}
+                      sizes="448px"
+                      loading="lazy"
                       alt={`Step ${index + 1}`}
                       className="mt-2 max-w-md rounded border"
                     />